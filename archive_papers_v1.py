@@ -0,0 +1,412 @@
+import argparse
+import datetime
+import gzip
+import io
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+import urllib.error
+import urllib.request
+
+try:
+    import zstandard
+except ImportError:  # 没装 zstandard 时用 gzip 段
+    zstandard = None
+
+from extract_papers_v2 import get_base_id
+from paper_io import EVALUATED_PAPER_SCHEMA, dump, dumps, dumps_line, load, loads
+
+# ================= 配置区域 =================
+# 归档目录 (workflow 中随 .cache/ 一起保留)
+ARCHIVE_DIR = ".cache/archive"
+SEGMENT_DIR = "segments"
+INDEX_FILE = "index.sqlite"
+# compact 默认合并多少周以前的段
+COMPACT_AFTER_WEEKS = 12
+# .cache/ 只靠 actions/cache 保留，缓存被淘汰就会丢失。每次运行把归档发布到站点的 archive/ 下
+# (publish)，本地没有索引时先从这里取回 (restore)，取不回来时大声警告而不是悄悄从头开始
+PUBLISH_DIR = "archive"
+ARCHIVE_URL = os.getenv("MYARXIV_ARCHIVE_URL", "")
+MANIFEST_FILE = "manifest.json"
+ZSTD_LEVEL = 19
+GZIP_LEVEL = 9
+
+# ================= 评估结果的长期归档 =================
+# 每次 add 写一个新的只追加段 (JSONL，zstd 或 gzip 压缩)，段文件写完后不再修改；
+# index.sqlite 记录每篇论文在哪个段的第几行，以及周、分数、标题、关键词，
+# 所以"某篇论文是否评估过""近半年 >=8 分的论文"这类查询只查索引，不解压任何段。
+# compact 把旧的周段按季度合并成一个大段，并在同一事务里改写索引。
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    name TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    records INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS papers (
+    base_id TEXT NOT NULL,
+    week TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    score INTEGER,
+    title TEXT,
+    segment TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (base_id, week)
+);
+CREATE INDEX IF NOT EXISTS papers_score ON papers (score, week_start);
+CREATE INDEX IF NOT EXISTS papers_week ON papers (week_start);
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword TEXT NOT NULL,
+    base_id TEXT NOT NULL,
+    week TEXT NOT NULL,
+    PRIMARY KEY (keyword, base_id, week)
+);
+"""
+
+
+def open_index(archive_dir):
+    os.makedirs(os.path.join(archive_dir, SEGMENT_DIR), exist_ok=True)
+    conn = sqlite3.connect(os.path.join(archive_dir, INDEX_FILE))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def iso_week(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_start(week):
+    return datetime.date.fromisocalendar(int(week[:4]), int(week[6:]), 1).isoformat()
+
+
+# ================= 段文件 =================
+
+def segment_suffix():
+    return ".jsonl.zst" if zstandard is not None else ".jsonl.gz"
+
+
+def write_segment(path, records):
+    data = b"".join(dumps_line(r) for r in records)
+    if path.endswith(".zst"):
+        data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_segment(path):
+    """逐行读取一个段，返回记录的迭代器"""
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} 是 zstd 段，需要安装 zstandard")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'))
+        stream = io.TextIOWrapper(raw, encoding='utf-8')
+    else:
+        stream = gzip.open(path, 'rt', encoding='utf-8')
+    with stream:
+        for line in stream:
+            if line.strip():
+                yield loads(line)
+
+
+def new_segment_name(conn, stem):
+    """同一周多次归档时依次编号：2026-W42, 2026-W42.1, 2026-W42.2 ..."""
+    taken = {row[0] for row in conn.execute("SELECT name FROM segments")}
+    name, n = stem + segment_suffix(), 0
+    while name in taken:
+        n += 1
+        name = f"{stem}.{n}{segment_suffix()}"
+    return name
+
+
+# ================= 命令 =================
+
+def add(archive_dir, evaluated_file, week=None):
+    """归档一份 evaluated_papers.json；同一周已归档过的论文跳过"""
+    if not os.path.exists(evaluated_file):
+        print(f"{evaluated_file} 不存在，没有需要归档的评估结果。")
+        return 0
+    papers = load(evaluated_file, EVALUATED_PAPER_SCHEMA)
+    week = week or iso_week(datetime.date.today())
+
+    if not os.path.exists(os.path.join(archive_dir, INDEX_FILE)):
+        warn_missing_index(archive_dir)
+    conn = open_index(archive_dir)
+    archived = {row[0] for row in conn.execute("SELECT base_id FROM papers WHERE week = ?", (week,))}
+    records = []
+    for paper in papers:
+        base_id = get_base_id(paper['id'])
+        if base_id in archived:
+            continue
+        archived.add(base_id)
+        records.append(dict(paper, week=week))
+    if not records:
+        print(f"{week} 的 {len(papers)} 篇论文都已归档，跳过。")
+        conn.close()
+        return 0
+
+    name = new_segment_name(conn, week)
+    size = write_segment(os.path.join(archive_dir, SEGMENT_DIR, name), records)
+    start = week_start(week)
+    with conn:
+        conn.execute("INSERT INTO segments VALUES (?, ?, ?, ?, ?)",
+                     (name, 'zstd' if name.endswith('.zst') else 'gzip', len(records), size,
+                      time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())))
+        for line, r in enumerate(records):
+            base_id = get_base_id(r['id'])
+            score = r.get('score') if isinstance(r.get('score'), int) else None
+            conn.execute("INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (base_id, week, start, score, r.get('title'), name, line))
+            for kw in r.get('keywords') or []:
+                conn.execute("INSERT OR IGNORE INTO keywords VALUES (?, ?, ?)",
+                             (str(kw).strip().lower(), base_id, week))
+    conn.close()
+    print(f"Archived {len(records)} papers for {week} into {name} ({size / 1024:.1f} KB).")
+    return len(records)
+
+
+def parse_since(value):
+    """6m / 12w / 30d 或 YYYY-MM-DD -> 起始日期字符串"""
+    match = re.fullmatch(r'(\d+)([dwm])', value)
+    if not match:
+        return datetime.date.fromisoformat(value).isoformat()
+    n, unit = int(match.group(1)), match.group(2)
+    days = {'d': 1, 'w': 7, 'm': 30}[unit] * n
+    return (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+
+
+def query(archive_dir, min_score=None, since=None, keyword=None, limit=None):
+    conn = open_index(archive_dir)
+    sql = "SELECT p.base_id, p.week, p.score, p.title, p.segment, p.line FROM papers p"
+    where, args = [], []
+    if keyword:
+        sql += " JOIN keywords k ON k.base_id = p.base_id AND k.week = p.week"
+        where.append("k.keyword = ?")
+        args.append(keyword.lower())
+    if min_score is not None:
+        where.append("p.score >= ?")
+        args.append(min_score)
+    if since:
+        where.append("p.week_start >= ?")
+        args.append(parse_since(since))
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY p.week_start DESC, p.score DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    rows = conn.execute(sql, args).fetchall()
+    conn.close()
+    return rows
+
+
+def seen(archive_dir, paper_id):
+    """某篇论文 (任意版本号) 在哪些周被评估过"""
+    conn = open_index(archive_dir)
+    rows = conn.execute("SELECT base_id, week, score, title, segment, line FROM papers WHERE base_id = ? "
+                        "ORDER BY week_start", (get_base_id(paper_id),)).fetchall()
+    conn.close()
+    return rows
+
+
+def load_records(archive_dir, rows):
+    """取回完整记录：每个涉及的段只顺序读一遍，不解压无关的段"""
+    wanted = {}
+    for row in rows:
+        wanted.setdefault(row[4], set()).add(row[5])
+    records = {}
+    for segment, lines in wanted.items():
+        last = max(lines)
+        for line, record in enumerate(read_segment(os.path.join(archive_dir, SEGMENT_DIR, segment))):
+            if line in lines:
+                records[(segment, line)] = record
+            if line >= last:
+                break
+    return [records[(row[4], row[5])] for row in rows]
+
+
+def quarter_of(week):
+    # 年份也要取自周一的日期：2026-W01 从 2025-12-29 开始，属于 2025-Q4
+    start = week_start(week)
+    return f"{start[:4]}-Q{(int(start[5:7]) - 1) // 3 + 1}"
+
+
+def compact(archive_dir, after_weeks=COMPACT_AFTER_WEEKS):
+    """把 after_weeks 周以前的段按季度合并，已有的季度段也一起重写"""
+    conn = open_index(archive_dir)
+    cutoff = (datetime.date.today() - datetime.timedelta(weeks=after_weeks)).isoformat()
+    groups = {}
+    for segment, newest in conn.execute("SELECT segment, MAX(week_start) FROM papers GROUP BY segment"):
+        if newest < cutoff:
+            week = conn.execute("SELECT week FROM papers WHERE segment = ? LIMIT 1", (segment,)).fetchone()[0]
+            groups.setdefault(quarter_of(week), []).append(segment)
+
+    merged = 0
+    for quarter, segments in sorted(groups.items()):
+        if len(segments) == 1 and segments[0].startswith(quarter + "."):
+            continue  # 已经是合并好的季度段
+        name = quarter + segment_suffix()
+        rows = conn.execute(
+            f"SELECT segment, line FROM papers WHERE segment IN ({','.join('?' * len(segments))}) "
+            "ORDER BY week_start, segment, line", segments).fetchall()
+        records = load_records(archive_dir, [(None, None, None, None, s, l) for s, l in rows])
+        # 先写临时名，索引提交后再替换，避免中途失败时丢数据
+        tmp_name = name + ".compact"
+        size = write_segment(os.path.join(archive_dir, SEGMENT_DIR, tmp_name), records)
+        with conn:
+            for line, (segment, old_line) in enumerate(rows):
+                conn.execute("UPDATE papers SET segment = ?, line = ? WHERE segment = ? AND line = ?",
+                             (tmp_name, line, segment, old_line))
+            conn.execute(f"DELETE FROM segments WHERE name IN ({','.join('?' * len(segments))})", segments)
+        for segment in segments:
+            path = os.path.join(archive_dir, SEGMENT_DIR, segment)
+            if os.path.exists(path):
+                os.remove(path)
+        os.replace(os.path.join(archive_dir, SEGMENT_DIR, tmp_name), os.path.join(archive_dir, SEGMENT_DIR, name))
+        with conn:
+            conn.execute("UPDATE papers SET segment = ? WHERE segment = ?", (name, tmp_name))
+            conn.execute("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                         (name, 'zstd' if name.endswith('.zst') else 'gzip', len(records), size,
+                          time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())))
+        print(f"Compacted {len(segments)} segments into {name} ({len(records)} papers, {size / 1024:.1f} KB).")
+        merged += len(segments)
+    conn.close()
+    if not merged:
+        print("没有需要合并的旧段。")
+    return merged
+
+
+# ================= 发布 / 取回 =================
+
+def warn_missing_index(archive_dir):
+    # ::warning:: 在 GitHub Actions 的运行摘要里显示为警告
+    print(f"::warning::{os.path.join(archive_dir, INDEX_FILE)} 不存在：归档将从空白开始。"
+          f"如果之前已经归档过，请先运行 archive_papers_v1.py restore 从已发布的副本取回。")
+
+
+def publish(archive_dir, target_dir="target"):
+    """把索引和所有段复制到 target/archive/ (随站点一起部署)，附带段文件清单"""
+    index_path = os.path.join(archive_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        warn_missing_index(archive_dir)
+        return 0
+    out_dir = os.path.join(target_dir, PUBLISH_DIR)
+    os.makedirs(os.path.join(out_dir, SEGMENT_DIR), exist_ok=True)
+    conn = open_index(archive_dir)
+    segments = [row[0] for row in conn.execute("SELECT name FROM segments ORDER BY name")]
+    papers = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+    # 用 SQLite 的在线备份得到一致的索引副本
+    backup = sqlite3.connect(os.path.join(out_dir, INDEX_FILE))
+    conn.backup(backup)
+    backup.close()
+    conn.close()
+    for name in segments:
+        shutil.copy2(os.path.join(archive_dir, SEGMENT_DIR, name), os.path.join(out_dir, SEGMENT_DIR, name))
+    dump({'index': INDEX_FILE, 'segments': segments, 'papers': papers,
+          'published': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}, os.path.join(out_dir, MANIFEST_FILE))
+    print(f"Published archive ({papers} papers, {len(segments)} segments) to {out_dir}.")
+    return len(segments)
+
+
+def fetch(url, path):
+    tmp = path + ".download"
+    with urllib.request.urlopen(url, timeout=60) as response, open(tmp, 'wb') as f:
+        shutil.copyfileobj(response, f)
+    os.replace(tmp, path)
+
+
+def restore(archive_dir, url=ARCHIVE_URL):
+    """本地没有索引时从已发布的副本取回；本地已有索引时什么都不做。返回取回的段数"""
+    if os.path.exists(os.path.join(archive_dir, INDEX_FILE)):
+        print(f"{archive_dir} 已有归档索引，无需取回。")
+        return 0
+    if not url:
+        warn_missing_index(archive_dir)
+        return 0
+    url = url.rstrip('/')
+    try:
+        with urllib.request.urlopen(f"{url}/{MANIFEST_FILE}", timeout=60) as response:
+            manifest = loads(response.read())
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        print(f"::warning::无法从 {url} 取回归档 ({e})，归档将从空白开始。")
+        return 0
+    os.makedirs(os.path.join(archive_dir, SEGMENT_DIR), exist_ok=True)
+    for name in manifest['segments']:
+        fetch(f"{url}/{SEGMENT_DIR}/{name}", os.path.join(archive_dir, SEGMENT_DIR, name))
+    # 索引最后落盘：中途失败时本地仍然没有索引，下次运行会重新取回
+    fetch(f"{url}/{manifest['index']}", os.path.join(archive_dir, INDEX_FILE))
+    print(f"Restored archive ({manifest['papers']} papers, {len(manifest['segments'])} segments) from {url}.")
+    return len(manifest['segments'])
+
+
+def print_rows(rows):
+    for base_id, week, score, title, _, _ in rows:
+        print(f"{week}  {score if score is not None else '-':>2}  {base_id}  {title}")
+    print(f"({len(rows)} papers)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append-only archive of evaluated papers with a SQLite index.")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('add', help="archive an evaluated_papers.json")
+    p.add_argument('evaluated_file', nargs='?', default="target/evaluated_papers.json")
+    p.add_argument('--week', help="ISO week such as 2026-W42 (default: current week)")
+
+    p = sub.add_parser('query', help="search the index without decompressing segments")
+    p.add_argument('--min-score', type=int)
+    p.add_argument('--since', help="6m, 12w, 30d or YYYY-MM-DD")
+    p.add_argument('--keyword')
+    p.add_argument('--limit', type=int)
+    p.add_argument('--full', action='store_true', help="print the full archived records as JSON")
+
+    p = sub.add_parser('seen', help="list the weeks a paper was evaluated in")
+    p.add_argument('paper_id')
+    p.add_argument('--full', action='store_true')
+
+    p = sub.add_parser('compact', help="merge old weekly segments into quarterly ones")
+    p.add_argument('--after-weeks', type=int, default=COMPACT_AFTER_WEEKS)
+
+    p = sub.add_parser('publish', help="copy the index and segments into TARGET/archive for deployment")
+    p.add_argument('target_dir', nargs='?', default="target")
+
+    p = sub.add_parser('restore', help="fetch the published archive when the local index is missing")
+    p.add_argument('--url', default=ARCHIVE_URL, help="published archive URL (default: $MYARXIV_ARCHIVE_URL)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'add':
+        add(args.archive_dir, args.evaluated_file, args.week)
+    elif args.command == 'compact':
+        compact(args.archive_dir, args.after_weeks)
+    elif args.command == 'publish':
+        publish(args.archive_dir, args.target_dir)
+    elif args.command == 'restore':
+        restore(args.archive_dir, args.url)
+    else:
+        if args.command == 'query':
+            rows = query(args.archive_dir, args.min_score, args.since, args.keyword, args.limit)
+        else:
+            rows = seen(args.archive_dir, args.paper_id)
+            if not rows:
+                print(f"{args.paper_id} 没有评估记录。")
+                return 1
+        if args.full:
+            for record in load_records(args.archive_dir, rows):
+                print(dumps(record).decode('utf-8'))
+        else:
+            print_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
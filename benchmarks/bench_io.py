@@ -0,0 +1,103 @@
+"""
+流水线 JSON 读写基准：原来的标准库写法 (json.load / json.dump(indent=2)) 与 paper_io 各后端对比。
+
+用法: python benchmarks/bench_io.py [N ...]
+默认分别在约 10000 / 100000 篇的合成夹具上，分阶段测 cache.json 读取 (含校验)、
+evaluated_papers.json 读写、Batch JSONL 编码与解析的耗时，并检查各后端写出的 evaluated_papers.json
+与标准库逐字节一致。完全离线。
+"""
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import paper_io  # noqa: E402
+from benchmarks.fixtures import make_cache, make_evaluated  # noqa: E402
+
+DAYS = 7
+CATEGORIES = 3
+REPEAT = 3
+
+
+def batch_lines(evaluated):
+    """模拟 Batch API 结果文件：每篇论文一行"""
+    return [{
+        'custom_id': p['id'],
+        'response': {'status_code': 200, 'body': {
+            'choices': [{'message': {'content': json.dumps({k: p[k] for k in paper_io.EVALUATION_SCHEMA},
+                                                           ensure_ascii=False)}}],
+            'usage': {'prompt_tokens': 1200, 'completion_tokens': 350},
+        }},
+    } for p in evaluated]
+
+
+def stdlib_phases(cache_bytes, evaluated_bytes, batch_records, batch_text):
+    """改动前各脚本的写法：无校验，indent=2 写回"""
+    return {
+        'read cache': lambda: json.load(io.BytesIO(cache_bytes)),
+        'read evaluated': lambda: json.load(io.BytesIO(evaluated_bytes)),
+        'write evaluated': lambda: json.dumps(json.loads(evaluated_bytes), indent=2,
+                                              ensure_ascii=False).encode('utf-8'),
+        'batch encode': lambda: ''.join(json.dumps(r) + '\n' for r in batch_records),
+        'batch parse': lambda: [json.loads(line) for line in batch_text.splitlines()],
+    }
+
+
+def paper_io_phases(cache_bytes, evaluated_bytes, batch_records, batch_text):
+    """paper_io：读取时按 schema 校验"""
+    return {
+        'read cache': lambda: paper_io.validate_cache(paper_io.loads(cache_bytes)),
+        'read evaluated': lambda: paper_io.validate_list(paper_io.loads(evaluated_bytes),
+                                                         paper_io.EVALUATED_PAPER_SCHEMA, 'evaluated'),
+        'write evaluated': lambda: paper_io.dumps(paper_io.loads(evaluated_bytes), indent=True),
+        'batch encode': lambda: b''.join(paper_io.dumps_line(r) for r in batch_records),
+        'batch parse': lambda: list(paper_io.iter_jsonl(batch_text, paper_io.BATCH_RESULT_SCHEMA)),
+    }
+
+
+def best_of(fn):
+    best, result = None, None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(sizes):
+    for size in sizes:
+        cache = make_cache(days=DAYS, categories=CATEGORIES, per_category=max(1, size // (DAYS * CATEGORIES)))
+        evaluated = make_evaluated(cache)
+        cache_bytes = json.dumps(cache, indent=2, ensure_ascii=False).encode('utf-8')
+        evaluated_bytes = json.dumps(evaluated, indent=2, ensure_ascii=False).encode('utf-8')
+        batch_records = batch_lines(evaluated)
+        batch_text = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in batch_records)
+        args = (cache_bytes, evaluated_bytes, batch_records, batch_text)
+
+        print(f"\n{len(evaluated)} papers, cache.json {len(cache_bytes) / 1e6:.1f} MB, "
+              f"evaluated_papers.json {len(evaluated_bytes) / 1e6:.1f} MB")
+        print(f"{'path':<18}" + ''.join(f"{phase:>17}" for phase in stdlib_phases(*args)) + f"{'total':>10}   output")
+        baseline = {phase: best_of(fn) for phase, fn in stdlib_phases(*args).items()}
+        expected = baseline['write evaluated'][1]
+        total = sum(seconds for seconds, _ in baseline.values())
+        print(f"{'stdlib (before)':<18}" + ''.join(f"{seconds:>16.3f}s" for seconds, _ in baseline.values())
+              + f"{total:>9.3f}s")
+        for name in paper_io.CODECS:
+            previous = paper_io.use_codec(name)
+            try:
+                timings = {phase: best_of(fn) for phase, fn in paper_io_phases(*args).items()}
+            finally:
+                paper_io.use_codec(previous)
+            stable = "byte-identical" if timings['write evaluated'][1] == expected else "DIFFERS"
+            cells = ''.join(f"{seconds:>9.3f}s ({baseline[phase][0] / seconds:>4.1f}x)"
+                            for phase, (seconds, _) in timings.items())
+            codec_total = sum(seconds for seconds, _ in timings.values())
+            print(f"{'paper_io/' + name:<18}{cells}{codec_total:>9.3f}s   {stable} ({total / codec_total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,55 @@
+"""
+Weekly Top Picks 渲染基准。
+
+用法: python benchmarks/bench_report.py [N ...]
+默认分别渲染 100 / 1000 / 5000 篇合成论文，输出耗时与每篇字节数。
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_template import render_report_section
+
+
+def make_papers(n, seed=0):
+    rng = random.Random(seed)
+    words = ["document", "vision", "language", "model", "layout", "OCR", "table", "<tag>", "&", "reasoning"]
+    papers = []
+    for i in range(n):
+        papers.append({
+            'id': f"http://arxiv.org/abs/2401.{i:05d}v{rng.randint(1, 3)}",
+            'title': " ".join(rng.choices(words, k=10)),
+            'title_zh': "文档理解中的视觉语言模型",
+            'authors': [f"Author {j}" for j in range(rng.randint(1, 8))],
+            'abstract': " ".join(rng.choices(words, k=150)),
+            'comment': "Accepted by CVPR 2024" if i % 3 == 0 else None,
+            'category': "cs.CV, cs.AI",
+            'score': rng.randint(0, 10),
+            'reason': "该方法可迁移到文档细粒度识别。" * 3,
+            'summary': "本文提出了一种新的方法。" * 5,
+            'keywords': ["VLM", "OCR", "Layout"],
+            'publication': "CVPR 2024" if i % 3 == 0 else "N/A",
+        })
+    papers.sort(key=lambda x: x['score'], reverse=True)
+    return papers
+
+
+def bench(n, repeat=3):
+    papers = make_papers(n)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html_out = render_report_section(papers)
+        best = min(best, time.perf_counter() - start)
+    size = len(html_out.encode('utf-8'))
+    print(f"N={n:>6}  render={best * 1000:8.1f} ms  per paper={best / n * 1e6:7.1f} us  "
+          f"bytes={size:>10}  bytes/paper={size // n}")
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [100, 1000, 5000]
+    for n in sizes:
+        bench(n)
@@ -0,0 +1,105 @@
+"""
+多端点路由基准：在本地替身端点 (benchmarks/llm_server.py) 上测 llm_router.py 的吞吐和故障规避。
+
+用法: python benchmarks/bench_router.py [--requests 60] [--qps 10] [--latency 0.2]
+  scaling: 1 / 2 / 4 个端点，每个端点限速 qps (超出返回 429)，吞吐应随端点数线性增长
+  degraded: 正常 / 慢 5 倍 / 一半请求 500 的三个端点，请求应偏向正常端点且全部成功
+需要 openai SDK；完全离线。
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI  # noqa: E402
+
+import llm_router  # noqa: E402
+from benchmarks.llm_server import serve  # noqa: E402
+
+WORKERS = 32
+
+
+def start_servers(specs):
+    """specs: [(qps, latency, fail_rate), ...]，返回 (servers, endpoints)"""
+    servers, endpoints = [], []
+    for i, (qps, latency, fail_rate) in enumerate(specs):
+        server = serve(0, qps, latency, fail_rate, seed=i, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        endpoints.append({'name': f"stand-in-{i}", 'base_url': f"http://127.0.0.1:{server.server_port}/v1",
+                          'api_key': "test"})
+    return servers, endpoints
+
+
+def stop_servers(servers):
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def route(endpoints):
+    # 走和 MYARXIV_ENDPOINTS 相同的解析路径 (校验、补缺省值)
+    return llm_router.make_router(OpenAI, llm_router.load_endpoints(json.dumps(endpoints)))
+
+
+def fire(client, n):
+    """并发发出 n 个评估请求，返回 (成功数, 耗时)"""
+    def one(i):
+        try:
+            client.chat.completions.create(model="qwen-plus", temperature=0.2,
+                                           messages=[{'role': 'user', 'content': f"paper {i}"}])
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        ok = sum(executor.map(one, range(n)))
+    return ok, time.perf_counter() - start
+
+
+def bench_scaling(requests, qps, latency):
+    print(f"\nscaling: {requests} requests, each endpoint limited to {qps} qps, {latency}s latency")
+    print(f"{'endpoints':>10}{'ok':>6}{'seconds':>10}{'req/s':>8}{'429s':>6}")
+    for count in (1, 2, 4):
+        servers, endpoints = start_servers([(qps, latency, 0.0)] * count)
+        for endpoint in endpoints:
+            endpoint['qps'] = qps
+        try:
+            client = route(endpoints)
+            ok, seconds = fire(client, requests)
+            rejected = sum(s.limits.counts[429] for s in servers)
+        finally:
+            stop_servers(servers)
+        print(f"{count:>10}{ok:>6}{seconds:>10.2f}{ok / seconds:>8.1f}{rejected:>6}")
+
+
+def bench_degraded(requests, latency):
+    print(f"\ndegraded: {requests} requests over a healthy, a 5x slower and a 50%-failing endpoint")
+    servers, endpoints = start_servers([(0, latency, 0.0), (0, latency * 5, 0.0), (0, latency, 0.5)])
+    try:
+        client = route(endpoints)
+        ok, seconds = fire(client, requests)
+    finally:
+        stop_servers(servers)
+    print(f"{ok}/{requests} succeeded in {seconds:.2f}s")
+    llm_router.print_endpoint_report([client.router])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark llm_router.py against local stand-in endpoints.")
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--qps', type=float, default=10)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    bench_scaling(args.requests, args.qps, args.latency)
+    bench_degraded(args.requests * 2, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+常驻服务基准：serve_v1.py 在合成夹具上的加载 / 建索引耗时、各接口的请求延迟，以及增量刷新的耗时。
+
+用法: python benchmarks/bench_serve.py [--papers 20000] [--requests 500]
+每类请求在一条 keep-alive 连接上顺序发送：首次 (按需计算并缓存)、重复 (缓存命中)、
+带 If-None-Match 的重验证 (304)，给出 p50 / p99。完全离线。
+"""
+import argparse
+import http.client
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serve_v1  # noqa: E402
+from benchmarks.fixtures import write_fixture  # noqa: E402
+from paper_io import dump, load  # noqa: E402
+
+DAYS = 7
+CATEGORIES = 3
+
+
+def timed_get(conn, path, etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    start = time.perf_counter()
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return time.perf_counter() - start, response.status, response.getheader('ETag')
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.99) - 1] * 1000
+
+
+def bench_paths(conn, label, paths):
+    first = [timed_get(conn, p) for p in paths]
+    repeat = [timed_get(conn, p) for p in paths]
+    revalidate = [timed_get(conn, p, etag) for p, (_, _, etag) in zip(paths, first)]
+    statuses = {status for _, status, _ in revalidate}
+    cells = ''.join(f"{p50:>10.2f}{p99:>8.2f}" for p50, p99 in
+                    (percentiles([s for s, _, _ in rows]) for rows in (first, repeat, revalidate)))
+    print(f"{label:<10}{len(paths):>6}{cells}   {'/'.join(map(str, sorted(statuses)))}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the serve_v1.py HTTP API on synthetic data.")
+    parser.add_argument('--papers', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="myarxiv-serve-")
+    try:
+        write_fixture(work, days=DAYS, categories=CATEGORIES,
+                      per_category=max(1, args.papers // (DAYS * CATEGORIES)))
+        target = os.path.join(work, "target")
+        store_file = os.path.join(work, "evaluations.json")
+
+        start = time.perf_counter()
+        server = serve_v1.serve(target, store_file, port=0, interval=0)
+        load_seconds = time.perf_counter() - start
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        service = server.service
+        snapshot = service['snapshot']
+        print(f"\n{len(snapshot['docs'])} papers, {len(snapshot['terms'])} terms: "
+              f"load + index {load_seconds:.2f}s")
+
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        days = sorted(snapshot['days'])
+        ids = list(snapshot['docs'])
+        terms = sorted(snapshot['terms'], key=lambda t: -len(snapshot['terms'][t]))
+        n = args.requests
+        print(f"{'query (ms)':<10}{'paths':>6}{'first p50':>10}{'p99':>8}{'hit p50':>10}{'p99':>8}"
+              f"{'304 p50':>10}{'p99':>8}   revalidate status")
+        bench_paths(conn, 'top day', [f"/api/top?day={days[i % len(days)]}&n={10 + i // len(days)}"
+                                      for i in range(min(n, 20 * len(days)))])
+        bench_paths(conn, 'top week', [f"/api/top?n={i + 1}" for i in range(min(n, 100))])
+        bench_paths(conn, 'paper', [f"/api/papers/{ids[i * 7 % len(ids)]}" for i in range(n)])
+        bench_paths(conn, 'search', [f"/api/search?q={quote(terms[i % len(terms)])}" for i in range(min(n, len(terms)))])
+
+        # 增量刷新：结果库里出现一篇新评估
+        key = ids[0]
+        paper = service['papers'][key]
+        dump({paper['id']: {'id': paper['id'], 'score': 10, 'reason': "bench", 'keywords': ["bench"]}},
+             store_file, indent=False)
+        start = time.perf_counter()
+        serve_v1.refresh(service)
+        refreshed = time.perf_counter() - start
+        _, _, etag = timed_get(conn, f"/api/papers/{key}")
+        assert load(store_file) and service['snapshot']['docs'][key]['score'] == 10
+        print(f"incremental refresh after a store update: {refreshed * 1000:.0f} ms (new ETag {etag})")
+        conn.close()
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
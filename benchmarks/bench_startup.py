@@ -0,0 +1,67 @@
+"""
+命令行启动耗时：myarxiv.py 的 --help / 各子命令的 --help，与直接导入原脚本 (连带 openai / bs4) 对比。
+
+用法: python benchmarks/bench_startup.py [--repeat 10]
+      python myarxiv.py bench startup
+每条命令在全新子进程中执行 repeat 次取中位数，并列出 myarxiv.py --help 之后已加载的重依赖。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MYARXIV = os.path.join(ROOT, "myarxiv.py")
+HEAVY_MODULES = ['openai', 'bs4', 'requests', 'tiktoken', 'msgspec', 'orjson']
+
+COMMANDS = [
+    ("python -c pass", ['-c', 'pass']),
+    ("myarxiv --help", [MYARXIV, '--help']),
+    ("myarxiv evaluate --help", [MYARXIV, 'evaluate', '--help']),
+    ("import extract_papers_v2", ['-c', 'import extract_papers_v2']),
+    ("import inject_html_v2 (bs4)", ['-c', 'import inject_html_v2']),
+    ("import evaluate_papers_v2.1 (openai)",
+     ['-c', 'import myarxiv; myarxiv.load_script("evaluate_papers_v2.1.py")']),
+]
+
+
+def time_command(args, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True)
+        samples.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None, result.stderr.decode('utf-8', 'replace').strip().splitlines()[-1]
+    return statistics.median(samples), None
+
+
+def loaded_after_help():
+    code = ("import sys, json, myarxiv\n"
+            "try:\n    myarxiv.main(['--help'])\nexcept SystemExit:\n    pass\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI startup time.")
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'command':<40}{'median ms':>10}")
+    for label, command in COMMANDS:
+        seconds, error = time_command(command, args.repeat)
+        if seconds is None:
+            print(f"{label:<40}{'failed':>10}   {error}")
+        else:
+            print(f"{label:<40}{seconds * 1000:>10.1f}")
+    heavy = loaded_after_help()
+    print(f"heavy modules loaded by myarxiv --help: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
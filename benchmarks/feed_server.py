@@ -0,0 +1,134 @@
+"""
+本地替身 arXiv API：用合成数据响应 fetch_arxiv_v1.py 的查询，完全离线。
+支持 search_query=cat:XX、start、max_results、按 lastUpdatedDate 倒序，以及 ETag / If-None-Match。
+
+用法: python benchmarks/feed_server.py [--port 8765] [--per-category 200]
+      python fetch_arxiv_v1.py --api-url http://127.0.0.1:8765/api/query
+POST /add?category=cs.AI&n=5 会在该分类最前面追加 n 篇新论文，用来模拟第二天的增量。
+"""
+import argparse
+import hashlib
+import html
+import os
+import random
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import CATEGORIES, make_paper  # noqa: E402
+
+FEED_HEAD = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+             'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+             '<title>arXiv Query</title><opensearch:totalResults>{total}</opensearch:totalResults>')
+
+
+def render_entry(p):
+    e = html.escape
+    comment = f'<arxiv:comment>{e(p["comment"])}</arxiv:comment>' if p['comment'] else ''
+    authors = ''.join(f'<author><name>{e(a)}</name></author>' for a in p['authors'])
+    return (f'<entry><id>{p["id"]}</id><updated>{p["updated"]}</updated><published>{p["published"]}</published>'
+            f'<title>{e(p["title"])}</title><summary>{e(p["summary"])}</summary>{authors}{comment}'
+            f'<link href="{p["id"]}" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="{p["pdf_url"]}" rel="related" type="application/pdf"/></entry>')
+
+
+class Feeds:
+    """每个分类一个按 updated 倒序的论文列表"""
+
+    def __init__(self, categories, per_category, seed=0):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.papers = {c: [] for c in categories}
+        for c in categories:
+            for _ in range(per_category):
+                self.add(c, day=1)
+
+    def add(self, category, day=0):
+        with self.lock:
+            self.counter += 1
+            paper = make_paper(self.rng, self.counter, day=day)
+            paper['updated'] = f"2026-10-{19 - day:02d}T{self.counter // 3600 % 24:02d}:" \
+                               f"{self.counter // 60 % 60:02d}:{self.counter % 60:02d}Z"
+            self.papers[category].insert(0, paper)
+
+    def etag(self, category):
+        newest = self.papers[category][0]['updated'] if self.papers[category] else ''
+        return '"' + hashlib.sha1(f"{category}{newest}{len(self.papers[category])}".encode()).hexdigest()[:16] + '"'
+
+
+def make_handler(feeds):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive，便于验证连接复用
+
+        def log_message(self, *args):
+            pass
+
+        def _category(self, query):
+            return query.get('search_query', query.get('category', ['']))[0].removeprefix('cat:')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            category = self._category(query)
+            if category not in feeds.papers:
+                self.send_error(400, f"unknown category {category!r}")
+                return
+            start = int(query.get('start', ['0'])[0])
+            size = int(query.get('max_results', ['10'])[0])
+            etag = feeds.etag(category)
+            if start == 0 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            papers = feeds.papers[category]
+            body = (FEED_HEAD.format(total=len(papers))
+                    + ''.join(render_entry(p) for p in papers[start:start + size]) + '</feed>').encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/atom+xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if start == 0:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            query = parse_qs(urlparse(self.path).query)
+            category = self._category(query)
+            if category not in feeds.papers:
+                self.send_error(400, f"unknown category {category!r}")
+                return
+            for _ in range(int(query.get('n', ['1'])[0])):
+                feeds.add(category)
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    return Handler
+
+
+def serve(port=8765, categories=3, per_category=200, seed=0):
+    feeds = Feeds(CATEGORIES[:categories], per_category, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(feeds))
+    print(f"Stand-in arXiv API on http://127.0.0.1:{server.server_port}/api/query "
+          f"({categories} categories x {per_category} papers)", flush=True)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic arXiv Atom feeds for offline fetcher testing.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--categories', type=int, default=3)
+    parser.add_argument('--per-category', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    try:
+        serve(args.port, args.categories, args.per_category, args.seed).serve_forever()
+    except KeyboardInterrupt:
+        pass
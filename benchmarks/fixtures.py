@@ -0,0 +1,174 @@
+"""
+合成数据生成器：生成与 arxivfeed 输出结构一致的 cache.json / index.html，
+以及 evaluated_papers.json 和周报片段，全部离线、可复现 (固定随机种子)。
+
+用法: python benchmarks/fixtures.py OUT_DIR [--days 7] [--categories 3] [--per-category 50]
+"""
+import argparse
+import datetime
+import html
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = ["cs.AI", "cs.CV", "cs.CL", "cs.LG", "cs.IR", "cs.RO", "cs.MM", "cs.HC"]
+WORDS = ("document vision language model layout OCR table reasoning agent retrieval token compression "
+         "multimodal benchmark dataset transformer diffusion grounding hallucination chart long-context").split()
+VENUES = ["CVPR 2025", "ICDAR 2025", "ACL 2025", "NeurIPS 2025", "EMNLP 2025"]
+LATEST_DAY = datetime.date(2026, 10, 19)
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _timestamp(day):
+    """最新一天往前数 day 天，arxivfeed 的时间戳格式"""
+    return f"{LATEST_DAY - datetime.timedelta(days=day)}T00:00:00Z"
+
+
+def make_paper(rng, index, version=1, day=0):
+    base = f"http://arxiv.org/abs/26{10 - day % 10:02d}.{index:05d}"
+    comment = None
+    if rng.random() < 0.4:
+        comment = f"Accepted by {rng.choice(VENUES)}. {rng.randint(8, 30)} pages"
+    return {
+        'id': f"{base}v{version}",
+        'title': _sentence(rng, rng.randint(6, 14)).title(),
+        'authors': [f"Author {rng.randint(1, 5000)}" for _ in range(rng.randint(1, 10))],
+        'summary': _sentence(rng, rng.randint(120, 220)) + " $O(n)$.",
+        'comment': comment,
+        'updated': _timestamp(day),
+        'published': _timestamp(day) if version == 1 else "2026-09-01T00:00:00Z",
+        'pdf_url': f"{base.replace('/abs/', '/pdf/')}v{version}",
+    }
+
+
+def make_cache(days=7, categories=3, per_category=50, revisions=0.05, cross_listings=0.15, seed=0):
+    """
+    days x categories x per_category 篇论文。
+    revisions: 以新版本号 (v2, v3...) 在更新的日期里再次出现的比例
+    cross_listings: 同一天同时挂在另一个分类下的比例
+    """
+    rng = random.Random(seed)
+    cats = CATEGORIES[:categories]
+    cache = {}
+    counter = 0
+    history = []  # (paper, 出现的天)，用来制造修订版本
+    for day in range(days - 1, -1, -1):  # 从最旧的一天开始，修订版本出现在更新的日期
+        key = _timestamp(day)
+        cache[key] = {c: [] for c in cats}
+        for cat in cats:
+            for _ in range(per_category):
+                if history and rng.random() < revisions:
+                    old = rng.choice(history)
+                    version = int(old['id'].rsplit('v', 1)[1]) + 1
+                    paper = dict(old, id=old['id'].rsplit('v', 1)[0] + f"v{version}",
+                                 updated=_timestamp(day))
+                else:
+                    counter += 1
+                    paper = make_paper(rng, counter, day=day)
+                cache[key][cat].append(paper)
+                history.append(paper)
+                if len(cats) > 1 and rng.random() < cross_listings:
+                    other = rng.choice([c for c in cats if c != cat])
+                    cache[key][other].append(dict(paper))
+    return dict(sorted(cache.items(), reverse=True))
+
+
+def make_evaluated(cache, seed=0):
+    """模拟 extract + evaluate 的输出：每篇论文一条带评分的记录"""
+    from extract_papers_v2 import get_base_id, remove_newlines
+    from highlight import parse_venue
+
+    rng = random.Random(seed + 1)
+    papers = {}
+    for day in cache.values():
+        for cat, plist in day.items():
+            for p in plist:
+                base_id = get_base_id(p['id'])
+                if base_id in papers:
+                    continue
+                papers[base_id] = {
+                    'id': p['id'], 'title': remove_newlines(p['title']), 'authors': p['authors'],
+                    'abstract': remove_newlines(p['summary']), 'comment': p['comment'], 'category': cat,
+                    'score': rng.randint(0, 10),
+                    'title_zh': "文档理解中的视觉语言模型",
+                    'reason': "该方法可迁移到文档细粒度识别。" * 2,
+                    'summary': "本文提出了一种新的方法。" * 4,
+                    'keywords': rng.sample(WORDS, 3),
+                    'publication': parse_venue(p['comment']) or "N/A",
+                }
+    return list(papers.values())
+
+
+def render_index(cache):
+    """按 includes/index.hbs 的结构生成 index.html (不做 rhai 高亮)"""
+    e = html.escape
+    out = ['<!DOCTYPE html><html lang="en"><head><title>MyArxiv</title></head><body>',
+           '<section class="header-container"><div class="header-title">MyArxiv</div></section>']
+    for date, subjects in cache.items():
+        out.append(f'<section class="day-container"><div class="date"><time datetime="{date}">{date[:10]}</time></div>')
+        for subject, papers in subjects.items():
+            out.append(f'<article><details><summary>{subject} <span class="chip" style="font-size: 60%">'
+                       f'{len(papers)}</span></summary><div class="details-content">')
+            for p in papers:
+                mark = "♻" if p['updated'] != p['published'] else ""
+                comment = ''
+                if p['comment']:
+                    comment = (f'<div class="article-summary-box-inner"><span class="chip">comment</span>: '
+                               f'<span>{e(p["comment"])}</span></div>')
+                out.append(
+                    f'<article><details class="article-expander"><summary class="article-expander-title">'
+                    f'{mark} ☆ {e(p["title"])}</summary><div class="article-authors">'
+                    f'<a href="{p["id"]}"><i class="ri-links-line"></i></a>'
+                    f'<a href="{p["pdf_url"]}"><i class="ri-file-paper-2-line"></i></a>'
+                    f'{e(", ".join(p["authors"]))}</div><div class="article-summary-box-inner">'
+                    f'<span>{e(p["summary"])}</span></div>{comment}</details></article>')
+            out.append('</div></details></article>')
+        out.append('</section>')
+    out.append('<footer></footer><script src="index.js"></script></body></html>')
+    return '\n'.join(out)
+
+
+def write_fixture(out_dir, **kwargs):
+    """写出 target/ 结构的完整夹具，返回论文总数"""
+    from inject_html_v2 import REPORT_HTML, select_report_papers
+    from report_template import render_report_section
+
+    target = os.path.join(out_dir, "target")
+    os.makedirs(os.path.join(target, os.path.dirname(REPORT_HTML)), exist_ok=True)
+    cache = make_cache(**kwargs)
+    evaluated = make_evaluated(cache, seed=kwargs.get('seed', 0))
+
+    with open(os.path.join(target, "cache.json"), 'w') as f:
+        json.dump(cache, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(target, "evaluated_papers.json"), 'w') as f:
+        json.dump(evaluated, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(target, "index.html"), 'w') as f:
+        f.write(render_index(cache))
+
+    top, rest = select_report_papers(evaluated)
+    with open(os.path.join(target, REPORT_HTML), 'w') as f:
+        f.write(render_report_section(top, rest_count=len(rest)))
+
+    return sum(len(p) for day in cache.values() for p in day.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic cache.json / index.html fixtures.")
+    parser.add_argument('out_dir')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--categories', type=int, default=3)
+    parser.add_argument('--per-category', type=int, default=50)
+    parser.add_argument('--revisions', type=float, default=0.05)
+    parser.add_argument('--cross-listings', type=float, default=0.15)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    total = write_fixture(args.out_dir, days=args.days, categories=args.categories,
+                          per_category=args.per_category, revisions=args.revisions,
+                          cross_listings=args.cross_listings, seed=args.seed)
+    print(f"Wrote fixture with {total} paper entries to {args.out_dir}/target")
@@ -0,0 +1,117 @@
+"""
+本地替身 LLM 端点 (OpenAI 兼容的 POST /v1/chat/completions)：按 prompt 哈希给出确定的评估 JSON，完全离线。
+可以模拟服务商的 QPS 限制 (超出时返回 429)、固定延迟和一定比例的 500 错误，用来测试 llm_router.py。
+
+用法: python benchmarks/llm_server.py [--port 8770] [--qps 5] [--latency 0.2] [--fail-rate 0]
+      MYARXIV_ENDPOINTS='[{"base_url": "http://127.0.0.1:8770/v1", "api_key": "test"}]' \\
+      python evaluate_papers_v2.1.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_completion(model, messages):
+    digest = hashlib.sha1(messages[-1]['content'].encode('utf-8')).hexdigest()
+    evaluation = {'score': int(digest[:4], 16) % 11, 'title_zh': "标题", 'reason': "stand-in",
+                  'summary': "stand-in", 'keywords': ["stand-in"]}
+    return {
+        'id': f"chatcmpl-{digest[:12]}", 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+        'choices': [{'index': 0, 'finish_reason': 'stop',
+                     'message': {'role': 'assistant', 'content': json.dumps(evaluation, ensure_ascii=False)}}],
+        'usage': {'prompt_tokens': 1200, 'completion_tokens': 300, 'total_tokens': 1500},
+    }
+
+
+class Limits:
+    """服务端状态：QPS 令牌桶、故障注入和请求计数"""
+
+    def __init__(self, qps=0, latency=0.2, fail_rate=0.0, seed=0):
+        self.qps = qps
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = float(max(qps, 1))
+        self.refilled = time.monotonic()
+        self.counts = {200: 0, 429: 0, 500: 0}
+
+    def admit(self):
+        """返回这次请求的状态码"""
+        with self.lock:
+            if self.qps > 0:
+                now = time.monotonic()
+                self.tokens = min(float(max(self.qps, 1)), self.tokens + (now - self.refilled) * self.qps)
+                self.refilled = now
+                if self.tokens < 1:
+                    self.counts[429] += 1
+                    return 429
+                self.tokens -= 1
+            status = 500 if self.rng.random() < self.fail_rate else 200
+            self.counts[status] += 1
+            return status
+
+
+def make_handler(limits):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not self.path.endswith('/chat/completions'):
+                self._reply(404, {'error': {'message': f"unknown path {self.path}"}})
+                return
+            if not request.get('messages'):
+                self._reply(400, {'error': {'message': "messages is required"}})
+                return
+            status = limits.admit()
+            if status == 429:
+                self._reply(429, {'error': {'message': "rate limit exceeded", 'type': 'rate_limit_error'}})
+                return
+            time.sleep(limits.latency)
+            if status == 500:
+                self._reply(500, {'error': {'message': "injected failure"}})
+                return
+            self._reply(200, make_completion(request.get('model', ''), request['messages']))
+
+    return Handler
+
+
+def serve(port=8770, qps=0, latency=0.2, fail_rate=0.0, seed=0, quiet=False):
+    limits = Limits(qps, latency, fail_rate, seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(limits))
+    server.daemon_threads = True
+    server.limits = limits
+    if not quiet:
+        print(f"Stand-in LLM endpoint on http://127.0.0.1:{server.server_port}/v1 "
+              f"(qps {qps or 'unlimited'}, latency {latency}s, fail rate {fail_rate:.0%})", flush=True)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an OpenAI-compatible stand-in endpoint for router testing.")
+    parser.add_argument('--port', type=int, default=8770)
+    parser.add_argument('--qps', type=float, default=0, help="rate limit, 429 above it (0 = unlimited)")
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds per request")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    try:
+        serve(args.port, args.qps, args.latency, args.fail_rate, args.seed).serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,166 @@
+"""
+extract / inject / restore / sort 各阶段在不同数据规模下的耗时与峰值内存。
+
+用法: python benchmarks/run_benchmarks.py [--sizes 1000 10000 100000] [--stages ...]
+
+每个 (阶段, 规模) 都在独立子进程中、在全新的夹具副本上运行：耗时由子进程内部计时，
+峰值内存取子进程的 ru_maxrss。结果追加到 benchmarks/results.jsonl (带 git commit)，
+并与上一次记录的同阶段同规模结果对比，方便发现回退。完全离线。
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixtures import write_fixture  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results.jsonl")
+DAYS = 7
+CATEGORIES = 3
+
+
+# ================= 各阶段 (在夹具目录中执行) =================
+
+def stage_extract():
+    from extract_papers_v2 import process_cache_file
+    process_cache_file("target/cache.json", "target/latest_papers.json")
+
+
+def stage_inject():
+    import inject_html_v2
+    inject_html_v2.main("target/evaluated_papers.json", "target/index.html")
+
+
+def stage_restore():
+    from restore_report import restore_weekly_report
+    restore_weekly_report("target/report/weekly_report.html", "target/index.html")
+
+
+def stage_sort_v1():
+    from html_pipeline import load_html, make_context, write_html
+    from sort_papers_v1 import sort_latest_day
+    ctx = make_context("target")
+    soup = load_html(ctx)
+    sort_latest_day(soup, ctx)
+    write_html(soup, ctx)
+
+
+def stage_sort_v2():
+    from html_pipeline import load_html, make_context, write_html
+    from sort_papers_v2 import sort_articles
+    ctx = make_context("target")
+    soup = load_html(ctx)
+    sort_articles(soup, ctx)
+    write_html(soup, ctx)
+
+
+STAGES = {
+    'extract': stage_extract,
+    'inject': stage_inject,
+    'restore': stage_restore,
+    'sort_v1': stage_sort_v1,
+    'sort_v2': stage_sort_v2,
+}
+
+
+def run_child(stage, fixture_dir):
+    """子进程入口：执行阶段并在最后一行输出耗时"""
+    os.chdir(fixture_dir)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        STAGES[stage]()
+        elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed}))
+
+
+# ================= 调度 =================
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, fixture_dir):
+    work = tempfile.mkdtemp(prefix=f"bench-{stage}-")
+    try:
+        shutil.copytree(os.path.join(fixture_dir, "target"), os.path.join(work, "target"))
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--run-stage', stage, work],
+                                   stdout=subprocess.PIPE, text=True)
+        output = process.stdout.read()
+        _, status, usage = os.wait4(process.pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            raise RuntimeError(f"stage {stage} failed")
+        seconds = json.loads(output.strip().splitlines()[-1])['seconds']
+        return seconds, usage.ru_maxrss / 1024
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def last_results():
+    previous = {}
+    if os.path.exists(RESULTS_FILE):
+        with open(RESULTS_FILE, 'r') as f:
+            for line in f:
+                if line.strip():
+                    r = json.loads(line)
+                    previous[(r['stage'], r['papers'])] = r
+    return previous
+
+
+def main(sizes, stages):
+    previous = last_results()
+    commit = git_commit()
+    print(f"{'stage':<10}{'papers':>9}{'seconds':>10}{'peak MB':>10}   vs previous")
+    with open(RESULTS_FILE, 'a') as results:
+        for size in sizes:
+            fixture_dir = tempfile.mkdtemp(prefix="bench-fixture-")
+            try:
+                total = write_fixture(fixture_dir, days=DAYS, categories=CATEGORIES,
+                                      per_category=max(1, size // (DAYS * CATEGORIES)))
+                for stage in stages:
+                    seconds, rss = measure(stage, fixture_dir)
+                    record = {
+                        'stage': stage, 'papers': size, 'entries': total,
+                        'seconds': round(seconds, 4), 'peak_rss_mb': round(rss, 1),
+                        'commit': commit, 'python': sys.version.split()[0],
+                        'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                    }
+                    results.write(json.dumps(record) + '\n')
+                    results.flush()
+
+                    prev = previous.get((stage, size))
+                    delta = ''
+                    if prev and prev['seconds']:
+                        delta = (f"{(seconds / prev['seconds'] - 1) * 100:+.0f}% time, "
+                                 f"{(rss / prev['peak_rss_mb'] - 1) * 100:+.0f}% mem (@{prev['commit']})")
+                    print(f"{stage:<10}{size:>9}{seconds:>10.3f}{rss:>10.1f}   {delta}", flush=True)
+            finally:
+                shutil.rmtree(fixture_dir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the extract, inject, restore and sort stages.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--run-stage', nargs=2, metavar=('STAGE', 'DIR'), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.run_stage:
+        run_child(*args.run_stage)
+    else:
+        main(args.sizes, args.stages)
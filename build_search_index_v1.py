@@ -0,0 +1,150 @@
+import os
+import re
+from collections import defaultdict
+
+from extract_papers_v2 import get_base_id, remove_newlines
+from inject_html_v2 import REPORT_JSON, REST_FILE
+from paper_io import dump, load, load_cache
+from profiling import profiled, span
+
+# ================= 配置区域 =================
+# 索引输出目录 (相对 target/)
+SEARCH_DIR = "search"
+# 各字段的权重：命中标题/关键词比命中摘要更重要
+FIELD_WEIGHTS = {
+    'title': 3,
+    'title_zh': 3,
+    'keywords': 3,
+    'authors': 2,
+    'abstract': 1,
+}
+
+# ================= 分词 =================
+# statics/index.js 中的 tokenize()/shardKey() 与这里保持完全一致
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "this to we with via our which can these their than".split()
+)
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[一-鿿]+')
+
+
+def tokenize(text):
+    """英文按单词切分，中文按相邻两字 (bigram) 切分"""
+    tokens = []
+    for m in _TOKEN_RE.finditer(text.lower()):
+        word = m.group()
+        if word[0] >= '一':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1 and word not in STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+
+def shard_key(term):
+    """英文词按前两个字符分片 (便于前缀匹配)，中文词按首字哈希到 16 个分片"""
+    if term[0] >= '一':
+        return f"zh{ord(term[0]) % 16}"
+    return term[:2]
+
+
+# ================= 构建索引 =================
+
+def collect_papers(cache_data, evaluated_papers):
+    """合并窗口内的所有论文 (按基础 ID 去重)，并附上 LLM 评估字段"""
+    evaluations = {get_base_id(p['id']): p for p in evaluated_papers}
+    docs = {}
+    for date in sorted(cache_data.keys(), reverse=True):
+        for papers in cache_data[date].values():
+            for paper in papers:
+                base_id = get_base_id(paper['id'])
+                if base_id in docs:
+                    continue
+                evaluation = evaluations.get(base_id, {})
+                docs[base_id] = {
+                    'id': paper['id'],
+                    'date': date[:10],
+                    'title': remove_newlines(paper.get('title')),
+                    'abstract': remove_newlines(paper.get('summary') or paper.get('abstract')),
+                    'authors': ' '.join(paper.get('authors') or []),
+                    'title_zh': evaluation.get('title_zh', ''),
+                    'keywords': ' '.join(evaluation.get('keywords') or []),
+                    'score': evaluation.get('score') if isinstance(evaluation.get('score'), int) else None,
+                }
+    return list(docs.values())
+
+
+def build_postings(docs):
+    """term -> [(doc_index, weight), ...]，doc_index 递增"""
+    postings = defaultdict(list)
+    for index, doc in enumerate(docs):
+        weights = defaultdict(int)
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(doc[field] or ''):
+                weights[token] += field_weight
+        for term, weight in weights.items():
+            postings[term].append((index, weight))
+    return postings
+
+
+def encode_postings(plist):
+    """压缩成扁平数组 [doc 差值, 权重, doc 差值, 权重, ...]"""
+    flat = []
+    previous = 0
+    for doc_index, weight in plist:
+        flat.append(doc_index - previous)
+        flat.append(weight)
+        previous = doc_index
+    return flat
+
+
+def write_index(docs, postings, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+
+    shards = defaultdict(dict)
+    for term, plist in postings.items():
+        shards[shard_key(term)][term] = encode_postings(plist)
+
+    for key, terms in shards.items():
+        dump(terms, os.path.join(out_dir, f"{key}.json"), indent=False)
+
+    # 文档表：[id, 标题, 中文标题, 分数, 日期]，结果列表只需要这些
+    doc_table = [[d['id'], d['title'], d['title_zh'], d['score'], d['date']] for d in docs]
+    dump(doc_table, os.path.join(out_dir, "docs.json"), indent=False)
+    dump({'docs': len(docs), 'terms': len(postings), 'shards': sorted(shards)},
+         os.path.join(out_dir, "meta.json"), indent=False)
+    return len(shards)
+
+
+@profiled("search_index")
+def main(cache_file, evaluated_file, target_dir):
+    with span("load"):
+        cache_data = load_cache(cache_file)
+
+    evaluated_papers = []
+    if os.path.exists(evaluated_file):
+        evaluated_papers = load(evaluated_file)
+    elif os.path.exists(os.path.join(target_dir, REPORT_JSON)):
+        # 非周日没有 evaluated_papers.json，用恢复回来的周报产物补上评分
+        evaluated_papers = load(os.path.join(target_dir, REPORT_JSON))['top']
+        rest_file = os.path.join(target_dir, REST_FILE)
+        if os.path.exists(rest_file):
+            evaluated_papers += load(rest_file)
+    else:
+        print(f"未找到 {evaluated_file}，索引中不包含 LLM 评估字段。")
+
+    with span("dedup"):
+        docs = collect_papers(cache_data, evaluated_papers)
+    with span("index"):
+        postings = build_postings(docs)
+    with span("write"):
+        shard_count = write_index(docs, postings, os.path.join(target_dir, SEARCH_DIR))
+
+    print(f"Search index: {len(docs)} papers, {len(postings)} terms, {shard_count} shards.")
+
+
+if __name__ == "__main__":
+    main("target/cache.json", "target/evaluated_papers.json", "target")
@@ -0,0 +1,230 @@
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+try:
+    import brotli
+except ImportError:  # 没装 brotli 时只生成 .gz
+    brotli = None
+
+from profiling import profiled, span
+
+# ================= 配置区域 =================
+# 小于该字节数的文件不生成压缩副本 (压缩收益抵不过一次额外的请求协商)
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# ================= 压缩器 =================
+# 全部是保守的压缩：只去掉注释和多余空白，不改写任何语义；字符串 (以及 JS 的模板字符串、
+# 正则字面量) 原样保留
+
+# <script>/<style>/<pre>/<textarea> 里的空白有意义，原样保留
+_HTML_RAW_RE = re.compile(r'(<(script|style|pre|textarea)\b.*?</\2\s*>)', re.S | re.I)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+_WHITESPACE_RE = re.compile(r'\s+')
+# CSS 的注释和字符串一起匹配，注释里的引号、字符串里的 /* 都不会误判
+_CSS_TOKEN_RE = re.compile(r'(/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', re.S)
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,])\s*')
+_CSS_COLON_RE = re.compile(r':\s+')
+# 正则字面量只会出现在这些字符或关键字之后，其余位置的 / 是除号
+_JS_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};+-*%~^<>')
+_JS_REGEX_KEYWORDS = frozenset(('return', 'typeof', 'case', 'delete', 'void', 'throw', 'in', 'of', 'new',
+                                'instanceof', 'yield', 'await', 'else', 'do'))
+
+
+def minify_html(text):
+    parts = _HTML_RAW_RE.split(text)
+    out = []
+    # split 带两个分组：[普通, 原样块, 标签名, 普通, 原样块, 标签名, ...]
+    for i in range(0, len(parts), 3):
+        chunk = _HTML_COMMENT_RE.sub('', parts[i])
+        out.append(_WHITESPACE_RE.sub(' ', chunk))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out).strip()
+
+
+def minify_css(text):
+    # 先去掉注释 (保留字符串)，再只在字符串之外压缩空白和标点
+    text = _CSS_TOKEN_RE.sub(lambda m: '' if m.group().startswith('/*') else m.group(), text)
+    parts = _CSS_TOKEN_RE.split(text)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.append(part)
+            continue
+        part = _WHITESPACE_RE.sub(' ', part)
+        part = _CSS_PUNCT_RE.sub(r'\1', part)
+        out.append(_CSS_COLON_RE.sub(':', part).replace(';}', '}'))
+    return ''.join(out).strip()
+
+
+def _skip_string(text, i):
+    """i 指向开头的引号 (' " `)，返回结尾引号之后的位置；模板字符串里嵌套的 ` 不处理"""
+    quote = text[i]
+    i += 1
+    while i < len(text):
+        if text[i] == '\\':
+            i += 2
+        elif text[i] == quote:
+            return i + 1
+        else:
+            i += 1
+    return len(text)
+
+
+def _skip_regex(text, i):
+    """i 指向正则字面量开头的 /，返回标志位之后的位置"""
+    in_class = False
+    i += 1
+    while i < len(text) and text[i] != '\n':
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            i += 1
+            while i < len(text) and (text[i].isalnum() or text[i] in '_$'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def minify_js(text):
+    """
+    逐个词法单元扫描：跳过字符串、模板字符串和正则字面量，删除其中之外的注释，
+    把连续的空白 (含注释) 压成一个空格；其中有换行时保留一个换行，不破坏自动分号插入。
+    """
+    out = []
+    last = ''    # 上一个输出的非空白字符
+    word = ''    # 上一个输出的单元是标识符时记下它 (return /re/ 这类情况)
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c.isspace() or text.startswith('/*', i) or text.startswith('//', i):
+            newline = False
+            while i < n:
+                if text[i].isspace():
+                    newline = newline or text[i] == '\n'
+                    i += 1
+                elif text.startswith('/*', i):
+                    end = text.find('*/', i + 2)
+                    end = n if end == -1 else end + 2
+                    newline = newline or '\n' in text[i:end]
+                    i = end
+                elif text.startswith('//', i):
+                    end = text.find('\n', i)
+                    i = n if end == -1 else end
+                else:
+                    break
+            if out and i < n:
+                out.append('\n' if newline else ' ')
+            continue
+        if c in '\'"`':
+            end = _skip_string(text, i)
+        elif c == '/' and (not last or last in _JS_REGEX_PRECEDERS or word in _JS_REGEX_KEYWORDS):
+            end = _skip_regex(text, i)
+        elif c.isalnum() or c in '_$':
+            end = i
+            while end < n and (text[end].isalnum() or text[end] in '_$'):
+                end += 1
+            word = text[i:end]
+            out.append(word)
+            last = text[end - 1]
+            i = end
+            continue
+        else:
+            end = i + 1
+        out.append(text[i:end])
+        last = text[end - 1]
+        word = ''
+        i = end
+    return ''.join(out)
+
+
+def minify_json(text):
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':'))
+
+
+MINIFIERS = {
+    '.html': minify_html,
+    '.css': minify_css,
+    '.js': minify_js,
+    '.json': minify_json,
+}
+
+
+# ================= 处理流程 =================
+
+def process_file(path):
+    """压缩单个文件并生成 .gz/.br，返回 (原始, 压缩后, gzip, brotli) 字节数"""
+    with open(path, 'r', encoding='utf-8') as f:
+        original = f.read()
+    minified = MINIFIERS[os.path.splitext(path)[1]](original)
+    data = minified.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    gz_size = br_size = len(data)
+    if len(data) >= MIN_COMPRESS_SIZE:
+        gz = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gz)
+        gz_size = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=BROTLI_QUALITY)
+            with open(path + '.br', 'wb') as f:
+                f.write(br)
+            br_size = len(br)
+    return len(original.encode('utf-8')), len(data), gz_size, br_size
+
+
+def artifact_name(target_dir, path):
+    """顶层文件单独统计，子目录 (data/, search/ 等分片) 合并为一行"""
+    rel = os.path.relpath(path, target_dir)
+    head = rel.split(os.sep, 1)[0]
+    return rel if head == rel else head + '/'
+
+
+@profiled("compress")
+def main(target_dir):
+    start = time.time()
+    totals = {}
+    for root, _, files in os.walk(target_dir):
+        for name in files:
+            if os.path.splitext(name)[1] not in MINIFIERS:
+                continue
+            path = os.path.join(root, name)
+            with span(os.path.splitext(name)[1]):
+                sizes = process_file(path)
+            row = totals.setdefault(artifact_name(target_dir, path), [0, 0, 0, 0, 0])
+            row[0] += 1
+            for i, size in enumerate(sizes):
+                row[i + 1] += size
+
+    if not totals:
+        print(f"{target_dir} 中没有可压缩的文件。")
+        return
+
+    print(f"{'artifact':<28}{'files':>6}{'original':>12}{'minified':>12}{'gzip':>12}{'brotli':>12}")
+    grand = [0, 0, 0, 0, 0]
+    for name in sorted(totals):
+        row = totals[name]
+        grand = [a + b for a, b in zip(grand, row)]
+        print(f"{name:<28}{row[0]:>6}{row[1]:>12}{row[2]:>12}{row[3]:>12}{row[4] if brotli else '-':>12}")
+    print(f"{'TOTAL':<28}{grand[0]:>6}{grand[1]:>12}{grand[2]:>12}{grand[3]:>12}{grand[4] if brotli else '-':>12}")
+    print(f"Static output compressed in {time.time() - start:.2f}s"
+          f"{'' if brotli else ' (brotli not installed, .br skipped)'}.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "target")
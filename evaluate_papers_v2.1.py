@@ -1,10 +1,18 @@
 import os
-import json
+import math
+import statistics
+import threading
 import time
 import concurrent.futures
 from openai import OpenAI
 from requests.exceptions import RequestException
 
+from llm_cassette import CassetteMiss, wrap_client
+from llm_router import load_endpoints, make_client as make_routed_client, print_endpoint_report
+from paper_io import PAPER_SCHEMA, dump, load, parse_evaluation
+from preflight_v1 import append_history
+from profiling import profiled, span
+
 # 填写API的密钥
 API_KEY = os.getenv("API_KEY")
 
@@ -12,6 +20,36 @@ API_KEY = os.getenv("API_KEY")
 MODEL_NAME = "qwen-plus"
 MAX_WORKERS = 100  # 并发线程数 (Qwen-plus 的 QPS 限制通常允许 5-10 并发)
 RETRY_LIMIT = 3   # 失败重试次数
+# 全局请求速率上限 (次/秒)，0 表示不限制；滚动评估时用它把请求压在服务商的 QPS 限制以下
+QPS_LIMIT = float(os.getenv("QPS_LIMIT", "0"))
+# 配置了 MYARXIV_ENDPOINTS 时由 llm_router 按端点各自限速，全局上限不再生效，否则会把多个端点压回一个的吞吐
+if load_endpoints():
+    QPS_LIMIT = 0
+
+# ================= 模型级联 (可选) =================
+# 设置环境变量 CASCADE=1 开启：第一级 (便宜、快) 模型给所有论文打分，之后每一级只重评
+# 上一级分数落在 escalate 区间 (含两端) 内的论文。价格单位：元 / 百万 tokens，只用于统计成本。
+# 关闭时所有论文只用 MODEL_NAME 评一次。
+CASCADE = os.getenv("CASCADE", "0") == "1"
+CASCADE_TIERS = [
+    {'model': "qwen-turbo", 'input_price': 0.3, 'output_price': 0.6},
+    {'model': MODEL_NAME, 'input_price': 0.8, 'output_price': 2.0, 'escalate': (4, 10)},
+]
+
+# ================= 自洽采样 (可选) =================
+# 设置环境变量 SELF_CONSISTENCY=1 开启：首个样本落在临界区间的论文再多采几次，取中位数。
+# 样本互相一致 (极差不超过 AGREEMENT_TOLERANCE)，或均值的 95% 置信区间已经整体落在
+# REPORT_THRESHOLD 一侧时提前停止，额外调用只花在会改变结果的论文上。
+SELF_CONSISTENCY = os.getenv("SELF_CONSISTENCY", "0") == "1"
+BORDERLINE_SCORES = range(5, 9)   # 首个样本为 5-8 分时追加采样
+REPORT_THRESHOLD = 6.5            # 关心的分界线：6 分以下 / 7 分以上
+AGREEMENT_TOLERANCE = 1
+MAX_SAMPLES = 7
+SAMPLE_BATCH = 2                  # 每轮并行追加的样本数
+SAMPLE_WORKERS = 16               # 所有论文的追加样本共用的线程数上限
+SAMPLE_TEMPERATURE = 0.7          # 开启后所有样本 (包括首个) 都用这个温度，温度太低样本之间几乎没有差异
+# t 分布 97.5% 分位数，按自由度
+T_975 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262}
 
 # ================= 提示词模板 (保持不变) =================
 # 自定义的提示模板
@@ -50,11 +88,6 @@ PROMPT_TEMPLATE = """
     *   **Agent / Workflow**：能解决长文档阅读、多步信息检索过程中迷失问题的**Agent架构设计**（而非某个垂类Agent应用）。
     *   **Intervention / Steering**：推理阶段的干预或引导技术（作为一种可能的工具）。
 
-### ❌ 这是一个发表信息提取任务
-*   **Publication字段**：**仅**允许从 `comment` 字段提取！
-*   **严禁**将 `category`（如 "cs.CV", "Computer Vision and Pattern Recognition"）当作发表信息。
-*   如果 `comment` 为空或未提及会议/期刊，必须返回 "N/A"。
-
 ### 📝 打分参考 (0-10)
 *   **9-10 (Must Read)**：DIU的SOTA工作；或者上游领域具有**范式转移（Paradigm Shift）**意义的底层创新（如Visual Token Compression的开山之作，或推理Scaling的新原理）。
 *   **7-8 (Strong)**：扎实的DIU工作；或者能明显看到对DIU有迁移价值的上游新方法（如一种新的VQA去幻觉策略）。
@@ -70,7 +103,6 @@ PROMPT_TEMPLATE = """
     *   **上游论文**：**核心必须解释该方法如何迁移到DIU领域**（例如：“该VLM分辨率处理方法可直接用于提升文档细粒度识别”）。
 4.  **Summary**: 中文总结。
 5.  **Keywords**: 3-5个关键词。
-6.  **Publication**: 提取会议/期刊。
 
 论文信息：
 title：{title}
@@ -89,8 +121,7 @@ JSON_RESPONSE_TEMPLATE = """
   "title_zh": "中文标题",
   "reason": "xxx",
   "summary": "xxx",
-  "keywords": ["word1", "word2"],
-  "publication": "xxx"
+  "keywords": ["word1", "word2"]
 }
 """
 
@@ -101,47 +132,68 @@ def clean_json_response(response):
         return response[start_index:end_index]
     return None
 
-def process_single_paper(client, paper):
-    """处理单篇论文的函数，包含重试机制"""
-    prompt = PROMPT_TEMPLATE.format(
-        title=paper['title'],
-        authors=', '.join(paper['authors']) if isinstance(paper['authors'], list) else paper['authors'],
-        abstract=paper['abstract'],
-        comment=paper.get('comment', ''),
-        category=paper['category'],
-    ) + JSON_RESPONSE_TEMPLATE
+usage_stats = {}  # model -> {'calls', 'prompt_tokens', 'completion_tokens'}
+_usage_lock = threading.Lock()
+
+
+def record_usage(model, completion):
+    usage = getattr(completion, 'usage', None)
+    with _usage_lock:
+        stat = usage_stats.setdefault(model, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+        stat['calls'] += 1
+        if usage is not None:
+            stat['prompt_tokens'] += usage.prompt_tokens or 0
+            stat['completion_tokens'] += usage.completion_tokens or 0
+
+
+_rate_lock = threading.Lock()
+_next_slot = [0.0]
 
+
+def throttle():
+    """按 QPS_LIMIT 给每个请求分配发送时间片，所有线程共用"""
+    if QPS_LIMIT <= 0:
+        return
+    with _rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_slot[0])
+        _next_slot[0] = slot + 1.0 / QPS_LIMIT
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def request_evaluation(client, paper, prompt, temperature=0.2, model=MODEL_NAME):
+    """请求一次评估，包含重试机制；全部失败返回 None"""
     for attempt in range(RETRY_LIMIT):
         try:
-            completion = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {'role': 'system', 'content': 'You are a critical academic reviewer.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                temperature=0.2
-            )
-            print(completion)
+            throttle()
+            with span("request"):
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {'role': 'system', 'content': 'You are a critical academic reviewer.'},
+                        {'role': 'user', 'content': prompt}
+                    ],
+                    temperature=temperature
+                )
+            record_usage(model, completion)
             content = completion.choices[0].message.content
             cleaned_json = clean_json_response(content)
             
             if cleaned_json:
                 try:
-                    eval_data = json.loads(cleaned_json)
-                    # 返回评估结果字典
-                    return {
-                        "score": eval_data.get('score', 0),
-                        "title_zh": eval_data.get('title_zh', ''),
-                        "reason": eval_data.get('reason', 'N/A'),
-                        "summary": eval_data.get('summary', 'N/A'),
-                        "keywords": eval_data.get('keywords', []),
-                        "publication": eval_data.get('publication', 'N/A')
-                    }
-                except json.JSONDecodeError:
-                    print(f"JSON解析失败 (Attempt {attempt+1}): {paper['title'][:30]}...")
+                    # 返回评估结果字典 (类型不对时按解析失败重试)
+                    with span("parse"):
+                        return parse_evaluation(cleaned_json)
+                except ValueError as e:
+                    print(f"JSON解析失败 (Attempt {attempt+1}): {paper['title'][:30]}... {e}")
             else:
                 print(f"未找到JSON (Attempt {attempt+1}): {paper['title'][:30]}...")
         
+        except CassetteMiss as e:
+            # 回放模式下磁带里没有这个请求，重试没有意义
+            print(f"回放失败: {paper['title'][:30]}... {e}")
+            return None
         except Exception as e:
             # 只有在最后一次重试失败时才打印错误，避免刷屏
             if attempt == RETRY_LIMIT - 1:
@@ -151,57 +203,212 @@ def process_single_paper(client, paper):
     # 如果所有重试都失败，返回空结果
     return None
 
-def main(input_file, output_file):
-    # 初始化客户端 (注意：openai >= 1.0.0 客户端是线程安全的，但为了保险可以在线程内创建，
-    # 不过通常全局共享一个client配合多线程也是OK的，这里为了简单在主线程创建)
-    client = OpenAI(
-        api_key=API_KEY,
-        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-    )
 
-    with open(input_file, 'r') as f:
-        papers = json.load(f)
-    
-    if not papers:
-        print("没有论文需要评估。")
-        return
+sampling_stats = {'papers': 0, 'extra_calls': 0, 'changed': 0}
+_stats_lock = threading.Lock()
 
-    print(f"准备评估 {len(papers)} 篇论文，使用 {MAX_WORKERS} 个并发线程...")
+
+def is_settled(scores):
+    """样本已经足够：互相一致，或置信区间不跨过 REPORT_THRESHOLD"""
+    if len(scores) < 3:
+        return False
+    if max(scores) - min(scores) <= AGREEMENT_TOLERANCE:
+        return True
+    mean = statistics.mean(scores)
+    half_width = T_975.get(len(scores) - 1, 1.96) * statistics.stdev(scores) / math.sqrt(len(scores))
+    return mean - half_width > REPORT_THRESHOLD or mean + half_width < REPORT_THRESHOLD
+
+
+_sample_executor = []
+
+
+def sample_executor():
+    """追加样本共用一个有上限的线程池；每篇论文各开一个的话，外层 MAX_WORKERS 个线程会再乘上 SAMPLE_BATCH"""
+    with _stats_lock:
+        if not _sample_executor:
+            _sample_executor.append(concurrent.futures.ThreadPoolExecutor(max_workers=SAMPLE_WORKERS))
+        return _sample_executor[0]
+
+
+def refine_score(client, paper, prompt, first, model=MODEL_NAME):
+    """临界论文追加并行采样，返回以中位数为分数的结果，并记录样本和方差"""
+    samples = [first]
+    scores = [first['score']]
+    executor = sample_executor()
+    while len(samples) < MAX_SAMPLES and not is_settled(scores):
+        n = min(SAMPLE_BATCH, MAX_SAMPLES - len(samples))
+        batch = [r for r in executor.map(lambda _: request_evaluation(client, paper, prompt, SAMPLE_TEMPERATURE, model),
+                                         range(n)) if r and isinstance(r['score'], int)]
+        with _stats_lock:
+            sampling_stats['extra_calls'] += n
+        if not batch:
+            break
+        # 并行样本完成的先后不固定，排序后同一份回放磁带每次得到完全相同的结果
+        batch.sort(key=lambda r: (r['score'], r['reason']))
+        samples += batch
+        scores += [r['score'] for r in batch]
+
+    score = math.floor(statistics.median(scores) + 0.5)
+    # 文字部分取分数最接近中位数的那个样本
+    result = dict(min(samples, key=lambda r: abs(r['score'] - score)))
+    result['score'] = score
+    result['score_samples'] = scores
+    result['score_variance'] = round(statistics.pvariance(scores), 3)
+    with _stats_lock:
+        sampling_stats['papers'] += 1
+        sampling_stats['changed'] += score != first['score']
+    return result
+
+
+def process_single_paper(client, paper, model=MODEL_NAME):
+    """处理单篇论文：先采样一次，开启自洽采样且分数临界时再追加采样"""
+    with span("prompt build"):
+        prompt = PROMPT_TEMPLATE.format(
+            title=paper['title'],
+            authors=', '.join(paper['authors']) if isinstance(paper['authors'], list) else paper['authors'],
+            abstract=paper['abstract'],
+            comment=paper.get('comment', ''),
+            category=paper['category'],
+        ) + JSON_RESPONSE_TEMPLATE
+
+    # 开启自洽采样时首个样本也用 SAMPLE_TEMPERATURE，中位数不混合不同温度的样本
+    temperature = SAMPLE_TEMPERATURE if SELF_CONSISTENCY else 0.2
+    result = request_evaluation(client, paper, prompt, temperature, model)
+    if result and SELF_CONSISTENCY and result['score'] in BORDERLINE_SCORES:
+        result = refine_score(client, paper, prompt, result, model)
+    if result:
+        result['model'] = model
+    return result
+
+
+def evaluate_papers(client, papers, model, fallback=True):
+    """
+    并发评估一组论文并原地更新。fallback=True 时失败的论文记为 0 分 (第一级)，
+    否则保留上一级的结果。返回成功评估的篇数。
+    """
     start_time = time.time()
-    
     completed_count = 0
-    
+    succeeded = 0
+    before = dict(usage_stats.get(model, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}))
+
     # 使用 ThreadPoolExecutor 进行并发处理
     with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         # 提交所有任务
         # future_to_paper 映射：Future对象 -> paper对象
-        future_to_paper = {executor.submit(process_single_paper, client, paper): paper for paper in papers}
-        
+        future_to_paper = {executor.submit(process_single_paper, client, paper, model): paper for paper in papers}
+
         for future in concurrent.futures.as_completed(future_to_paper):
             paper = future_to_paper[future]
             try:
                 result = future.result()
                 if result:
-                    # 更新 paper 对象
+                    # 更新 paper 对象；上一级留下的采样字段不属于这次的分数，新结果没有采样时要去掉
+                    paper.pop('score_samples', None)
+                    paper.pop('score_variance', None)
                     paper.update(result)
-                else:
+                    succeeded += 1
+                elif fallback:
                     # 失败也标记一下，防止前端报错
                     paper['score'] = 0
                     paper['reason'] = "API Error"
             except Exception as exc:
                 print(f"线程异常: {exc}")
-            
+
             completed_count += 1
             # 简单的进度打印，每完成 10 篇打印一次
             if completed_count % 10 == 0:
-                print(f"进度: {completed_count}/{len(papers)} (耗时: {int(time.time() - start_time)}s)", flush=True)
+                print(f"[{model}] 进度: {completed_count}/{len(papers)} (耗时: {int(time.time() - start_time)}s)",
+                      flush=True)
+
+    # 记录实测的吞吐和 token 数，供 preflight_v1.py 估算下一次运行
+    after = usage_stats.get(model, before)
+    append_history('realtime', model, len(papers), time.time() - start_time,
+                   *(after[k] - before[k] for k in ('calls', 'prompt_tokens', 'completion_tokens')))
+    return succeeded
+
+
+def run_cascade(client, papers):
+    """逐级评估，返回每一级的统计 (篇数、耗时、与上一级的一致率)"""
+    tier_stats = []
+    candidates = papers
+    for level, tier in enumerate(CASCADE_TIERS):
+        if level > 0:
+            low, high = tier['escalate']
+            candidates = [p for p in papers if isinstance(p.get('score'), int) and low <= p['score'] <= high]
+        previous = {id(p): p.get('score') for p in candidates}
+        print(f"第 {level + 1} 级 {tier['model']}: 评估 {len(candidates)} 篇论文...")
+        start = time.time()
+        evaluate_papers(client, candidates, tier['model'], fallback=level == 0)
+        seconds = time.time() - start
+
+        stat = {'model': tier['model'], 'papers': len(candidates), 'seconds': seconds}
+        # 只统计这一级确实评估成功的论文 (失败的保留上一级结果)
+        evaluated = [p for p in candidates if p.get('model') == tier['model']]
+        for p in evaluated:
+            p.setdefault('tier_scores', {})[tier['model']] = p['score']
+        if level > 0 and evaluated:
+            exact = sum(p['score'] == previous[id(p)] for p in evaluated)
+            close = sum(isinstance(p['score'], int) and abs(p['score'] - previous[id(p)]) <= 1 for p in evaluated)
+            stat['agree_exact'] = exact / len(evaluated)
+            stat['agree_within_1'] = close / len(evaluated)
+        tier_stats.append(stat)
+    return tier_stats
+
+
+def print_tier_report(tier_stats):
+    prices = {t['model']: t for t in CASCADE_TIERS}
+    print(f"{'model':<16}{'papers':>8}{'papers/s':>10}{'calls':>8}{'in tok':>10}{'out tok':>10}"
+          f"{'cost':>10}{'agree':>8}{'±1':>8}")
+    for stat in tier_stats:
+        usage = usage_stats.get(stat['model'], {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+        price = prices.get(stat['model'], {})
+        cost = (usage['prompt_tokens'] * price.get('input_price', 0)
+                + usage['completion_tokens'] * price.get('output_price', 0)) / 1e6
+        rate = stat['papers'] / stat['seconds'] if stat['seconds'] else 0
+        agree = f"{stat['agree_exact']:.0%}" if 'agree_exact' in stat else '-'
+        within = f"{stat['agree_within_1']:.0%}" if 'agree_within_1' in stat else '-'
+        print(f"{stat['model']:<16}{stat['papers']:>8}{rate:>10.2f}{usage['calls']:>8}{usage['prompt_tokens']:>10}"
+              f"{usage['completion_tokens']:>10}{cost:>10.4f}{agree:>8}{within:>8}")
+
+def make_client():
+    # 初始化客户端 (注意：openai >= 1.0.0 客户端是线程安全的，但为了保险可以在线程内创建，
+    # 不过通常全局共享一个client配合多线程也是OK的，这里为了简单在主线程创建)
+    # MYARXIV_LLM_MODE=record / replay 时包一层录制/回放 (见 llm_cassette.py)
+    # 设置了 MYARXIV_ENDPOINTS 时请求分发到多个端点 / 密钥 (见 llm_router.py)
+    return wrap_client(lambda: make_routed_client(OpenAI))
+
+
+@profiled("evaluate_v2.1")
+def main(input_file, output_file):
+    client = make_client()
+
+    with span("load"):
+        papers = load(input_file, PAPER_SCHEMA)
+    
+    if not papers:
+        print("没有论文需要评估。")
+        return
+
+    print(f"准备评估 {len(papers)} 篇论文，使用 {MAX_WORKERS} 个并发线程...")
+    start_time = time.time()
+
+    if CASCADE:
+        tier_stats = run_cascade(client, papers)
+    else:
+        evaluate_papers(client, papers, MODEL_NAME)
 
     total_time = time.time() - start_time
     print(f"评估完成！总耗时: {int(total_time)}秒。平均每篇: {total_time/len(papers):.2f}秒。")
+    if CASCADE:
+        print_tier_report(tier_stats)
+    if SELF_CONSISTENCY:
+        print(f"自洽采样: {sampling_stats['papers']} 篇临界论文，额外调用 {sampling_stats['extra_calls']} 次，"
+              f"{sampling_stats['changed']} 篇分数发生变化。")
+    print_endpoint_report()
 
     # 写入输出文件
-    with open(output_file, 'w') as f:
-        json.dump(papers, f, indent=2, ensure_ascii=False)
+    with span("write"):
+        dump(papers, output_file)
 
 if __name__ == "__main__":
     main("target/latest_papers.json", "target/evaluated_papers.json")
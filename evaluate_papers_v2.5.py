@@ -1,9 +1,14 @@
 import os
-import json
 import time
 import re
 from openai import OpenAI
 
+from llm_cassette import wrap_client
+from llm_router import make_client
+from paper_io import BATCH_RESULT_SCHEMA, PAPER_SCHEMA, dump, dumps_line, load, loads, parse_evaluation, validate
+from preflight_v1 import append_history
+from profiling import profiled, span
+
 # 填写API的密钥
 API_KEY = os.getenv("API_KEY")
 
@@ -52,11 +57,6 @@ PROMPT_TEMPLATE = """
     *   **Agent / Workflow**：能解决长文档阅读、多步信息检索过程中迷失问题的**Agent架构设计**（而非某个垂类Agent应用）。
     *   **Intervention / Steering**：推理阶段的干预或引导技术（作为一种可能的工具）。
 
-### ❌ 这是一个发表信息提取任务
-*   **Publication字段**：**仅**允许从 `comment` 字段提取！
-*   **严禁**将 `category`（如 "cs.CV", "Computer Vision and Pattern Recognition"）当作发表信息。
-*   如果 `comment` 为空或未提及会议/期刊，必须返回 "N/A"。
-
 ### 📝 打分参考 (0-10)
 *   **9-10 (Must Read)**：DIU的SOTA工作；或者上游领域具有**范式转移（Paradigm Shift）**意义的底层创新（如Visual Token Compression的开山之作，或推理Scaling的新原理）。
 *   **7-8 (Strong)**：扎实的DIU工作；或者能明显看到对DIU有迁移价值的上游新方法（如一种新的VQA去幻觉策略）。
@@ -72,7 +72,6 @@ PROMPT_TEMPLATE = """
     *   **上游论文**：**核心必须解释该方法如何迁移到DIU领域**（例如：“该VLM分辨率处理方法可直接用于提升文档细粒度识别”）。
 4.  **Summary**: 中文总结。
 5.  **Keywords**: 3-5个关键词。
-6.  **Publication**: 提取会议/期刊。
 
 论文信息：
 title：{title}
@@ -91,8 +90,7 @@ JSON_RESPONSE_TEMPLATE = """
   "title_zh": "中文标题",
   "reason": "xxx",
   "summary": "xxx",
-  "keywords": ["word1", "word2"],
-  "publication": "xxx"
+  "keywords": ["word1", "word2"]
 }
 """
 
@@ -104,27 +102,28 @@ def clean_json_response(response):
         return response[start_index:end_index]
     return None
 
+@profiled("evaluate_v2.5")
 def main(input_file, output_file):
-    client = OpenAI(
-        api_key=API_KEY,
-        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-    )
+    # MYARXIV_LLM_MODE=record / replay 时包一层录制/回放 (见 llm_cassette.py)
+    # Batch 任务只提交到 MYARXIV_ENDPOINTS 的第一个端点 (见 llm_router.py)
+    client = wrap_client(lambda: make_client(OpenAI))
 
     # 1. 读取论文列表
-    with open(input_file, 'r') as f:
-        papers = json.load(f)
+    with span("load"):
+        papers = load(input_file, PAPER_SCHEMA)
     
     if not papers:
         print("没有论文需要评估。")
         return
 
     print(f"准备评估 {len(papers)} 篇论文，正在构造 Batch 请求文件...")
+    submit_time = time.time()
 
     # 2. 构造 JSONL 数据 (Batch API 的输入格式)
     jsonl_filename = "batch_tasks.jsonl"
     paper_map = {p['id']: p for p in papers} # 方便后续通过 ID 找回论文对象
     
-    with open(jsonl_filename, 'w') as f:
+    with span("prompt build"), open(jsonl_filename, 'wb') as f:
         for paper in papers:
             # 构造 Prompt
             prompt = PROMPT_TEMPLATE.format(
@@ -150,14 +149,15 @@ def main(input_file, output_file):
                     "temperature": 0.2
                 }
             }
-            f.write(json.dumps(request_obj) + '\n')
+            f.write(dumps_line(request_obj))
 
     # 3. 上传文件
     print("正在上传 Batch 文件...")
-    batch_input_file = client.files.create(
-        file=open(jsonl_filename, "rb"),
-        purpose="batch"
-    )
+    with span("request"), open(jsonl_filename, "rb") as batch_file:
+        batch_input_file = client.files.create(
+            file=batch_file,
+            purpose="batch"
+        )
     print(f"文件上传成功，ID: {batch_input_file.id}")
 
     # 4. 创建 Batch 任务
@@ -176,7 +176,8 @@ def main(input_file, output_file):
     
     while True:
         # 获取任务最新状态
-        batch_job = client.batches.retrieve(batch_job.id)
+        with span("request"):
+            batch_job = client.batches.retrieve(batch_job.id)
         status = batch_job.status
         print(f"当前状态: {status} (已耗时: {int(time.time() - start_time)}s)")
 
@@ -200,16 +201,24 @@ def main(input_file, output_file):
     # 6. 下载并处理结果
     if batch_job.output_file_id:
         print("正在下载结果文件...")
-        file_response = client.files.content(batch_job.output_file_id)
-        result_content = file_response.text
+        with span("request"):
+            file_response = client.files.content(batch_job.output_file_id)
+            result_content = file_response.text
         
         print("正在解析结果并写入最终 JSON...")
+        usage = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
         
         # 解析 JSONL 结果
         for line in result_content.splitlines():
             if not line.strip(): continue
             
-            result = json.loads(line)
+            result = loads(line)
+            try:
+                # 失败的请求没有 response.body.choices，提示后跳过，该论文保持未评估
+                validate(result, BATCH_RESULT_SCHEMA, f"batch result {result.get('custom_id')}")
+            except ValueError as e:
+                print(f"跳过无效的结果行: {e}")
+                continue
             custom_id = result['custom_id']
             
             # 找到对应的原始论文对象
@@ -220,6 +229,10 @@ def main(input_file, output_file):
                 # 注意：Batch API 的返回结构稍微深一点
                 try:
                     print(result['response']['body'])
+                    body_usage = result['response']['body'].get('usage') or {}
+                    usage['calls'] += 1
+                    usage['prompt_tokens'] += body_usage.get('prompt_tokens') or 0
+                    usage['completion_tokens'] += body_usage.get('completion_tokens') or 0
                     choice = result['response']['body']['choices'][0]
                     content = choice['message']['content']
                     
@@ -227,16 +240,13 @@ def main(input_file, output_file):
                     cleaned_json = clean_json_response(content)
                     if cleaned_json:
                         try:
-                            eval_data = json.loads(cleaned_json)
+                            with span("parse"):
+                                eval_data = parse_evaluation(cleaned_json)
                             # 更新字段
-                            paper['score'] = eval_data.get('score', 0)
-                            paper['title_zh'] = eval_data.get('title_zh', '')
-                            paper['reason'] = eval_data.get('reason', 'N/A')
-                            paper['summary'] = eval_data.get('summary', 'N/A')
-                            paper['keywords'] = eval_data.get('keywords', [])
-                            paper['publication'] = eval_data.get('publication', 'N/A')
-                        except json.JSONDecodeError:
-                            print(f"ID {custom_id} JSON 解析失败: {cleaned_json}")
+                            paper.update(eval_data)
+                            paper['model'] = MODEL_NAME
+                        except ValueError as e:
+                            print(f"ID {custom_id} JSON 解析失败 ({e}): {cleaned_json}")
                     else:
                         print(f"ID {custom_id} 未找到有效 JSON 内容")
                         
@@ -245,9 +255,13 @@ def main(input_file, output_file):
             else:
                 print(f"警告：收到未知 custom_id {custom_id} 的结果")
 
+        # 记录从提交到完成的实测耗时和 token 数，供 preflight_v1.py 估算下一次运行
+        append_history('batch', MODEL_NAME, len(papers), time.time() - submit_time,
+                       usage['calls'], usage['prompt_tokens'], usage['completion_tokens'])
+
         # 写入最终结果
-        with open(output_file, 'w') as f:
-            json.dump(papers, f, indent=2, ensure_ascii=False)
+        with span("write"):
+            dump(papers, output_file)
         
         print(f"处理完成！结果已写入 {output_file}")
     else:
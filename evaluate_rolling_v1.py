@@ -0,0 +1,141 @@
+import argparse
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+
+from extract_papers_v2 import get_base_id
+from paper_io import PAPER_SCHEMA, dump, load
+from profiling import profiled, span
+
+# ================= 配置区域 =================
+# 逐日评估的结果库 (workflow 中随 .cache/ 一起保留)：基础 ID -> 评估结果
+STORE_FILE = ".cache/evaluations.json"
+# 不在当前窗口内、且评估时间早于这么多天的结果会被清理
+RETENTION_DAYS = 14
+# 评估产生的字段，组装 evaluated_papers.json 时覆盖到 extract 的论文数据上
+EVAL_FIELDS = ('score', 'title_zh', 'reason', 'summary', 'keywords', 'model',
+               'score_samples', 'score_variance', 'tier_scores')
+
+# ================= 滚动评估 =================
+# 每天只评估当天新出现 (或内容有变化) 的论文并存入结果库；周日只需补评少量遗漏，
+# 然后直接从结果库组装整周的 evaluated_papers.json，不再一次性把上千篇论文打到 API 上。
+# 评估本身复用 evaluate_papers_v2.1.py (文件名带点，用 importlib 按路径加载)。
+
+
+def load_evaluator():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluate_papers_v2.1.py")
+    spec = importlib.util.spec_from_file_location("evaluate_papers_v2_1", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def content_hash(paper):
+    """论文修订后标题/摘要/comment 变了才需要重评，只改版本号不重评"""
+    payload = '\n'.join(str(paper.get(k) or '') for k in ('title', 'abstract', 'comment'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_store(path=STORE_FILE):
+    if os.path.exists(path):
+        return load(path)
+    return {}
+
+
+def save_store(store, path=STORE_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    dump(store, tmp, indent=False)
+    os.replace(tmp, path)
+
+
+def pending_papers(papers, store):
+    return [p for p in papers
+            if store.get(get_base_id(p['id']), {}).get('content_hash') != content_hash(p)]
+
+
+def evaluate_pending(papers, store):
+    """评估结果库中没有的论文，成功的写入结果库，返回 (待评估数, 成功数)"""
+    todo = pending_papers(papers, store)
+    if not todo:
+        return 0, 0
+    # 在副本上评估，失败的论文不会把 "API Error" 写进结果库，下次运行会重试
+    work = [dict(p) for p in todo]
+    evaluator = load_evaluator()
+    client = evaluator.make_client()
+    print(f"滚动评估: {len(work)} 篇新论文 (QPS 上限: {evaluator.QPS_LIMIT or '不限'})")
+    if evaluator.CASCADE:
+        evaluator.print_tier_report(evaluator.run_cascade(client, work))
+    else:
+        evaluator.evaluate_papers(client, work, evaluator.MODEL_NAME)
+    evaluator.print_endpoint_report()
+
+    now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    succeeded = 0
+    for paper in work:
+        if 'model' not in paper:
+            continue
+        entry = {k: paper[k] for k in EVAL_FIELDS if k in paper}
+        entry.update(id=paper['id'], content_hash=content_hash(paper), evaluated_at=now)
+        store[get_base_id(paper['id'])] = entry
+        succeeded += 1
+    return len(work), succeeded
+
+
+def prune_store(store, papers):
+    live = {get_base_id(p['id']) for p in papers}
+    cutoff = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - RETENTION_DAYS * 86400))
+    stale = [k for k, v in store.items() if k not in live and v.get('evaluated_at', '') < cutoff]
+    for key in stale:
+        del store[key]
+    return len(stale)
+
+
+def assemble(papers, store):
+    """把结果库中的评估合并到本周的论文上；仍然缺失的按评估失败处理 (0 分)"""
+    evaluated = []
+    for paper in papers:
+        entry = store.get(get_base_id(paper['id']))
+        merged = dict(paper)
+        if entry:
+            merged.update({k: entry[k] for k in EVAL_FIELDS if k in entry})
+        else:
+            merged['score'] = 0
+            merged['reason'] = "API Error"
+        evaluated.append(merged)
+    return evaluated
+
+
+@profiled("evaluate_rolling")
+def main(latest_file, output_file=None, store_file=STORE_FILE):
+    with span("load"):
+        papers = load(latest_file, PAPER_SCHEMA)
+    store = load_store(store_file)
+    start = time.time()
+
+    pending, succeeded = evaluate_pending(papers, store)
+    pruned = prune_store(store, papers)
+    with span("write"):
+        save_store(store, store_file)
+    print(f"结果库: 新评估 {succeeded}/{pending} 篇，清理 {pruned} 条，共 {len(store)} 条 "
+          f"(耗时 {time.time() - start:.1f}s)。")
+
+    if output_file:
+        evaluated = assemble(papers, store)
+        with span("write"):
+            dump(evaluated, output_file)
+        print(f"已组装 {len(evaluated)} 篇论文的评估到 {output_file}。")
+    # 个别论文评估失败不让流水线失败：它们留在待评估列表里，下次运行重试
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate newly arrived papers daily and assemble the week on demand.")
+    parser.add_argument('--latest', default="target/latest_papers.json")
+    parser.add_argument('--store', default=STORE_FILE)
+    parser.add_argument('--assemble', metavar='OUTPUT', nargs='?', const="target/evaluated_papers.json",
+                        help="also write the week's evaluated papers (default target/evaluated_papers.json)")
+    args = parser.parse_args()
+    sys.exit(main(args.latest, args.assemble, args.store))
@@ -1,6 +1,9 @@
-import json
 import re
 
+from highlight import parse_venue
+from paper_io import dump, load_cache
+from profiling import profiled, span
+
 def remove_newlines(text):
     if text:
         return re.sub(r'\s+', ' ', text).strip()
@@ -14,9 +17,10 @@ def get_base_id(url):
     """
     return re.sub(r'v\d+$', '', url)
 
+@profiled("extract")
 def process_cache_file(cache_file, output_file):
-    with open(cache_file, 'r') as f:
-        cache_data = json.load(f)
+    with span("load"):
+        cache_data = load_cache(cache_file)
 
     # 使用字典进行去重：Key是基础ID，Value是论文数据
     unique_papers = {}
@@ -28,45 +32,48 @@ def process_cache_file(cache_file, output_file):
     target_dates = all_dates[:7]
     print(f"Processing papers from the last {len(target_dates)} days: {target_dates}")
 
-    # 3. 遍历这 7 天的数据
-    for date in target_dates:
-        categories = cache_data[date]
-        for category, papers in categories.items():
-            for paper in papers:
-                # 清理数据
-                paper['title'] = remove_newlines(paper['title'])
-                if 'comment' in paper and paper['comment'] is not None:
-                    paper['comment'] = remove_newlines(paper['comment'])
+    with span("dedup"):
+        # 3. 遍历这 7 天的数据
+        for date in target_dates:
+            categories = cache_data[date]
+            for category, papers in categories.items():
+                for paper in papers:
+                    # 清理数据
+                    paper['title'] = remove_newlines(paper['title'])
+                    if 'comment' in paper and paper['comment'] is not None:
+                        paper['comment'] = remove_newlines(paper['comment'])
+                    # 发表信息在本地按会议名单从 comment 中解析，不再交给 LLM
+                    paper['publication'] = parse_venue(paper.get('comment')) or "N/A"
                 
-                # 处理摘要字段
-                if 'summary' in paper:
-                    paper['abstract'] = remove_newlines(paper['summary'])
-                    del paper['summary']
+                    # 处理摘要字段
+                    if 'summary' in paper:
+                        paper['abstract'] = remove_newlines(paper['summary'])
+                        del paper['summary']
                 
-                # 获取基础ID用于去重
-                paper_id = paper['id']
-                base_id = get_base_id(paper_id)
+                    # 获取基础ID用于去重
+                    paper_id = paper['id']
+                    base_id = get_base_id(paper_id)
 
-                # 去重与合并逻辑
-                if base_id not in unique_papers:
-                    # 如果是新论文，直接存入，并初始化 category 为列表方便追加
-                    paper['category'] = [category] 
-                    unique_papers[base_id] = paper
-                else:
-                    # 如果论文已存在
-                    existing_paper = unique_papers[base_id]
+                    # 去重与合并逻辑
+                    if base_id not in unique_papers:
+                        # 如果是新论文，直接存入，并初始化 category 为列表方便追加
+                        paper['category'] = [category] 
+                        unique_papers[base_id] = paper
+                    else:
+                        # 如果论文已存在
+                        existing_paper = unique_papers[base_id]
                     
-                    # 合并 Category (去重)
-                    if category not in existing_paper['category']:
-                        existing_paper['category'].append(category)
+                        # 合并 Category (去重)
+                        if category not in existing_paper['category']:
+                            existing_paper['category'].append(category)
                     
-                    # 版本检查：如果当前遍历到的 paper ID 字典序更大 (v2 > v1)，则更新内容
-                    if paper_id > existing_paper['id']:
-                         # 保留已有的分类列表
-                        cats = existing_paper['category']
-                        # 更新内容
-                        unique_papers[base_id] = paper
-                        unique_papers[base_id]['category'] = cats
+                        # 版本检查：如果当前遍历到的 paper ID 字典序更大 (v2 > v1)，则更新内容
+                        if paper_id > existing_paper['id']:
+                             # 保留已有的分类列表
+                            cats = existing_paper['category']
+                            # 更新内容
+                            unique_papers[base_id] = paper
+                            unique_papers[base_id]['category'] = cats
 
     # 将处理后的字典转回列表
     merged_data = list(unique_papers.values())
@@ -85,8 +92,8 @@ def process_cache_file(cache_file, output_file):
     # # ===============================================
 
     # 写入输出文件
-    with open(output_file, 'w') as f:
-        json.dump(merged_data, f, indent=2, ensure_ascii=False)
+    with span("write"):
+        dump(merged_data, output_file)
 
 if __name__ == "__main__":
     process_cache_file("target/cache.json", "target/latest_papers.json")
@@ -0,0 +1,247 @@
+import argparse
+import concurrent.futures
+import datetime
+import os
+import sys
+import time
+import tomllib
+import xml.etree.ElementTree as ET
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from paper_io import dump, load, load_cache, loads, validate_cache
+from profiling import profiled, span
+
+# ================= 配置区域 =================
+CONFIG_FILE = "config.toml"
+CACHE_FILE = "target/cache.json"
+# 合并后的 cache.json 和每个分类的抓取状态 (ETag / 已见过的最新更新时间) 都放在 .cache/，
+# workflow 中由 actions/cache 保留，这样每天只需要拉取新论文
+STATE_FILE = ".cache/fetch_state.json"
+LOCAL_CACHE = ".cache/arxiv_cache.json"
+
+API_URL = "http://export.arxiv.org/api/query"
+PAGE_SIZE = 100
+# 增量抓取时第一页取小一些：日常新增通常只有几十篇，大多数情况下一页就够
+FIRST_PAGE_SIZE = 25
+# 各分类并发抓取，共用一个 Session 复用连接
+MAX_WORKERS = 4
+# 同一分类翻页之间的间隔 (arXiv API 要求连续请求间隔约 3 秒)
+PAGE_INTERVAL = 3.0
+TIMEOUT = 60
+RETRY_LIMIT = 3
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+
+
+# ================= Atom 流式解析 =================
+
+def parse_entry(entry):
+    """把一个 <entry> 转成 cache.json 中的论文字典 (字段与 arxivfeed 一致)"""
+    pdf_url = None
+    for link in entry.findall(f"{ATOM}link"):
+        if link.get('title') == 'pdf':
+            pdf_url = link.get('href')
+    comment = entry.find(f"{ARXIV}comment")
+    return {
+        'id': entry.findtext(f"{ATOM}id", '').strip(),
+        'title': entry.findtext(f"{ATOM}title", '').strip(),
+        'authors': [a.findtext(f"{ATOM}name", '').strip() for a in entry.findall(f"{ATOM}author")],
+        'summary': entry.findtext(f"{ATOM}summary", '').strip(),
+        'comment': comment.text.strip() if comment is not None and comment.text else None,
+        'updated': entry.findtext(f"{ATOM}updated", '').strip(),
+        'published': entry.findtext(f"{ATOM}published", '').strip(),
+        'pdf_url': pdf_url,
+    }
+
+
+def iter_entries(stream):
+    """边下载边解析：每解析完一个 <entry> 就产出并释放，内存与页大小无关"""
+    parser = ET.iterparse(stream, events=('start', 'end'))
+    _, root = next(parser)
+    for event, elem in parser:
+        if event == 'end' and elem.tag == f"{ATOM}entry":
+            yield parse_entry(elem)
+            root.remove(elem)
+
+
+# ================= 抓取 =================
+
+def make_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers['User-Agent'] = "MyArxiv-fetcher/1.0"
+    return session
+
+
+def fetch_page(session, api_url, category, start, size, validators=None):
+    """请求一页；validators 为 {'etag', 'last_modified'} 时发条件请求。返回 Response (已开启流式读取)"""
+    params = {
+        'search_query': f"cat:{category}",
+        'sortBy': 'lastUpdatedDate',
+        'sortOrder': 'descending',
+        'start': start,
+        'max_results': size,
+    }
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    for attempt in range(RETRY_LIMIT):
+        try:
+            response = session.get(api_url, params=params, headers=headers, timeout=TIMEOUT, stream=True)
+            if response.status_code in (200, 304):
+                return response
+            response.close()
+            print(f"[{category}] HTTP {response.status_code} (Attempt {attempt + 1})")
+        except requests.RequestException as e:
+            print(f"[{category}] 请求失败 (Attempt {attempt + 1}): {e}")
+        time.sleep(PAGE_INTERVAL * (attempt + 1))
+    raise RuntimeError(f"[{category}] 连续 {RETRY_LIMIT} 次请求失败")
+
+
+def fetch_source(session, api_url, source, state):
+    """
+    按更新时间倒序翻页，遇到不晚于上次见过的最新更新时间的条目就停止，
+    所以除第一次外只下载新增/更新的论文。第一页带条件请求，没有变化时服务器返回 304。
+    返回 (新条目列表, 新状态, 下载字节数)
+    """
+    category, limit = source['category'], source.get('limit', 500)
+    seen_until = state.get('newest_updated', '')
+    papers, received, start = [], 0, 0
+    new_state = dict(state)
+
+    while start < limit:
+        size = min(FIRST_PAGE_SIZE if seen_until and start == 0 else PAGE_SIZE, limit - start)
+        response = fetch_page(session, api_url, category, start, size, state if start == 0 else None)
+        with response:
+            if response.status_code == 304:
+                print(f"[{category}] not modified")
+                return [], new_state, received
+            if start == 0:
+                new_state['etag'] = response.headers.get('ETag')
+                new_state['last_modified'] = response.headers.get('Last-Modified')
+            response.raw.decode_content = True
+            page_count, reached_seen = 0, False
+            with span("parse"):
+                for paper in iter_entries(response.raw):
+                    page_count += 1
+                    if seen_until and paper['updated'] <= seen_until:
+                        reached_seen = True
+                        break
+                    papers.append(paper)
+            received += response.raw.tell() if hasattr(response.raw, 'tell') else 0
+        if reached_seen or page_count < size:
+            break
+        start += size
+        time.sleep(PAGE_INTERVAL)
+
+    if papers:
+        new_state['newest_updated'] = max(seen_until, max(p['updated'] for p in papers))
+    print(f"[{category}] {len(papers)} new or updated entries")
+    return papers, new_state, received
+
+
+# ================= 合并 cache.json =================
+
+def load_state(path):
+    return load(path) if os.path.exists(path) else {}
+
+
+def load_previous_cache(cache_url):
+    """优先用 .cache/ 中保留的副本，没有时 (如首次运行) 下载线上的 cache.json；两者都按 RAW_PAPER_SCHEMA 校验"""
+    if os.path.exists(LOCAL_CACHE):
+        return load_cache(LOCAL_CACHE)
+    if cache_url:
+        try:
+            response = requests.get(cache_url, timeout=TIMEOUT)
+            if response.ok:
+                cache_data = validate_cache(loads(response.content), cache_url)
+                print(f"已从 {cache_url} 下载历史 cache.json")
+                return cache_data
+        except (requests.RequestException, ValueError) as e:
+            print(f"下载历史 cache.json 失败，从空缓存开始: {e}")
+    return {}
+
+
+def merge_new_entries(cache_data, new_entries, day, limit_days):
+    """
+    新条目 (id 含版本号，新版本也算新条目) 放进当天的分组，同一分类下已有的跳过
+    (交叉列出的论文在每个分类下各保留一份，与 arxivfeed 一致)；然后只保留最近 limit_days 天。
+    返回实际新增的条数。
+    """
+    known = {(category, p['id']) for subjects in cache_data.values()
+             for category, plist in subjects.items() for p in plist}
+    today = cache_data.setdefault(day, {})
+    added = 0
+    for category, papers in new_entries.items():
+        fresh = []
+        for paper in papers:
+            if (category, paper['id']) not in known:
+                known.add((category, paper['id']))
+                fresh.append(paper)
+        if fresh or category not in today:
+            today[category] = fresh + today.get(category, [])
+        added += len(fresh)
+    for old_day in sorted(cache_data, reverse=True)[limit_days:]:
+        del cache_data[old_day]
+    return added
+
+
+@profiled("fetch")
+def main(config_file=CONFIG_FILE, cache_file=CACHE_FILE, api_url=API_URL, workers=MAX_WORKERS):
+    with open(config_file, 'rb') as f:
+        config = tomllib.load(f)
+    sources = config.get('sources', [])
+    limit_days = config.get('limit_days', 8)
+    state = load_state(STATE_FILE)
+
+    start = time.time()
+    session = make_session(workers)
+    new_entries, received = {}, 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_source, session, api_url, s, state.get(s['category'], {})): s
+                   for s in sources}
+        for future in concurrent.futures.as_completed(futures):
+            category = futures[future]['category']
+            try:
+                papers, state[category], size = future.result()
+            except Exception as e:
+                # 单个分类失败不影响其他分类；状态不更新，下次重新抓取
+                print(f"[{category}] 抓取失败: {e}")
+                continue
+            new_entries[category] = papers
+            received += size
+
+    cache_data = load_previous_cache(config.get('cache_url'))
+    day = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT00:00:00Z')
+    with span("merge"):
+        added = merge_new_entries(cache_data, new_entries, day, limit_days)
+        cache_data = dict(sorted(cache_data.items(), reverse=True))
+
+    with span("write"):
+        for path in (cache_file, LOCAL_CACHE):
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            dump(cache_data, path, indent=False)
+        os.makedirs(os.path.dirname(STATE_FILE) or '.', exist_ok=True)
+        dump(state, STATE_FILE)
+
+    print(f"Fetched {len(sources)} sources in {time.time() - start:.1f}s, {received / 1024:.1f} KB received, "
+          f"{added} new entries, {len(cache_data)} days kept.")
+    return 0 if len(new_entries) == len(sources) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch the arXiv sources in config.toml into cache.json incrementally.")
+    parser.add_argument('--config', default=CONFIG_FILE)
+    parser.add_argument('--cache-file', default=CACHE_FILE)
+    parser.add_argument('--api-url', default=API_URL, help="arXiv API endpoint (point at a local stand-in for testing)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    args = parser.parse_args()
+    sys.exit(main(args.config, args.cache_file, args.api_url, args.workers))
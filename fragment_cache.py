@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import time
+
+from extract_papers_v2 import get_base_id
+from paper_io import dump, load
+
+# ================= 配置区域 =================
+# 缓存文件 (workflow 中由 actions/cache 在两次运行之间保留 .cache/)
+CACHE_FILE = ".cache/fragments.json"
+# 条目上限，超出后按最近使用时间淘汰
+MAX_ENTRIES = 20000
+
+# ================= 按内容寻址的论文 HTML 片段缓存 =================
+# key = sha1(模板版本 + 论文数据)，论文数据或模板一变 key 就变，不需要手动失效。
+# 条目记录基础 ID，论文滑出 limit_days 窗口后在保存时淘汰。
+
+
+def fragment_key(paper, version):
+    # 键只用于哈希，要求 sort_keys 的稳定顺序，所以这里仍用标准库编码
+    payload = json.dumps(paper, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(f"{version}\n{payload}".encode('utf-8')).hexdigest()
+
+
+def load_cache(path=CACHE_FILE):
+    entries = {}
+    if os.path.exists(path):
+        try:
+            entries = load(path)
+        except (OSError, ValueError) as e:
+            print(f"片段缓存损坏，重新开始: {e}")
+    return {'path': path, 'entries': entries, 'hits': 0, 'misses': 0}
+
+
+def cached_renderer(cache, render, version):
+    """包装 render(paper)：命中直接返回缓存片段，否则渲染并写入缓存"""
+    entries = cache['entries']
+    now = int(time.time())
+
+    def render_cached(paper):
+        key = fragment_key(paper, version)
+        entry = entries.get(key)
+        if entry is not None:
+            cache['hits'] += 1
+            entry['used'] = now
+            return entry['html']
+        cache['misses'] += 1
+        fragment = render(paper)
+        entries[key] = {'id': get_base_id(paper['id']), 'html': fragment, 'used': now}
+        return fragment
+
+    return render_cached
+
+
+def save_cache(cache, live_ids=None):
+    """
+    淘汰窗口外的论文 (live_ids 为当前 limit_days 窗口内的基础 ID 集合)，
+    再按最近使用时间截断到 MAX_ENTRIES，最后写回。
+    """
+    entries = cache['entries']
+    if live_ids is not None:
+        entries = {k: v for k, v in entries.items() if v['id'] in live_ids}
+    if len(entries) > MAX_ENTRIES:
+        newest = sorted(entries.items(), key=lambda kv: kv[1]['used'], reverse=True)[:MAX_ENTRIES]
+        entries = dict(newest)
+    evicted = len(cache['entries']) - len(entries)
+    cache['entries'] = entries
+
+    os.makedirs(os.path.dirname(cache['path']) or '.', exist_ok=True)
+    dump(entries, cache['path'], indent=False)
+    print(f"Fragment cache: {cache['hits']} hits, {cache['misses']} rendered, "
+          f"{evicted} evicted, {len(entries)} kept.")
+
+
+def window_ids(cache_data):
+    """cache.json 中当前窗口内所有论文的基础 ID"""
+    if cache_data is None:
+        return None
+    return {get_base_id(p['id']) for day in cache_data.values()
+            for papers in day.values() for p in papers}
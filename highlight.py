@@ -0,0 +1,207 @@
+import hashlib
+import html
+import os
+import re
+
+# ================= 配置区域 =================
+# 与 arxivfeed 页面共用同一份高亮名单 (scripts/config.rhai)，改名单只需要改一处
+RHAI_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "config.rhai")
+# 会议名后面的年份：四位年份可以隔着空格 / 撇号 / 连字符，也可以紧贴 ("EMNLP2024")；
+# 两位年份只认撇号后 ("ACL'24") 或紧贴 ("CVPR24")，"CVPR 10 pages" 里的 10 不是年份。
+# 会议名后可带一段连字符后缀 ("NAACL-HLT 2024")；后面紧跟 pages / figures / tables 的数字一律不算年份。
+_YEAR_RE = re.compile(r"(?:-[A-Za-z]+)?(?:[\s'’-]*((?:19|20)\d{2})|['’](\d{2})|(\d{2}))"
+                      r"(?!\d)(?!\s*(?:pages?|pp\b|figures?|figs?\b|tables?))", re.I)
+
+# ================= 读取 config.rhai 中的名单 =================
+
+_RHAI_LET_RE = re.compile(r'let\s+(\w+)\s*=\s*(.*?);', re.S)
+_RHAI_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def load_rhai_lists(path=RHAI_CONFIG):
+    """
+    解析 config.rhai 里的字符串数组，支持 let a = [...]; 和 let c = a + b; 两种写法。
+    返回 {变量名: [字符串, ...]}，文件不存在时返回空字典。
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        source = re.sub(r'//[^\n]*', '', f.read())
+    lists = {}
+    for name, expr in _RHAI_LET_RE.findall(source):
+        expr = expr.strip()
+        if expr.startswith('['):
+            lists[name] = _RHAI_STRING_RE.findall(expr)
+        elif re.fullmatch(r'\w+(\s*\+\s*\w+)*', expr) and all(p.strip() in lists for p in expr.split('+')):
+            lists[name] = [v for p in expr.split('+') for v in lists[p.strip()]]
+    return lists
+
+
+# ================= Aho-Corasick 自动机 =================
+# 所有模式编译进一个自动机，每个字段只线性扫描一遍，耗时与名单长度无关。
+# 自动机用几个并列的列表表示：goto[state] 是 {字符: 下一状态}，fail[state] 是失配指针，
+# out[state] 是在该状态结束的模式长度 (已沿失配链合并)。
+
+
+def _fold(text, ignore_case):
+    # 逐字符小写，且保证长度不变 (如 'İ'.lower() 是两个字符)，这样匹配位置能直接对应原文
+    if not ignore_case:
+        return text
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def build_matcher(patterns, ignore_case=True):
+    goto, fail, out = [{}], [0], [[]]
+    for pattern in dict.fromkeys(p for p in patterns if p):
+        state = 0
+        for ch in _fold(pattern, ignore_case):
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                fail.append(0)
+                out.append([])
+            state = nxt
+        out[state].append(len(pattern))
+
+    # 按 BFS 顺序计算失配指针
+    queue = list(goto[0].values())
+    for state in queue:
+        for ch, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0)
+            out[nxt] = out[nxt] + out[fail[nxt]]
+    return {'goto': goto, 'fail': fail, 'out': out, 'ignore_case': ignore_case}
+
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def find_matches(matcher, text):
+    """
+    返回 [(start, end), ...]：按词边界过滤后，从左到右取最长、互不重叠的命中。
+    """
+    if not text or len(matcher['goto']) == 1:
+        return []
+    goto, fail, out = matcher['goto'], matcher['fail'], matcher['out']
+    folded = _fold(text, matcher['ignore_case'])
+    n = len(text)
+    best = {}  # start -> 最长的 end
+    state = 0
+    for i, ch in enumerate(folded):
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        if not out[state]:
+            continue
+        end = i + 1
+        if end < n and _is_word(text[end]) and _is_word(text[end - 1]):
+            continue
+        for length in out[state]:
+            start = end - length
+            if start > 0 and _is_word(text[start - 1]) and _is_word(text[start]):
+                continue
+            if best.get(start, 0) < end:
+                best[start] = end
+
+    matches = []
+    last_end = 0
+    for start in sorted(best):
+        if start >= last_end:
+            matches.append((start, best[start]))
+            last_end = best[start]
+    return matches
+
+
+def highlight(text, matcher, css_class):
+    """HTML 转义 text，并把命中部分包进 <span class="css_class">"""
+    if not text:
+        return ''
+    out, pos = [], 0
+    for start, end in find_matches(matcher, text):
+        out.append(html.escape(text[pos:start]))
+        out.append(f'<span class="{css_class}">{html.escape(text[start:end])}</span>')
+        pos = end
+    out.append(html.escape(text[pos:]))
+    return ''.join(out)
+
+
+# ================= 页面使用的三组名单 =================
+
+_LISTS = load_rhai_lists()
+TITLE_MATCHER = build_matcher(_LISTS.get('titles', []), ignore_case=True)
+AUTHOR_MATCHER = build_matcher(_LISTS.get('authors_array', []), ignore_case=True)
+# 会议缩写区分大小写 (与 highlight_conference.rhai 一致)，否则 "SP"、"FAST"、"DATE" 会误中普通单词
+CONFERENCE_MATCHER = build_matcher(_LISTS.get('conferences', []), ignore_case=False)
+
+# 名单一改，依赖高亮结果的缓存片段 (fragment_cache) 随之失效
+HIGHLIGHT_VERSION = hashlib.sha1(repr(sorted(_LISTS.items())).encode('utf-8')).hexdigest()[:12]
+
+
+def highlight_title(title):
+    return highlight(title, TITLE_MATCHER, 'highlight-title')
+
+
+def highlight_author(author):
+    return highlight(author, AUTHOR_MATCHER, 'highlight-author')
+
+
+def has_watched_author(authors):
+    return any(find_matches(AUTHOR_MATCHER, a) for a in authors)
+
+
+def _venue_regex(venues):
+    # 会议名前面不能紧跟字母数字 (ACL 不匹配 NAACL)，后面不能紧跟字母，但可以紧跟年份数字
+    names = sorted(dict.fromkeys(venues), key=len, reverse=True)
+    if not names:
+        return None
+    return re.compile(r'(?<![A-Za-z0-9])(' + '|'.join(map(re.escape, names)) + r')(?![A-Za-z])', re.I)
+
+
+_VENUE_RE = _venue_regex(_LISTS.get('conferences', []))
+_VENUE_NAMES = {}
+for _name in _LISTS.get('conferences', []):
+    _VENUE_NAMES.setdefault(_name.lower(), _name)
+
+
+def parse_venue(comment):
+    """
+    从 comment 中解析发表信息，规范成 "会议 年份"，如
+    "Accepted by CVPR 2025" -> "CVPR 2025"，"ACL'24 main" -> "ACL 2024"，"accepted at icml 2024" -> "ICML 2024"，
+    "ICLR" -> "ICLR"。只认 config.rhai 中的会议名单，没有命中返回 None。
+    大小写与名单不一致的命中 (如 "fast"、"date") 只有带年份时才算，避免把普通单词当成会议。
+    """
+    if not comment or _VENUE_RE is None:
+        return None
+    for m in _VENUE_RE.finditer(comment):
+        name = _VENUE_NAMES[m.group(1).lower()]
+        year = _YEAR_RE.match(comment, m.end())
+        if year:
+            four, apostrophe, glued = year.groups()
+            return f"{name} {four or '20' + (apostrophe or glued)}"
+        if m.group(1) == name:
+            return name
+    return None
+
+
+def highlight_ranges(paper):
+    """
+    title / authors 的命中区间，写进懒加载 JSON 供 statics/index.js 渲染相同的高亮：
+    {'title': [[start, end], ...], 'authors': [[作者下标, start, end], ...]}，没有命中返回 None
+    """
+    ranges = {}
+    title = find_matches(TITLE_MATCHER, paper.get('title') or '')
+    if title:
+        ranges['title'] = [list(m) for m in title]
+    authors = paper.get('authors') or []
+    if isinstance(authors, str):
+        authors = [authors]
+    hits = [[i, s, e] for i, a in enumerate(authors) for s, e in find_matches(AUTHOR_MATCHER, a)]
+    if hits:
+        ranges['authors'] = hits
+    return ranges or None
@@ -0,0 +1,61 @@
+import os
+from bs4 import BeautifulSoup
+
+from paper_io import load_cache
+from profiling import span
+
+# ================= index.html 后处理的公共部分 =================
+# 各个脚本 (inject_html_v2 / restore_report / sort_papers / shard_days) 把对页面的修改
+# 写成 transform(soup, ctx) 并在这里注册，postprocess_html_v1.py 只解析一次页面，
+# 按顺序调用它们，最后只序列化一次。单独运行某个脚本时也走同样的函数。
+
+TRANSFORMS = {}
+
+
+def register(name):
+    """注册一个页面变换：fn(soup, ctx)"""
+    def decorator(fn):
+        TRANSFORMS[name] = fn
+        return fn
+    return decorator
+
+
+def make_context(target_dir="target", **paths):
+    """各变换共享的路径与状态"""
+    ctx = {
+        'target_dir': target_dir,
+        'html_file': os.path.join(target_dir, "index.html"),
+        'cache_file': os.path.join(target_dir, "cache.json"),
+        'evaluated_file': os.path.join(target_dir, "evaluated_papers.json"),
+        'config_file': "config.toml",
+        # 序列化后再替换的片段：{注释文字: HTML}，避免大片段被 BeautifulSoup 再解析一遍
+        'splices': {},
+    }
+    ctx.update(paths)
+    return ctx
+
+
+def load_cache_data(ctx):
+    """读取 cache.json，同一次运行中只读一次；文件不存在时返回 None"""
+    if 'cache_data' not in ctx:
+        ctx['cache_data'] = None
+        if os.path.exists(ctx['cache_file']):
+            ctx['cache_data'] = load_cache(ctx['cache_file'])
+    return ctx['cache_data']
+
+
+def load_html(ctx):
+    with span("load"), open(ctx['html_file'], 'r', encoding='utf-8') as f:
+        html_text = f.read()
+    with span("parse"):
+        return BeautifulSoup(html_text, 'html.parser')
+
+
+def write_html(soup, ctx):
+    """序列化页面并替换占位注释。不再 prettify()，压缩交给 compress_site_v1.py"""
+    with span("serialize"):
+        html_text = str(soup)
+        for marker, fragment in ctx['splices'].items():
+            html_text = html_text.replace(f"<!--{marker}-->", fragment, 1)
+    with span("write"), open(ctx['html_file'], 'w', encoding='utf-8') as f:
+        f.write(html_text)
@@ -0,0 +1,212 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import types
+from collections import Counter
+
+from paper_io import dumps_line, iter_jsonl, loads
+
+# ================= 配置区域 =================
+# MYARXIV_LLM_MODE=record：照常调用 API，同时把每次请求/响应 (实时和 Batch) 追加到磁带文件
+# MYARXIV_LLM_MODE=replay：不联网，按请求哈希从磁带文件返回录好的响应 (也不需要 API_KEY)
+# 不设置 (off)：直接使用真实客户端，没有任何额外开销
+MODE = os.getenv("MYARXIV_LLM_MODE", "off")
+# 磁带文件 (JSONL，每行一次请求)，可以提交到仓库当作回归测试的夹具
+CASSETTE_FILE = os.getenv("MYARXIV_CASSETTE", ".cache/llm_cassette.jsonl")
+
+# ================= 录制 / 回放 =================
+# 请求的键是 (model, messages, temperature) 的哈希，实时和 Batch 共用同一份磁带：
+# 实时模式录下的响应也能回放给 evaluate_papers_v2.5.py，反之亦然。
+# 同一请求录了多次 (自洽采样在较高温度下重复请求) 时，回放按录制顺序依次返回，用完后从头循环。
+
+
+class CassetteMiss(Exception):
+    """回放模式下磁带里没有这个请求：重试也不会有结果"""
+
+
+def request_key(model, messages, temperature=None):
+    # 键只用于哈希，需要 sort_keys 的稳定顺序，仍用标准库编码 (改了会让已录的磁带全部失配)
+    payload = json.dumps({'model': model, 'messages': messages, 'temperature': temperature},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+def to_namespace(value):
+    """dict -> 可以按属性访问的对象 (completion.choices[0].message.content)"""
+    if isinstance(value, dict):
+        return types.SimpleNamespace(**{k: to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(v) for v in value]
+    return value
+
+
+def load_cassette(path=CASSETTE_FILE):
+    """读入磁带：{'path', 'responses': {键: [响应, ...]}, 'cursors': 回放位置, 'lock'}"""
+    cassette = {'path': path, 'responses': {}, 'cursors': {}, 'lock': threading.Lock()}
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    record = loads(line)
+                    cassette['responses'].setdefault(record['key'], []).append(record['response'])
+    return cassette
+
+
+def record_response(cassette, request, response, source):
+    """request 是 {'model', 'messages', 'temperature'}，response 是 chat completion 的 dict"""
+    key = request_key(request['model'], request['messages'], request.get('temperature'))
+    line = dumps_line({'key': key, 'source': source, 'model': request['model'],
+                       'temperature': request.get('temperature'), 'messages': request['messages'],
+                       'response': response})
+    with cassette['lock']:
+        cassette['responses'].setdefault(key, []).append(response)
+        os.makedirs(os.path.dirname(cassette['path']) or '.', exist_ok=True)
+        with open(cassette['path'], 'ab') as f:
+            f.write(line)
+
+
+def replay_response(cassette, request):
+    key = request_key(request['model'], request['messages'], request.get('temperature'))
+    with cassette['lock']:
+        if key not in cassette['responses']:
+            raise CassetteMiss(f"no recorded response for request {key} in {cassette['path']}")
+        if key not in cassette['cursors']:
+            cassette['cursors'][key] = itertools.cycle(cassette['responses'][key])
+        return next(cassette['cursors'][key])
+
+
+# ================= 客户端包装 =================
+# 只包装评估脚本用到的接口：chat.completions.create、files.create / content、batches.create / retrieve。
+# 真实客户端由 factory 懒创建，回放时完全不会构造 (所以不需要 API_KEY 和网络)。
+
+
+def wrap_client(factory, mode=MODE, path=CASSETTE_FILE):
+    """评估脚本用它创建客户端：factory() 创建真实的 OpenAI 客户端"""
+    if mode == 'off':
+        return factory()
+    if mode not in ('record', 'replay'):
+        raise ValueError(f"MYARXIV_LLM_MODE must be off, record or replay, got {mode!r}")
+    print(f"LLM {mode} mode, cassette: {path}")
+
+    cassette = load_cassette(path)
+    replay = mode == 'replay'
+    real_client = []
+    real_lock = threading.Lock()
+    uploads = {}        # 上传的文件 id -> {custom_id: 请求体}
+    jobs = {}           # batch id -> 输入文件 id
+    outputs = {}        # 回放：输出文件 id -> 结果 JSONL 文本；录制：输出文件 id -> 输入文件 id
+
+    def real():
+        with real_lock:
+            if not real_client:
+                real_client.append(factory())
+            return real_client[0]
+
+    def chat_create(model, messages, temperature=None, **kwargs):
+        request = {'model': model, 'messages': messages, 'temperature': temperature}
+        if replay:
+            return to_namespace(replay_response(cassette, request))
+        completion = real().chat.completions.create(model=model, messages=messages,
+                                                    temperature=temperature, **kwargs)
+        record_response(cassette, request, completion.model_dump(), 'realtime')
+        return completion
+
+    def files_create(file, purpose):
+        # 记下上传的 Batch 请求，录制时用来给结果配对，回放时用来生成结果
+        content = file.read()
+        requests = {}
+        for task in iter_jsonl(content.decode('utf-8'), where=getattr(file, 'name', 'batch input')):
+            requests[task['custom_id']] = task['body']
+        if replay:
+            file_id = f"file-replay-{len(uploads)}"
+        else:
+            file_id = real().files.create(file=(os.path.basename(file.name), content), purpose=purpose).id
+        uploads[file_id] = requests
+        return types.SimpleNamespace(id=file_id)
+
+    def files_content(file_id):
+        if replay:
+            return types.SimpleNamespace(text=outputs[file_id])
+        response = real().files.content(file_id)
+        requests = uploads.get(outputs.get(file_id), {})
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            result = loads(line)
+            request = requests.get(result.get('custom_id'))
+            body = (result.get('response') or {}).get('body')
+            if request and body and body.get('choices'):
+                record_response(cassette, request, body, 'batch')
+        return response
+
+    def batches_create(input_file_id, **kwargs):
+        if not replay:
+            batch = real().batches.create(input_file_id=input_file_id, **kwargs)
+            jobs[batch.id] = input_file_id
+            return batch
+        # 回放：任务立即完成，结果文件由磁带拼出；磁带里没有的请求按失败的请求返回
+        lines = []
+        for custom_id, request in uploads[input_file_id].items():
+            try:
+                lines.append({'custom_id': custom_id,
+                              'response': {'status_code': 200, 'body': replay_response(cassette, request)}})
+            except CassetteMiss as e:
+                lines.append({'custom_id': custom_id, 'response': None,
+                              'error': {'code': 'cassette_miss', 'message': str(e)}})
+        batch_id = f"batch-replay-{len(jobs)}"
+        jobs[batch_id] = input_file_id
+        outputs[f"file-replay-output-{batch_id}"] = b''.join(dumps_line(line) for line in lines).decode('utf-8')
+        return batches_retrieve(batch_id)
+
+    def batches_retrieve(batch_id):
+        if replay:
+            return types.SimpleNamespace(id=batch_id, status='completed', errors=None,
+                                         output_file_id=f"file-replay-output-{batch_id}")
+        batch = real().batches.retrieve(batch_id)
+        if batch.output_file_id:
+            outputs[batch.output_file_id] = jobs.get(batch_id)
+        return batch
+
+    return types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=chat_create)),
+        files=types.SimpleNamespace(create=files_create, content=files_content),
+        batches=types.SimpleNamespace(create=batches_create, retrieve=batches_retrieve),
+    )
+
+
+def replaying():
+    return MODE == 'replay'
+
+
+# ================= 命令行：查看磁带 =================
+
+def main(path):
+    if not os.path.exists(path):
+        print(f"{path} does not exist.")
+        return 1
+    records = Counter()
+    sources = Counter()
+    models = Counter()
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                record = loads(line)
+                records[record['key']] += 1
+                sources[record['source']] += 1
+                models[record['model']] += 1
+    print(f"{path}: {sum(records.values())} responses for {len(records)} distinct requests "
+          f"({os.path.getsize(path) / 1024:.1f} KB)")
+    print("  by source: " + ', '.join(f"{k} {v}" for k, v in sources.most_common()))
+    print("  by model:  " + ', '.join(f"{k} {v}" for k, v in models.most_common()))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show what an LLM cassette contains.")
+    parser.add_argument('cassette', nargs='?', default=CASSETTE_FILE)
+    args = parser.parse_args()
+    sys.exit(main(args.cassette))
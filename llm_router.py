@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+from paper_io import REQUIRED, validate
+
+# ================= 配置区域 =================
+# MYARXIV_ENDPOINTS 不设置时只用一个端点 (DashScope + API_KEY)，评估脚本拿到的就是原来的 OpenAI 客户端。
+# 设置后按端点分发评估请求，取值可以是 JSON 文件路径，也可以直接是 JSON 数组 (方便放进 Actions secret)：
+# [
+#   {"name": "dashscope-a", "base_url": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+#    "api_key_env": "API_KEY", "weight": 2, "qps": 5},
+#   {"name": "dashscope-b", "base_url": "https://dashscope.aliyuncs.com/compatible-mode/v1",
+#    "api_key_env": "API_KEY_B", "weight": 1, "qps": 5},
+#   {"name": "other", "base_url": "https://example.com/v1", "api_key_env": "OTHER_KEY",
+#    "qps": 10, "models": {"qwen-plus": "qwen-plus-2025-01-25"}}
+# ]
+# 每个端点各自限速 (qps，0 表示不限)，总吞吐约为各端点之和；这时评估脚本忽略全局的 QPS_LIMIT。
+# models 把评估脚本里的模型名映射成该端点的模型名；给了 models 的端点只接收其中列出的模型。
+ENDPOINTS = os.getenv("MYARXIV_ENDPOINTS", "")
+DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+
+# 一次请求最多尝试几个不同的端点
+MAX_ATTEMPTS = 3
+# 连续失败的端点暂停接收请求 COOLDOWN_BASE * 2^(连续失败次数-1) 秒，最长 COOLDOWN_MAX 秒
+COOLDOWN_BASE = 2.0
+COOLDOWN_MAX = 60.0
+# 延迟的指数滑动平均系数；还没有测到延迟的端点按 DEFAULT_LATENCY 秒估计
+LATENCY_ALPHA = 0.3
+DEFAULT_LATENCY = 5.0
+# 这些状态码说明请求本身有问题，换端点也没用，直接抛出，不记到端点头上
+REQUEST_ERRORS = (400, 422)
+
+ENDPOINT_SCHEMA = {
+    'name': (str, None),
+    'base_url': (str, REQUIRED),
+    'api_key': (str, None),
+    'api_key_env': (str, 'API_KEY'),
+    'weight': ((int, float), 1),
+    'qps': ((int, float), 0),
+    'timeout': ((int, float), 60),
+    'models': (dict, None),
+}
+
+
+def load_endpoints(value=ENDPOINTS):
+    """解析端点配置 (JSON 数组或文件路径)，补上缺省值；没有配置返回 []"""
+    value = value.strip()
+    if not value:
+        return []
+    if not value.startswith('['):
+        with open(value, 'r', encoding='utf-8') as f:
+            value = f.read()
+    endpoints = json.loads(value)
+    if not isinstance(endpoints, list) or not endpoints:
+        raise ValueError("MYARXIV_ENDPOINTS: expected a non-empty array of endpoints")
+    for i, endpoint in enumerate(endpoints):
+        validate(endpoint, ENDPOINT_SCHEMA, f"MYARXIV_ENDPOINTS[{i}]", fill=True)
+        endpoint.setdefault('name', f"endpoint-{i}")
+        endpoint.setdefault('api_key', None)
+        endpoint.setdefault('models', None)
+        if endpoint['weight'] <= 0:
+            raise ValueError(f"MYARXIV_ENDPOINTS[{i}].weight: must be positive")
+    return endpoints
+
+
+# ================= 端点状态 =================
+
+def new_state(endpoint):
+    return {
+        'endpoint': endpoint,
+        'client': None,
+        'inflight': 0,
+        'next_slot': 0.0,        # 按 qps 分配的下一个发送时刻
+        'latency': None,         # 成功请求延迟的滑动平均 (秒)
+        'failures': 0,           # 连续失败次数
+        'cooldown_until': 0.0,
+        'calls': 0,
+        'errors': 0,
+        'busy_seconds': 0.0,
+    }
+
+
+def serves(state, model):
+    models = state['endpoint']['models']
+    return models is None or model in models
+
+
+def expected_cost(state, now, fallback_latency):
+    """新请求发往该端点预计要等多久：限速排队 + 在途请求按权重分摊的延迟"""
+    endpoint = state['endpoint']
+    wait = max(0.0, state['next_slot'] - now) if endpoint['qps'] > 0 else 0.0
+    latency = state['latency'] if state['latency'] is not None else fallback_latency
+    return wait + (state['inflight'] + 1) * latency / endpoint['weight']
+
+
+def pick_endpoint(router, model, tried):
+    """
+    选预计等待最短的健康端点，并占用它的限速时间片；返回 (端点状态, 需要等待的秒数)。
+    所有端点都在冷却时选最早恢复的那个，不直接失败。
+    """
+    with router['lock']:
+        now = time.monotonic()
+        candidates = [s for s in router['states'] if id(s) not in tried and serves(s, model)]
+        if not candidates:
+            return None, 0.0
+        healthy = [s for s in candidates if s['cooldown_until'] <= now]
+        known = [s['latency'] for s in router['states'] if s['latency'] is not None]
+        fallback_latency = min(known) if known else DEFAULT_LATENCY
+        if healthy:
+            state = min(healthy, key=lambda s: expected_cost(s, now, fallback_latency))
+        else:
+            state = min(candidates, key=lambda s: s['cooldown_until'])
+        start = max(now, state['cooldown_until'])
+        if state['endpoint']['qps'] > 0:
+            start = max(start, state['next_slot'])
+            state['next_slot'] = start + 1.0 / state['endpoint']['qps']
+        state['inflight'] += 1
+        return state, start - now
+
+
+def finish(router, state, seconds, error=None):
+    with router['lock']:
+        state['inflight'] -= 1
+        state['calls'] += 1
+        state['busy_seconds'] += seconds
+        if error is None:
+            state['failures'] = 0
+            previous = state['latency']
+            state['latency'] = seconds if previous is None else \
+                LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * previous
+        else:
+            state['errors'] += 1
+            state['failures'] += 1
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (state['failures'] - 1))
+            state['cooldown_until'] = time.monotonic() + cooldown
+
+
+def status_code(error):
+    return getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+# ================= 客户端 =================
+# 路由客户端只实现评估脚本用到的接口。chat.completions.create 按端点分发并在别的端点上重试；
+# files / batches 固定用第一个端点 (上传的文件和 Batch 任务只存在于创建它们的账号下)。
+
+ROUTERS = []
+
+
+def make_router(client_class, endpoints):
+    """client_class 是 openai.OpenAI (或接口相同的类)，每个端点懒创建一个客户端"""
+    router = {'states': [new_state(e) for e in endpoints], 'lock': threading.Lock()}
+    ROUTERS.append(router)
+
+    def client_of(state):
+        with router['lock']:
+            if state['client'] is None:
+                endpoint = state['endpoint']
+                api_key = endpoint['api_key'] or os.getenv(endpoint['api_key_env'])
+                # SDK 自带的重试会在同一个端点上退避等待，关掉它，由路由换端点重试
+                state['client'] = client_class(api_key=api_key, base_url=endpoint['base_url'],
+                                               timeout=endpoint['timeout'], max_retries=0)
+            return state['client']
+
+    def chat_create(model, messages, **kwargs):
+        tried = set()
+        last_error = None
+        for _ in range(min(MAX_ATTEMPTS, len(router['states']))):
+            state, wait = pick_endpoint(router, model, tried)
+            if state is None:
+                break
+            tried.add(id(state))
+            if wait > 0:
+                time.sleep(wait)
+            models = state['endpoint']['models']
+            start = time.monotonic()
+            try:
+                completion = client_of(state).chat.completions.create(
+                    model=models[model] if models else model, messages=messages, **kwargs)
+            except Exception as e:
+                if status_code(e) in REQUEST_ERRORS:
+                    finish(router, state, time.monotonic() - start)
+                    raise
+                finish(router, state, time.monotonic() - start, e)
+                last_error = e
+                continue
+            finish(router, state, time.monotonic() - start)
+            return completion
+        if last_error is None:
+            raise ValueError(f"no endpoint in MYARXIV_ENDPOINTS serves model {model!r}")
+        raise last_error
+
+    primary = router['states'][0]
+    return types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=chat_create)),
+        files=types.SimpleNamespace(create=lambda **kw: client_of(primary).files.create(**kw),
+                                    content=lambda file_id: client_of(primary).files.content(file_id)),
+        batches=types.SimpleNamespace(create=lambda **kw: client_of(primary).batches.create(**kw),
+                                      retrieve=lambda batch_id: client_of(primary).batches.retrieve(batch_id)),
+        router=router,
+    )
+
+
+def make_client(client_class):
+    """评估脚本用它创建客户端：没有配置 MYARXIV_ENDPOINTS 时和原来一样直连 DashScope"""
+    endpoints = load_endpoints()
+    if not endpoints:
+        return client_class(api_key=os.getenv("API_KEY"), base_url=DEFAULT_BASE_URL)
+    print(f"Routing LLM requests across {len(endpoints)} endpoints: "
+          + ', '.join(f"{e['name']} (weight {e['weight']}, qps {e['qps'] or 'unlimited'})" for e in endpoints))
+    return make_router(client_class, endpoints)
+
+
+def print_endpoint_report(routers=ROUTERS):
+    """各端点的请求数、错误数、平均延迟 (默认是本进程创建的所有路由)"""
+    for router in routers:
+        print(f"{'endpoint':<20}{'calls':>8}{'errors':>8}{'share':>8}{'avg s':>8}{'ewma s':>8}")
+        total = sum(s['calls'] for s in router['states']) or 1
+        for s in router['states']:
+            avg = s['busy_seconds'] / s['calls'] if s['calls'] else 0
+            ewma = f"{s['latency']:.2f}" if s['latency'] is not None else '-'
+            print(f"{s['endpoint']['name']:<20}{s['calls']:>8}{s['errors']:>8}{s['calls'] / total:>8.0%}"
+                  f"{avg:>8.2f}{ewma:>8}")
+
+
+# ================= 命令行：检查配置 =================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the endpoints configured in MYARXIV_ENDPOINTS.")
+    parser.add_argument('endpoints', nargs='?', default=ENDPOINTS, help="JSON array or file (default: $MYARXIV_ENDPOINTS)")
+    args = parser.parse_args()
+    configured = load_endpoints(args.endpoints)
+    if not configured:
+        print(f"MYARXIV_ENDPOINTS is not set: single endpoint {DEFAULT_BASE_URL} with API_KEY.")
+        sys.exit(0)
+    for e in configured:
+        key = 'inline key' if e['api_key'] else f"${e['api_key_env']}" + ('' if os.getenv(e['api_key_env']) else ' (unset)')
+        models = ', '.join(f"{k}->{v}" for k, v in e['models'].items()) if e['models'] else 'all models'
+        print(f"{e['name']:<20}{e['base_url']:<55} weight {e['weight']:<4} qps {e['qps'] or '-':<5} {key}; {models}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# MyArxiv 的统一命令行入口：python myarxiv.py [--target DIR] COMMAND [选项]
+# 各子命令只在执行时才导入对应的脚本 (以及 openai / bs4 等依赖)，--help 和用不到这些依赖的子命令
+# 启动很快 (python myarxiv.py bench startup)。run 子命令在同一个进程里依次执行多个阶段，如
+#   python myarxiv.py run extract evaluate inject sort
+# 原来的各个脚本仍然可以单独运行。
+
+# ================= 配置区域 =================
+TARGET_DIR = "target"
+# 评估方式 -> 脚本 (文件名带点的用 importlib 按路径加载)
+EVALUATORS = {
+    'rolling': "evaluate_rolling_v1.py",   # 只评估新论文，结果库组装整周 (workflow 使用)
+    'realtime': "evaluate_papers_v2.1.py",  # 并发实时调用
+    'batch': "evaluate_papers_v2.5.py",     # Batch API，便宜但要排队
+}
+# run 子命令中的页面变换，与 postprocess_html_v1.DEFAULT_ORDER 对应，只解析/写回一次 index.html
+HTML_STAGES = {'inject': 'inject_report', 'restore': 'restore_report', 'sort': 'sort_articles',
+               'shard': 'shard_days'}
+
+
+def load_script(name):
+    path = os.path.join(ROOT, name)
+    spec = importlib.util.spec_from_file_location(name[:-3].replace('.', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def target_path(args, value, default):
+    """没有显式指定的路径都放在 --target 目录下"""
+    return value or os.path.join(args.target, default)
+
+
+# ================= 子命令 =================
+
+def cmd_extract(args):
+    from extract_papers_v2 import process_cache_file
+    process_cache_file(target_path(args, args.cache, "cache.json"),
+                       target_path(args, args.output, "latest_papers.json"))
+
+
+def cmd_evaluate(args):
+    latest = target_path(args, args.input, "latest_papers.json")
+    output = target_path(args, args.output, "evaluated_papers.json")
+    module = load_script(EVALUATORS[args.mode])
+    if args.mode == 'rolling':
+        return module.main(latest, output if args.assemble else None, args.store or module.STORE_FILE)
+    module.main(latest, output)
+
+
+def cmd_inject(args):
+    import inject_html_v2
+    inject_html_v2.main(target_path(args, args.evaluated, "evaluated_papers.json"),
+                        target_path(args, args.html, "index.html"))
+
+
+def cmd_restore(args):
+    from inject_html_v2 import REPORT_HTML
+    from restore_report import restore_weekly_report
+    restore_weekly_report(target_path(args, args.report, REPORT_HTML), target_path(args, args.html, "index.html"))
+
+
+def cmd_sort(args):
+    import sort_papers_v2
+    sort_papers_v2.main(args.target)
+
+
+def cmd_run(args):
+    """按给定顺序在同一进程里执行；相邻的页面变换合并成一次解析/写回"""
+    html_steps = []
+
+    def flush_html():
+        if html_steps:
+            import postprocess_html_v1
+            postprocess_html_v1.main(args.target, list(html_steps))
+            html_steps.clear()
+
+    for stage in args.stages:
+        if stage in HTML_STAGES:
+            html_steps.append(HTML_STAGES[stage])
+            continue
+        flush_html()
+        if stage == 'extract':
+            cmd_extract(argparse.Namespace(target=args.target, cache=None, output=None))
+        elif stage == 'evaluate':
+            cmd_evaluate(argparse.Namespace(target=args.target, input=None, output=None, mode=args.mode,
+                                            assemble=True, store=None))
+    flush_html()
+
+
+def cmd_serve(args):
+    import serve_v1
+    return serve_v1.main(args.target, args.store or serve_v1.STORE_FILE, args.host, args.port, args.refresh)
+
+
+def cmd_bench(args):
+    if args.suite == 'startup':
+        from benchmarks import bench_startup
+        bench_startup.main(args.args)
+    elif args.suite == 'stages':
+        from benchmarks import run_benchmarks
+        parsed = run_benchmarks.parse_args(args.args)
+        run_benchmarks.main(parsed.sizes, parsed.stages)
+    elif args.suite == 'io':
+        from benchmarks import bench_io
+        bench_io.main([int(n) for n in args.args] or [10000, 100000])
+    elif args.suite == 'report':
+        from benchmarks import bench_report
+        for n in [int(n) for n in args.args] or [100, 1000, 5000]:
+            bench_report.bench(n)
+    elif args.suite == 'router':
+        from benchmarks import bench_router
+        bench_router.main(args.args)
+    elif args.suite == 'serve':
+        from benchmarks import bench_serve
+        bench_serve.main(args.args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="myarxiv", description="MyArxiv pipeline commands.")
+    parser.add_argument('--target', default=TARGET_DIR, help="publish directory (default: target)")
+    sub = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    p = sub.add_parser('extract', help="deduplicate the last 7 days of cache.json into latest_papers.json")
+    p.add_argument('--cache', help="default: TARGET/cache.json")
+    p.add_argument('--output', help="default: TARGET/latest_papers.json")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser('evaluate', help="score papers with the LLM")
+    p.add_argument('--mode', choices=list(EVALUATORS), default='rolling')
+    p.add_argument('--input', help="default: TARGET/latest_papers.json")
+    p.add_argument('--output', help="default: TARGET/evaluated_papers.json")
+    p.add_argument('--assemble', action='store_true', help="rolling mode: also write the week's evaluated papers")
+    p.add_argument('--store', help="rolling mode: evaluation store (default .cache/evaluations.json)")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser('inject', help="render the weekly report into index.html")
+    p.add_argument('--evaluated', help="default: TARGET/evaluated_papers.json")
+    p.add_argument('--html', help="default: TARGET/index.html")
+    p.set_defaults(func=cmd_inject)
+
+    p = sub.add_parser('restore', help="put last Sunday's report back into index.html")
+    p.add_argument('--report', help="default: TARGET/report/weekly_report.html")
+    p.add_argument('--html', help="default: TARGET/index.html")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser('sort', help="sort the articles in index.html by score")
+    p.set_defaults(func=cmd_sort)
+
+    p = sub.add_parser('run', help="run several stages in order in one process")
+    p.add_argument('stages', nargs='+', choices=['extract', 'evaluate', *HTML_STAGES])
+    p.add_argument('--mode', choices=list(EVALUATORS), default='rolling', help="evaluation mode")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('serve', help="serve evaluated papers over a local HTTP API")
+    p.add_argument('--host', default="127.0.0.1")
+    p.add_argument('--port', type=int, default=8780)
+    p.add_argument('--refresh', type=int, default=30, help="seconds between data file checks (0 = never)")
+    p.add_argument('--store', help="rolling evaluation store (default .cache/evaluations.json)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser('bench', help="run a benchmark suite (startup, stages, io, report, router, serve)")
+    p.add_argument('suite', choices=['startup', 'stages', 'io', 'report', 'router', 'serve'])
+    p.add_argument('args', nargs=argparse.REMAINDER, help="arguments passed to the suite")
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sys.path.insert(0, ROOT)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import json
+import os
+import re
+
+# ================= 配置区域 =================
+# JSON 编解码后端：auto 时按 msgspec > orjson > 标准库 的顺序选第一个可用的 (见 benchmarks/bench_io.py)，
+# 也可以用环境变量 MYARXIV_JSON_CODEC=orjson / msgspec / json 指定 (对比或排查问题时用)
+CODEC = os.getenv("MYARXIV_JSON_CODEC", "auto")
+
+# ================= 编解码后端 =================
+# 所有后端输出的字节与标准库 json.dump(..., indent=2 / separators=(',', ':'), ensure_ascii=False)
+# 完全一致，换后端不会让产物 (以及依赖内容哈希的缓存、ETag) 发生变化。
+# 已知的两处差异单独处理：
+#   - 带指数的浮点数：标准库写 1e+16，orjson / msgspec 写 1e16。输出里有这样的数值时
+#     (流水线的数据里基本不会出现) 这一次改用标准库编码。
+#   - NaN / Infinity：标准库会读写，快速后端不认。所有后端解码时都拒绝它们，保持一致。
+
+
+def _reject_constant(name):
+    raise ValueError(f"invalid JSON constant {name}")
+
+
+def _json_loads(data):
+    return json.loads(data, parse_constant=_reject_constant)
+
+
+def _json_dumps(obj, indent):
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# 先找 "e数字" / "e-数字" 这样的候选 (以 e 开头的模式比 \de 快几倍)，再确认它是一个独立的数值：
+# 前面是数字，整个数值前面 (跳过空白) 是 ':' ',' '[' 或文件开头，后面是 ',' ']' '}' 换行或结尾。
+# 字符串里的 "lr 3e-4" 这类文字不算，不会无谓地退回标准库。
+_EXPONENT_RE = re.compile(rb'e-?\d')
+_DIGITS = frozenset(b'0123456789')
+_NUMBER_CHARS = frozenset(b'0123456789.-')
+
+
+def _has_exponent(data):
+    for m in _EXPONENT_RE.finditer(data):
+        i = m.start() - 1
+        if i < 0 or data[i] not in _DIGITS:
+            continue
+        while i >= 0 and data[i] in _NUMBER_CHARS:
+            i -= 1
+        while i >= 0 and data[i] in b' \n':
+            i -= 1
+        if i >= 0 and data[i] not in b':,[':
+            continue
+        j = m.end()
+        while j < len(data) and data[j] in _DIGITS:
+            j += 1
+        if j == len(data) or data[j] in b',]}\n':
+            return True
+    return False
+
+
+def _make_codecs():
+    codecs = {'json': (_json_loads, _json_dumps)}
+    try:
+        import orjson
+
+        def orjson_dumps(obj, indent):
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+        codecs['orjson'] = (orjson.loads, orjson_dumps)
+    except ImportError:
+        pass
+    try:
+        import msgspec
+
+        def msgspec_dumps(obj, indent):
+            data = msgspec.json.encode(obj)
+            return msgspec.json.format(data, indent=2) if indent else data
+
+        codecs['msgspec'] = (msgspec.json.decode, msgspec_dumps)
+    except ImportError:
+        pass
+    return codecs
+
+
+CODECS = _make_codecs()
+
+
+def select_codec(name=CODEC):
+    if name == 'auto':
+        return next(n for n in ('msgspec', 'orjson', 'json') if n in CODECS)
+    if name not in CODECS:
+        raise ValueError(f"JSON codec {name!r} is not available (installed: {', '.join(CODECS)})")
+    return name
+
+
+_codec = [select_codec()]
+
+
+def use_codec(name):
+    """切换后端 (基准测试用)，返回之前的后端名"""
+    previous = _codec[0]
+    _codec[0] = select_codec(name)
+    return previous
+
+
+def codec_name():
+    return _codec[0]
+
+
+def loads(data):
+    try:
+        return CODECS[_codec[0]][0](data)
+    except ValueError:
+        raise
+    except Exception as e:  # orjson.JSONDecodeError / msgspec.DecodeError 统一成 ValueError
+        raise ValueError(str(e)) from e
+
+
+def dumps(obj, indent=False):
+    """编码成 UTF-8 字节；indent=True 对应 indent=2，否则为紧凑格式"""
+    name = _codec[0]
+    if name != 'json':
+        try:
+            data = CODECS[name][1](obj, indent)
+            if not _has_exponent(data):
+                return data
+        except (TypeError, OverflowError):
+            # 超出 64 位的整数、非字符串键等快速后端不支持的输入
+            pass
+    return _json_dumps(obj, indent)
+
+
+def load(path, schema=None, where=None):
+    with open(path, 'rb') as f:
+        data = loads(f.read())
+    if schema is not None:
+        validate_list(data, schema, where or os.path.basename(path))
+    return data
+
+
+def dump(obj, path, indent=True):
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, indent))
+
+
+def dumps_line(obj):
+    """JSONL 的一行 (紧凑格式，末尾带换行)"""
+    return dumps(obj) + b'\n'
+
+
+def iter_jsonl(text, schema=None, where='jsonl'):
+    for number, line in enumerate(text.splitlines(), 1):
+        if line.strip():
+            record = loads(line)
+            if schema is not None:
+                validate(record, schema, f"{where}:{number}")
+            yield record
+
+
+# ================= 数据结构 =================
+# 每个 schema 是 {字段: (允许的类型, 缺省值)}。缺省值为 REQUIRED 的字段必须存在；
+# 允许的类型也可以是嵌套的 schema (字典)。没有列出的字段原样保留，不做检查，
+# 这样 arxivfeed 或以后新增的字段不会在读写中丢失，产物也保持逐字节不变。
+
+REQUIRED = object()
+NoneType = type(None)
+
+# cache.json 中的论文 (arxivfeed / fetch_arxiv_v1.py 的输出)
+RAW_PAPER_SCHEMA = {
+    'id': (str, REQUIRED),
+    'title': (str, REQUIRED),
+    'authors': (list, REQUIRED),
+    'summary': (str, REQUIRED),
+    'comment': ((str, NoneType), None),
+    'updated': ((str, NoneType), None),
+    'published': ((str, NoneType), None),
+    'pdf_url': ((str, NoneType), None),
+}
+
+# latest_papers.json 中的论文 (extract_papers_v2.py 的输出)
+PAPER_SCHEMA = {
+    'id': (str, REQUIRED),
+    'title': (str, REQUIRED),
+    'authors': ((list, str), REQUIRED),
+    'abstract': (str, REQUIRED),
+    'category': (str, REQUIRED),
+    'comment': ((str, NoneType), None),
+    'publication': (str, "N/A"),
+}
+
+# LLM 返回的评估 (JSON_RESPONSE_TEMPLATE)，缺失的字段按下面的缺省值补上
+EVALUATION_SCHEMA = {
+    'score': ((int, float), 0),
+    'title_zh': (str, ''),
+    'reason': (str, 'N/A'),
+    'summary': (str, 'N/A'),
+    'keywords': (list, []),
+}
+
+# evaluated_papers.json 中的论文：评估字段可能缺失 (未评估 / API Error)
+EVALUATED_PAPER_SCHEMA = {
+    **PAPER_SCHEMA,
+    'score': ((int, float), None),
+    'title_zh': (str, None),
+    'reason': (str, None),
+    'summary': (str, None),
+    'keywords': (list, None),
+    'model': (str, None),
+    'score_samples': (list, None),
+    'score_variance': ((int, float), None),
+    'tier_scores': (dict, None),
+}
+
+# Batch API 结果文件的一行
+BATCH_RESULT_SCHEMA = {
+    'custom_id': (str, REQUIRED),
+    'response': ({
+        'status_code': (int, None),
+        'body': ({
+            'choices': (list, REQUIRED),
+            'usage': ((dict, NoneType), None),
+        }, REQUIRED),
+    }, REQUIRED),
+}
+
+
+def _type_name(types):
+    types = types if isinstance(types, tuple) else (types,)
+    return ' | '.join('null' if t is NoneType else t.__name__ for t in types)
+
+
+def validate(record, schema, where='$', fill=False):
+    """
+    检查 record 的字段类型，不符合时抛出 ValueError (带出错位置，如 latest_papers.json[12].score)。
+    fill=True 时把缺失字段的缺省值写进 record。返回 record。
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"{where}: expected object, got {type(record).__name__}")
+    for field, (types, default) in schema.items():
+        if field not in record:
+            if default is REQUIRED:
+                raise ValueError(f"{where}: missing required field {field!r}")
+            if fill and default is not None:
+                record[field] = list(default) if isinstance(default, list) else default
+            continue
+        value = record[field]
+        if isinstance(types, dict):
+            validate(value, types, f"{where}.{field}", fill)
+        elif not isinstance(value, types) or (isinstance(value, bool) and bool not in
+                                               (types if isinstance(types, tuple) else (types,))):
+            raise ValueError(f"{where}.{field}: expected {_type_name(types)}, got {type(value).__name__}")
+    return record
+
+
+def validate_list(records, schema, where):
+    if not isinstance(records, list):
+        raise ValueError(f"{where}: expected array, got {type(records).__name__}")
+    for i, record in enumerate(records):
+        validate(record, schema, f"{where}[{i}]")
+    return records
+
+
+def validate_cache(cache_data, where='cache.json'):
+    """cache.json：{日期: {分类: [论文, ...]}}"""
+    if not isinstance(cache_data, dict):
+        raise ValueError(f"{where}: expected object, got {type(cache_data).__name__}")
+    for day, subjects in cache_data.items():
+        if not isinstance(subjects, dict):
+            raise ValueError(f"{where}.{day}: expected object, got {type(subjects).__name__}")
+        for category, papers in subjects.items():
+            validate_list(papers, RAW_PAPER_SCHEMA, f"{where}.{day}.{category}")
+    return cache_data
+
+
+def load_cache(path):
+    return validate_cache(load(path), os.path.basename(path))
+
+
+def parse_evaluation(text):
+    """解析并校验 LLM 返回的评估 JSON，缺失字段补缺省值；只保留评估字段"""
+    data = validate(loads(text), EVALUATION_SCHEMA, 'evaluation', fill=True)
+    return {field: data[field] for field in EVALUATION_SCHEMA}
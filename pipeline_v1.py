@@ -0,0 +1,223 @@
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+from paper_io import dump, load
+
+# ================= 配置区域 =================
+# 运行记录 (workflow 中随 .cache/ 一起保留)
+MANIFEST_FILE = ".cache/pipeline_manifest.json"
+
+# 流水线的各个阶段：输入/输出可以是文件或目录 (目录按其中所有文件计算哈希)。
+# 脚本本身也算输入，改了代码会自动重跑。原地修改的文件 (如 index.html) 同时出现在
+# inputs 和 outputs 中，判断是否变化时和上次运行后的输出哈希比较。
+STAGES = [
+    {
+        'name': 'extract',
+        'cmd': [sys.executable, '-u', 'extract_papers_v2.py'],
+        'deps': [],
+        'inputs': ['extract_papers_v2.py', 'paper_io.py', 'highlight.py', 'scripts/config.rhai', 'target/cache.json'],
+        'outputs': ['target/latest_papers.json'],
+    },
+    {
+        # 周一到周六：只评估新出现的论文，结果存入 .cache/evaluations.json
+        'name': 'evaluate_daily',
+        'cmd': [sys.executable, '-u', 'evaluate_rolling_v1.py'],
+        'deps': ['extract'],
+        'inputs': ['evaluate_rolling_v1.py', 'evaluate_papers_v2.1.py', 'paper_io.py', 'target/latest_papers.json'],
+        'outputs': ['.cache/evaluations.json'],
+    },
+    {
+        # 周日：补评遗漏的论文，再从结果库组装整周的 evaluated_papers.json
+        'name': 'evaluate',
+        'cmd': [sys.executable, '-u', 'evaluate_rolling_v1.py', '--assemble'],
+        'deps': ['extract'],
+        'inputs': ['evaluate_rolling_v1.py', 'evaluate_papers_v2.1.py', 'paper_io.py', 'target/latest_papers.json'],
+        'outputs': ['target/evaluated_papers.json', '.cache/evaluations.json'],
+    },
+    {
+        'name': 'postprocess',
+        'cmd': [sys.executable, '-u', 'postprocess_html_v1.py'],
+        'deps': ['evaluate'],
+        'inputs': ['postprocess_html_v1.py', 'inject_html_v2.py', 'restore_report.py', 'sort_papers_v2.py',
+                   'shard_days_v1.py', 'report_template.py', 'highlight.py', 'paper_io.py', 'scripts/config.rhai',
+                   'target/index.html', 'target/cache.json',
+                   'target/evaluated_papers.json', 'target/report/weekly_report.html'],
+        'outputs': ['target/index.html', 'target/report', 'target/data'],
+    },
+    {
+        'name': 'search_index',
+        'cmd': [sys.executable, '-u', 'build_search_index_v1.py'],
+        'deps': ['postprocess'],
+        'inputs': ['build_search_index_v1.py', 'paper_io.py', 'target/cache.json', 'target/evaluated_papers.json',
+                   'target/report/weekly_report.json'],
+        'outputs': ['target/search'],
+    },
+    {
+        # 压缩会原地改写 evaluated_papers.json，归档要排在 compress 之前
+        'name': 'archive',
+        'cmd': [sys.executable, '-u', 'archive_papers_v1.py', 'add', 'target/evaluated_papers.json'],
+        'deps': ['evaluate'],
+        'inputs': ['archive_papers_v1.py', 'paper_io.py', 'target/evaluated_papers.json'],
+        'outputs': ['.cache/archive'],
+    },
+    {
+        'name': 'compress',
+        'cmd': [sys.executable, '-u', 'compress_site_v1.py', 'target'],
+        'deps': ['search_index', 'archive'],
+        'inputs': ['compress_site_v1.py', 'target'],
+        'outputs': ['target'],
+    },
+]
+
+
+# ================= 哈希 =================
+
+def hash_path(path):
+    """文件或目录的内容哈希，不存在返回 None"""
+    if os.path.isfile(path):
+        paths = [path]
+    elif os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, files in os.walk(path) for name in files)
+    else:
+        return None
+    digest = hashlib.sha256()
+    for p in paths:
+        digest.update(os.path.relpath(p, path).encode('utf-8') + b'\0')
+        with open(p, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_all(paths):
+    return {p: hash_path(p) for p in paths}
+
+
+# ================= 调度 =================
+
+def topo_order(stages):
+    by_name = {s['name']: s for s in stages}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline has a cycle at stage {name!r}")
+        visiting.add(name)
+        for dep in by_name[name]['deps']:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        ordered.append(by_name[name])
+
+    for stage in stages:
+        visit(stage['name'])
+    return ordered
+
+
+def is_up_to_date(stage, record):
+    """上次成功、输入没变、输出还在且没被改过 -> 可以跳过"""
+    if not record or record.get('status') != 'success':
+        return False
+    current = hash_all(stage['inputs'])
+    for path, digest in current.items():
+        # 原地修改的文件：和上次运行后的结果比较
+        expected = record['outputs'].get(path, record['inputs'].get(path)) \
+            if path in stage['outputs'] else record['inputs'].get(path)
+        if digest != expected:
+            return False
+    for path in stage['outputs']:
+        if path in current:
+            continue
+        digest = hash_path(path)
+        if digest is None or digest != record['outputs'].get(path):
+            return False
+    return True
+
+
+def run_stage(stage):
+    """以子进程运行阶段，返回 (退出码, 耗时秒, 峰值 RSS MB)"""
+    start = time.time()
+    process = subprocess.Popen(stage['cmd'])
+    # wait4 返回的是这个子进程自己的资源占用；Linux 上 ru_maxrss 单位是 KB
+    _, status, usage = os.wait4(process.pid, 0)
+    return os.waitstatus_to_exitcode(status), time.time() - start, usage.ru_maxrss / 1024
+
+
+def load_manifest(path):
+    if os.path.exists(path):
+        return load(path)
+    return {'stages': {}, 'runs': []}
+
+
+def save_manifest(manifest, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    dump(manifest, path)
+
+
+def main(selected, force=False, manifest_file=MANIFEST_FILE):
+    manifest = load_manifest(manifest_file)
+    run = {'started': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'stages': []}
+    manifest['runs'] = manifest['runs'][-49:] + [run]  # 只保留最近 50 次运行记录
+    exit_code = 0
+
+    for stage in topo_order(STAGES):
+        name = stage['name']
+        if name not in selected:
+            continue
+        record = manifest['stages'].get(name)
+        if not force and is_up_to_date(stage, record):
+            print(f"[pipeline] {name}: inputs unchanged, skipped")
+            run['stages'].append({'name': name, 'status': 'skipped'})
+            continue
+
+        print(f"[pipeline] {name}: running {' '.join(stage['cmd'][1:])}", flush=True)
+        inputs = hash_all(stage['inputs'])
+        code, seconds, rss = run_stage(stage)
+        status = 'success' if code == 0 else 'failed'
+        manifest['stages'][name] = {
+            'status': status,
+            'inputs': inputs,
+            'outputs': hash_all(stage['outputs']) if code == 0 else {},
+            'seconds': round(seconds, 3),
+            'peak_rss_mb': round(rss, 1),
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        run['stages'].append({'name': name, 'status': status, 'seconds': round(seconds, 3),
+                              'peak_rss_mb': round(rss, 1)})
+        save_manifest(manifest, manifest_file)
+        print(f"[pipeline] {name}: {status} in {seconds:.1f}s, peak RSS {rss:.1f} MB", flush=True)
+
+        if code != 0:
+            # 下游不再执行；下次运行时上游输入没变会被跳过，从失败的这一步重新开始
+            exit_code = code
+            break
+
+    if exit_code == 0:
+        # 后面的阶段会原地修改前面阶段的文件 (如 compress 压缩 cache.json / index.html)，
+        # 整条流水线成功后按最终状态重新记录哈希，下次运行才能正确判断"没有变化"
+        for stage in STAGES:
+            record = manifest['stages'].get(stage['name'])
+            if stage['name'] in selected and record and record['status'] == 'success':
+                record['inputs'] = hash_all(stage['inputs'])
+                record['outputs'] = hash_all(stage['outputs'])
+
+    save_manifest(manifest, manifest_file)
+    return exit_code
+
+
+if __name__ == "__main__":
+    names = [s['name'] for s in STAGES]
+    parser = argparse.ArgumentParser(description="Run the build stages, skipping those whose inputs are unchanged.")
+    parser.add_argument('--only', nargs='+', choices=names, help="run only these stages")
+    parser.add_argument('--skip', nargs='+', choices=names, default=[], help="stages to leave out")
+    parser.add_argument('--force', action='store_true', help="rerun stages even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    selected = {n for n in names if (not args.only or n in args.only) and n not in args.skip}
+    sys.exit(main(selected, force=args.force))
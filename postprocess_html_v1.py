@@ -0,0 +1,59 @@
+import argparse
+import resource
+import time
+
+from html_pipeline import TRANSFORMS, load_html, make_context, write_html
+from profiling import profiled, span
+
+# 导入即注册各自的页面变换
+import inject_html_v2  # noqa: F401  inject_report
+import restore_report  # noqa: F401  restore_report
+import sort_papers_v2  # noqa: F401  sort_articles
+import shard_days_v1   # noqa: F401  shard_days
+
+# ================= 配置区域 =================
+# 默认执行顺序：周日 inject_report 生成新周报，restore_report 发现已有周报会自动跳过；
+# 平日没有 evaluated_papers.json，inject_report 跳过，由 restore_report 拼回上周的周报
+DEFAULT_ORDER = ['inject_report', 'restore_report', 'sort_articles', 'shard_days']
+
+
+def peak_rss_mb():
+    # Linux 上 ru_maxrss 单位是 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@profiled("postprocess")
+def main(target_dir, order):
+    ctx = make_context(target_dir)
+    timings = []
+
+    start = time.perf_counter()
+    soup = load_html(ctx)
+    timings.append(('parse', time.perf_counter() - start))
+
+    for name in order:
+        start = time.perf_counter()
+        with span(name):
+            TRANSFORMS[name](soup, ctx)
+        timings.append((name, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    write_html(soup, ctx)
+    timings.append(('serialize', time.perf_counter() - start))
+
+    print(f"{'step':<20}{'seconds':>10}")
+    for name, seconds in timings:
+        print(f"{name:<20}{seconds:>10.3f}")
+    print(f"{'TOTAL':<20}{sum(s for _, s in timings):>10.3f}")
+    print(f"Peak RSS: {peak_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse target/index.html once and apply the registered transforms in order.")
+    parser.add_argument('--target', default="target", help="publish directory containing index.html")
+    parser.add_argument('--only', nargs='+', choices=DEFAULT_ORDER, help="run only these transforms (kept in default order)")
+    parser.add_argument('--skip', nargs='+', choices=DEFAULT_ORDER, default=[], help="transforms to skip")
+    args = parser.parse_args()
+
+    selected = [n for n in DEFAULT_ORDER if (not args.only or n in args.only) and n not in args.skip]
+    main(args.target, selected)
@@ -0,0 +1,320 @@
+import argparse
+import importlib.util
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+
+from llm_cassette import replaying
+from paper_io import PAPER_SCHEMA, dump, load
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # 没装 tiktoken 时用本地近似
+    _ENCODING = None
+
+# ================= 配置区域 =================
+# 每次评估 (实时 / batch) 结束时追加一行实测数据，用来估计输出 token 和吞吐
+HISTORY_FILE = ".cache/eval_history.jsonl"
+# Batch API 的价格折扣 (DashScope batch 为实时价格的 50%)
+BATCH_DISCOUNT = 0.5
+# 没有历史数据时的默认值
+DEFAULT_OUTPUT_TOKENS = 400
+DEFAULT_REQUEST_SECONDS = 8.0          # 实时单次请求耗时
+DEFAULT_BATCH_OVERHEAD = 15 * 60       # batch 排队/启动的固定开销 (秒)
+DEFAULT_BATCH_RATE = 2.0               # batch 开始执行后的处理速度 (篇/秒)
+DEFAULT_ESCALATION_RATE = 0.5          # CASCADE=1 时升级到下一级的论文比例 (没有历史时)
+# 中文每个字大约对应的 token 数 (Qwen 的词表对常用汉字大多是一字一 token 或更少)
+CJK_TOKENS_PER_CHAR = 0.8
+
+
+# ================= 实测记录 =================
+
+_history_lock = threading.Lock()
+
+
+def append_history(mode, model, papers, seconds, calls, prompt_tokens, completion_tokens):
+    """评估脚本在结束时调用，记录一次运行的实测吞吐和 token 数 (回放的运行不算)"""
+    if not papers or replaying():
+        return
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'mode': mode, 'model': model, 'papers': papers, 'seconds': round(seconds, 2), 'calls': calls,
+        'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+    }
+    with _history_lock:
+        os.makedirs(os.path.dirname(HISTORY_FILE) or '.', exist_ok=True)
+        with open(HISTORY_FILE, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def load_history(path=HISTORY_FILE, limit=50):
+    records = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    return records[-limit:]
+
+
+# ================= token 估计 =================
+
+_CJK_RE = re.compile(r'[　-〿㐀-鿿豈-﫿＀-￯]')
+_PIECE_RE = re.compile(r'[A-Za-z]+|\d|[^\sA-Za-z\d]')
+
+
+def count_tokens(text):
+    """有 tiktoken 时精确计数 (cl100k 与 Qwen 词表规模接近)，否则按字符类别近似"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    cjk = len(_CJK_RE.findall(text))
+    tokens = 0
+    for piece in _PIECE_RE.findall(_CJK_RE.sub(' ', text)):
+        # 长英文单词会被切成几个子词，大约每 6 个字母一个
+        tokens += 1 + (len(piece) - 1) // 6 if piece.isalpha() else 1
+    return math.ceil(cjk * CJK_TOKENS_PER_CHAR) + tokens
+
+
+def load_evaluator(name):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    spec = importlib.util.spec_from_file_location(name[:-3].replace('.', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def render_prompt(evaluator, paper):
+    # 与 evaluate_papers_v2.1 / v2.5 中完全相同的拼法，另加 system 消息
+    return 'You are a critical academic reviewer.\n' + evaluator.PROMPT_TEMPLATE.format(
+        title=paper['title'],
+        authors=', '.join(paper['authors']) if isinstance(paper['authors'], list) else paper['authors'],
+        abstract=paper['abstract'],
+        comment=paper.get('comment', ''),
+        category=paper['category'],
+    ) + evaluator.JSON_RESPONSE_TEMPLATE
+
+
+# ================= 估算 =================
+
+def escalation_rates(history, tiers):
+    """
+    CASCADE 时每一级实际评估的论文占第一级的比例。级联运行中各级依次记一条历史，
+    所以第一级的记录后面紧跟的第 k 级记录就是同一次运行；没有历史的级按 DEFAULT_ESCALATION_RATE 逐级递减
+    """
+    models = [t['model'] for t in tiers]
+    ratios = {m: [] for m in models[1:]}
+    first = None
+    for r in history:
+        if r['mode'] != 'realtime':
+            continue
+        if r['model'] == models[0]:
+            first = r['papers']
+        elif first and r['model'] in ratios:
+            ratios[r['model']].append(r['papers'] / first)
+    shares = [1.0]
+    for model in models[1:]:
+        shares.append(statistics.median(ratios[model]) if ratios[model] else shares[-1] * DEFAULT_ESCALATION_RATE)
+    return shares
+
+
+def estimate(papers, pending, evaluator, history):
+    """返回用于规划的各项参数 (token、各级单价和调用次数、吞吐)"""
+    prompt_tokens = sum(count_tokens(render_prompt(evaluator, p)) for p in pending)
+
+    per_call = [r['completion_tokens'] / r['calls'] for r in history if r.get('calls') and r.get('completion_tokens')]
+    output_per_call = statistics.median(per_call) if per_call else DEFAULT_OUTPUT_TOKENS
+
+    # 实时评估按级计价：CASCADE=1 时每一级用自己的单价，只有升级的那部分论文付下一级的钱；
+    # 自洽采样会产生额外调用，按该模型实时运行的历史 calls/papers 放大
+    prices = {t['model']: t for t in evaluator.CASCADE_TIERS}
+    if evaluator.CASCADE:
+        tiers = [dict(t) for t in evaluator.CASCADE_TIERS]
+        shares = escalation_rates(history, tiers)
+    else:
+        tiers, shares = [dict(prices.get(evaluator.MODEL_NAME, {}), model=evaluator.MODEL_NAME)], [1.0]
+    seconds_per_paper = 0.0
+    for tier, share in zip(tiers, shares):
+        runs = [r for r in history if r['mode'] == 'realtime' and r['model'] == tier['model']]
+        ratios = [r['calls'] / r['papers'] for r in runs if r.get('calls')]
+        tier['share'] = share
+        tier['calls_per_paper'] = statistics.median(ratios) if ratios else 1.0
+        rates = [r['papers'] / r['seconds'] for r in runs if r['seconds'] > 0]
+        if rates:
+            rate = statistics.median(rates)
+        else:
+            rate = evaluator.MAX_WORKERS / DEFAULT_REQUEST_SECONDS / tier['calls_per_paper']
+            if evaluator.QPS_LIMIT > 0:
+                rate = min(rate, evaluator.QPS_LIMIT / tier['calls_per_paper'])
+        seconds_per_paper += share / rate
+    calls_per_paper = sum(t['share'] * t['calls_per_paper'] for t in tiers)
+    realtime_rate = 1 / seconds_per_paper
+
+    batch_rate = DEFAULT_BATCH_RATE
+    batch_runs = [r for r in history if r['mode'] == 'batch' and r['seconds'] > DEFAULT_BATCH_OVERHEAD]
+    if batch_runs:
+        batch_rate = statistics.median(r['papers'] / (r['seconds'] - DEFAULT_BATCH_OVERHEAD) for r in batch_runs)
+
+    # batch (evaluate_papers_v2.5.py) 不做级联，全部用 MODEL_NAME 评一次
+    batch_price = prices.get(evaluator.MODEL_NAME, {})
+    return {
+        'papers': len(papers), 'pending': len(pending), 'cached': len(papers) - len(pending),
+        'prompt_tokens': prompt_tokens, 'output_per_call': output_per_call, 'calls_per_paper': calls_per_paper,
+        'realtime_rate': realtime_rate, 'batch_rate': batch_rate, 'batch_overhead': DEFAULT_BATCH_OVERHEAD,
+        'tiers': [{k: t.get(k, 0) for k in ('model', 'share', 'calls_per_paper', 'input_price', 'output_price')}
+                  for t in tiers],
+        'batch_input_price': batch_price.get('input_price', 0),
+        'batch_output_price': batch_price.get('output_price', 0),
+    }
+
+
+def plan_cost(est, n_realtime, n_batch):
+    """n_realtime 篇走实时、n_batch 篇走 batch 的 (成本, 耗时秒)"""
+    n = est['pending'] or 1
+    avg_prompt = est['prompt_tokens'] / n
+
+    def call_cost(input_price, output_price):
+        return (avg_prompt * input_price + est['output_per_call'] * output_price) / 1e6
+
+    realtime_per_paper = sum(t['share'] * t['calls_per_paper'] * call_cost(t['input_price'], t['output_price'])
+                             for t in est['tiers'])
+    batch_per_paper = call_cost(est['batch_input_price'], est['batch_output_price']) * BATCH_DISCOUNT
+    cost = n_realtime * realtime_per_paper + n_batch * batch_per_paper
+    realtime_time = n_realtime / est['realtime_rate'] if n_realtime else 0
+    batch_time = est['batch_overhead'] + n_batch / est['batch_rate'] if n_batch else 0
+    return cost, max(realtime_time, batch_time)
+
+
+def build_plans(est, deadline=None):
+    n = est['pending']
+    plans = {'realtime': (n, 0), 'batch': (0, n)}
+    # hybrid：batch 处理尽可能多 (便宜)，实时处理剩下的。有截止时间时取能赶上的最大 batch 份额，
+    # 否则取两边同时结束 (总耗时最短) 的分割点
+    rr, rb, overhead = est['realtime_rate'], est['batch_rate'], est['batch_overhead']
+    if deadline:
+        n_batch = max(0, min(n, math.floor((deadline - overhead) * rb)))
+    else:
+        n_batch = max(0, min(n, math.floor((n / rr - overhead) / (1 / rb + 1 / rr))))
+    if 0 < n_batch < n:
+        plans['hybrid'] = (n - n_batch, n_batch)
+    result = []
+    for name, (n_realtime, n_batch) in plans.items():
+        cost, seconds = plan_cost(est, n_realtime, n_batch)
+        result.append({'plan': name, 'realtime': n_realtime, 'batch': n_batch,
+                       'cost': round(cost, 4), 'seconds': round(seconds, 1)})
+    return result
+
+
+def choose_plan(plans, budget=None, deadline=None):
+    feasible = [p for p in plans if (budget is None or p['cost'] <= budget)
+                and (deadline is None or p['seconds'] <= deadline)]
+    if not feasible:
+        return None
+    return min(feasible, key=lambda p: (p['cost'], p['seconds']))
+
+
+def parse_duration(value):
+    """90m / 2h / 3600s / 3600 -> 秒"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smh]?)', value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration {value!r}")
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+# ================= 执行 =================
+
+def run_plan(plan, pending, store_file):
+    """按计划评估待评估的论文 (实时与 batch 并行)，结果写入滚动评估的结果库"""
+    import evaluate_rolling_v1 as rolling
+
+    parts = {'realtime': pending[:plan['realtime']], 'batch': pending[plan['realtime']:]}
+    scripts = {'realtime': "evaluate_papers_v2.1.py", 'batch': "evaluate_papers_v2.5.py"}
+    os.makedirs(".cache", exist_ok=True)
+    outputs, threads = {}, []
+    for mode, part in parts.items():
+        if not part:
+            continue
+        src, dst = f".cache/preflight_{mode}_in.json", f".cache/preflight_{mode}_out.json"
+        dump(part, src)
+        if os.path.exists(dst):
+            os.remove(dst)
+        module = load_evaluator(scripts[mode])
+        threads.append(threading.Thread(target=module.main, args=(src, dst)))
+        outputs[mode] = dst
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    store = rolling.load_store(store_file)
+    now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    stored = 0
+    for path in outputs.values():
+        if not os.path.exists(path):
+            continue
+        for paper in load(path):
+            if 'model' not in paper:
+                continue
+            entry = {k: paper[k] for k in rolling.EVAL_FIELDS if k in paper}
+            entry.update(id=paper['id'], content_hash=rolling.content_hash(paper), evaluated_at=now)
+            store[rolling.get_base_id(paper['id'])] = entry
+            stored += 1
+    rolling.save_store(store, store_file)
+    print(f"已将 {stored}/{len(pending)} 篇评估结果写入 {store_file}。")
+
+
+def main(latest_file, budget=None, deadline=None, run=False, output_file=None):
+    import evaluate_rolling_v1 as rolling
+
+    papers = load(latest_file, PAPER_SCHEMA)
+    store_file = rolling.STORE_FILE
+    pending = rolling.pending_papers(papers, rolling.load_store(store_file))
+    evaluator = load_evaluator("evaluate_papers_v2.1.py")
+    history = load_history()
+    est = estimate(papers, pending, evaluator, history)
+
+    print(f"{est['papers']} papers, {est['cached']} already evaluated, {est['pending']} to send "
+          f"({'tiktoken' if _ENCODING else 'approximate'} count: {est['prompt_tokens']} prompt tokens, "
+          f"~{est['output_per_call']:.0f} output tokens/call, {est['calls_per_paper']:.2f} calls/paper, "
+          f"{len(history)} history records)")
+    if len(est['tiers']) > 1:
+        print("cascade: " + ", ".join(f"{t['model']} {t['share']:.0%} of papers" for t in est['tiers']))
+    print(f"throughput: realtime {est['realtime_rate']:.2f} papers/s, "
+          f"batch {est['batch_rate']:.2f} papers/s after ~{est['batch_overhead'] / 60:.0f} min queueing")
+
+    plans = build_plans(est, deadline)
+    print(f"{'plan':<10}{'realtime':>10}{'batch':>8}{'cost':>10}{'wall time':>12}")
+    for p in plans:
+        print(f"{p['plan']:<10}{p['realtime']:>10}{p['batch']:>8}{p['cost']:>10.4f}{p['seconds'] / 60:>10.1f} m")
+
+    chosen = choose_plan(plans, budget, deadline)
+    if chosen is None:
+        limits = [f"预算 {budget}" if budget is not None else '', f"截止时间 {deadline / 60:.0f} 分钟" if deadline else '']
+        print(f"没有满足 {' / '.join(l for l in limits if l)} 的方案，拒绝运行。")
+        return 2
+    print(f"Chosen plan: {chosen['plan']} (cost {chosen['cost']:.4f}, ~{chosen['seconds'] / 60:.1f} min)")
+
+    if run and pending:
+        run_plan(chosen, pending, store_file)
+    if run and output_file:
+        store = rolling.load_store(store_file)
+        dump(rolling.assemble(papers, store), output_file)
+        print(f"已组装 {len(papers)} 篇论文的评估到 {output_file}。")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate tokens, cost and time of an evaluation run and pick a plan.")
+    parser.add_argument('--latest', default="target/latest_papers.json")
+    parser.add_argument('--budget', type=float, help="maximum cost (same currency as the prices in CASCADE_TIERS)")
+    parser.add_argument('--deadline', type=parse_duration, help="maximum wall time, e.g. 90m or 2h")
+    parser.add_argument('--run', action='store_true', help="execute the chosen plan")
+    parser.add_argument('--assemble', metavar='OUTPUT', nargs='?', const="target/evaluated_papers.json",
+                        help="with --run, also write the week's evaluated papers")
+    args = parser.parse_args()
+    sys.exit(main(args.latest, args.budget, args.deadline, args.run, args.assemble))
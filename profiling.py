@@ -0,0 +1,141 @@
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# ================= 可选的性能分析 =================
+# 通过环境变量开启，未设置时 span() 返回同一个空上下文、profiled() 原样返回函数，几乎没有开销。
+#
+#   MYARXIV_PROFILE=all                      全部开启 (也可写 1 / true)
+#   MYARXIV_PROFILE=spans,cprofile           只开启其中几项：spans / cprofile / tracemalloc
+#   MYARXIV_PROFILE_DIR=profile              报告输出目录
+#   MYARXIV_PROFILE_TOP=30                   cProfile / tracemalloc 列出的条目数
+#
+# cProfile 只统计调用它的线程，所以 main 运行期间新启动的线程 (评估用的线程池等) 各挂一个
+# 分析器，报告里合并显示；main 开始之前就已经存在的线程不在统计范围内。
+
+_ALL_MODES = {'spans', 'cprofile', 'tracemalloc'}
+_MODES = {m.strip() for m in os.getenv("MYARXIV_PROFILE", "").lower().split(",") if m.strip()}
+_MODES -= {'0', 'false', 'off'}
+if _MODES & {'1', 'true', 'all'}:
+    _MODES = set(_ALL_MODES)
+_MODES &= _ALL_MODES
+
+ENABLED = bool(_MODES)
+PROFILE_DIR = os.getenv("MYARXIV_PROFILE_DIR", "profile")
+TOP_N = int(os.getenv("MYARXIV_PROFILE_TOP", "30"))
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_spans = {}  # name -> [count, total, max]
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            stat = _spans.setdefault(self.name, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] = max(stat[2], elapsed)
+        return False
+
+
+def span(name):
+    """给一个阶段计时：with span("load"): ...  (多线程中同名 span 会累加)"""
+    if 'spans' not in _MODES:
+        return _NULL
+    return _Span(name)
+
+
+def _format_spans():
+    lines = [f"{'span':<24}{'count':>8}{'total s':>12}{'mean ms':>12}{'max ms':>12}"]
+    for name, (count, total, longest) in sorted(_spans.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{name:<24}{count:>8}{total:>12.3f}{total / count * 1000:>12.2f}{longest * 1000:>12.2f}")
+    return "\n".join(lines)
+
+
+def _write_report(script, wall, sections):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{script}-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"# {script}  wall={wall:.3f}s  modes={','.join(sorted(_MODES))}\n")
+        for title, body in sections:
+            f.write(f"\n## {title}\n{body}\n")
+    print(f"[profile] report written to {path}")
+
+
+def _profile_new_threads(profilers):
+    """之后由 threading 启动的线程在第一次调用时各自开启一个 cProfile 分析器"""
+    import cProfile
+
+    def start(frame, event, arg):
+        profiler = cProfile.Profile()
+        with _lock:
+            profilers.append(profiler)
+        profiler.enable()  # 替换掉当前线程的这个钩子
+
+    threading.setprofile(start)
+
+
+def profiled(script):
+    """装饰脚本的 main：按开启的模式收集 cProfile / tracemalloc / span，结束后写出报告"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = None
+            thread_profilers = []
+            if 'cprofile' in _MODES:
+                import cProfile
+                profiler = cProfile.Profile()
+                _profile_new_threads(thread_profilers)
+            if 'tracemalloc' in _MODES:
+                import tracemalloc
+                tracemalloc.start(10)
+
+            start = time.perf_counter()
+            try:
+                if profiler:
+                    return profiler.runcall(fn, *args, **kwargs)
+                return fn(*args, **kwargs)
+            finally:
+                wall = time.perf_counter() - start
+                sections = []
+                if 'spans' in _MODES:
+                    sections.append(("spans", _format_spans()))
+                if profiler:
+                    import io
+                    import pstats
+                    threading.setprofile(None)
+                    with _lock:
+                        thread_profilers = list(thread_profilers)
+                    out = io.StringIO()
+                    pstats.Stats(profiler, *thread_profilers, stream=out).sort_stats('cumulative').print_stats(TOP_N)
+                    sections.append((f"cProfile (top {TOP_N} by cumulative time, main thread + "
+                                     f"{len(thread_profilers)} worker threads)", out.getvalue()))
+                if 'tracemalloc' in _MODES:
+                    snapshot = tracemalloc.take_snapshot()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    top = snapshot.statistics('lineno')[:TOP_N]
+                    body = [f"peak traced memory: {peak / 1024 / 1024:.1f} MB",
+                            f"top {TOP_N} allocation sites still alive at exit:"]
+                    body += [str(stat) for stat in top]
+                    sections.append(("tracemalloc", "\n".join(body)))
+                _write_report(script, wall, sections)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,190 @@
+import hashlib
+import html
+import re
+
+from highlight import HIGHLIGHT_VERSION, has_watched_author, highlight_author, highlight_ranges, highlight_title, \
+    parse_venue
+
+# ================= 模板引擎 =================
+# 与 includes/index.hbs 相同的占位符写法：
+#   {{field}}   -> HTML 转义后插入
+#   {{{field}}} -> 原样插入 (用于已经渲染好的片段)
+# 模板在模块加载时只编译一次，渲染时只做字符串拼接。
+
+_PLACEHOLDER_RE = re.compile(r'\{\{\{(\w+)\}\}\}|\{\{(\w+)\}\}')
+
+
+def compile_template(template):
+    """把模板字符串编译成 render(ctx) 函数"""
+    parts = []  # (literal, field, escape)
+    pos = 0
+    for m in _PLACEHOLDER_RE.finditer(template):
+        raw_field, esc_field = m.group(1), m.group(2)
+        parts.append((template[pos:m.start()], raw_field or esc_field, esc_field is not None))
+        pos = m.end()
+    tail = template[pos:]
+    escape = html.escape
+
+    def render(ctx):
+        out = []
+        for literal, field, do_escape in parts:
+            out.append(literal)
+            value = ctx.get(field, '')
+            value = '' if value is None else str(value)
+            out.append(escape(value) if do_escape else value)
+        out.append(tail)
+        return ''.join(out)
+
+    render.source = template
+    return render
+
+
+# ================= Weekly Top Picks 模板 =================
+# 样式都在 statics/index.css 的 .report-* 类中，这里不再写内联 style
+
+SECTION_TEMPLATE = compile_template(
+    '<section class="day-container report-container">'
+    '<div class="date report-header">🏆 Weekly Top Picks ({{shown}} / {{count}} Papers)</div>'
+    '{{{articles}}}'
+    '{{{more}}}'
+    '</section>'
+)
+
+# 剩余论文由 statics/index.js 从 data-src 指向的 JSON 按需加载渲染
+MORE_TEMPLATE = compile_template(
+    '<div class="report-more" data-src="{{src}}" data-count="{{rest}}">'
+    '<select class="report-min-score">'
+    '<option value="0">All scores</option>'
+    '<option value="4">≥ 4</option>'
+    '<option value="6" selected>≥ 6</option>'
+    '<option value="8">≥ 8</option>'
+    '</select>'
+    '<button class="chip report-more-button" type="button">Show more ({{rest}})</button>'
+    '</div>'
+)
+
+PAPER_TEMPLATE = compile_template(
+    '<article class="report-article">'
+    '<details class="article-expander" open="true">'
+    '<summary class="article-expander-title report-title-row">'
+    '<span class="chip report-score">{{score}}</span>'
+    '<span class="report-links">'
+    '<a href="{{abs_link}}" target="_blank"><i class="ri-links-line"></i></a>'
+    '<a href="{{pdf_link}}" target="_blank"><i class="ri-file-pdf-line"></i></a>'
+    '</span>'
+    '<div class="report-title-box">'
+    '<span class="report-title">{{{title}}}</span>'
+    '{{{publication}}}'
+    '</div>'
+    '</summary>'
+    '{{{rows}}}'
+    '</details>'
+    '</article>'
+)
+
+ROW_TEMPLATE = compile_template(
+    '<div class="report-row">'
+    '<span class="chip report-label">{{label}}</span>'
+    '<span class="report-content {{extra_class}}">{{content}}</span>'
+    '</div>'
+)
+
+# 内容已经是转义并高亮过的 HTML (作者行)
+ROW_HTML_TEMPLATE = compile_template(
+    '<div class="report-row">'
+    '<span class="chip report-label">{{label}}</span>'
+    '<span class="report-content {{extra_class}}">{{{content}}}</span>'
+    '</div>'
+)
+
+PUBLICATION_TEMPLATE = compile_template('<span class="chip">{{publication}}</span>')
+
+# 模板版本：模板或高亮名单一改，fragment_cache 中旧的片段自动失效
+TEMPLATE_VERSION = hashlib.sha1(''.join(
+    t.source for t in (PAPER_TEMPLATE, ROW_TEMPLATE, ROW_HTML_TEMPLATE, PUBLICATION_TEMPLATE)
+).encode('utf-8') + HIGHLIGHT_VERSION.encode('utf-8')).hexdigest()[:12]
+
+
+# ================= 渲染函数 =================
+
+def _join_list(value, sep):
+    if isinstance(value, list):
+        return sep.join(value)
+    return value
+
+
+def render_row(label, content, extra_class='', template=ROW_TEMPLATE):
+    if not content or content == "N/A":
+        return ''
+    return template({'label': label, 'content': content, 'extra_class': extra_class})
+
+
+def render_paper(paper):
+    """渲染单篇论文的 <article> 片段"""
+    abs_link = paper['id']
+    pdf_link = re.sub(r'v\d+$', '', abs_link.replace('/abs/', '/pdf/'))
+
+    # 与页面 (scripts/highlight_*.rhai) 相同的高亮：标题关键词、关注的作者 (★)、comment 中的会议
+    authors = paper['authors'] if isinstance(paper['authors'], list) else [paper['authors']]
+    title_html = highlight_title(paper['title'])
+    if has_watched_author(authors):
+        title_html = '<span class="highlight-title">★</span> ' + title_html
+
+    # publication 由 extract 阶段从 comment 解析 (见 highlight.parse_venue)，旧数据没有时现场解析
+    publication = paper.get('publication')
+    if not publication or publication == "N/A":
+        publication = parse_venue(paper.get('comment'))
+    publication_html = PUBLICATION_TEMPLATE({'publication': publication}) if publication else ''
+
+    rows = [
+        render_row("Title CN", paper.get('title_zh')),
+        render_row("Keywords", _join_list(paper.get('keywords', []), " · ")),
+        render_row("Summary", paper.get('summary', '')),
+        render_row("Reason", paper.get('reason', '')),
+        render_row("Abstract", paper.get('abstract', '')),
+        render_row("Authors", ", ".join(highlight_author(a) for a in authors), 'report-authors', ROW_HTML_TEMPLATE),
+        render_row("Comment", paper.get('comment')),
+        render_row("Categories", paper.get('category', '')),
+    ]
+
+    return PAPER_TEMPLATE({
+        'score': paper['score'],
+        'abs_link': abs_link,
+        'pdf_link': pdf_link,
+        'title': title_html,
+        'publication': publication_html,
+        'rows': ''.join(rows),
+    })
+
+
+def render_report_section(papers, rest_count=0, rest_src='', render=render_paper):
+    """
+    渲染整个 Weekly Top Picks <section>，papers 需已按分数排序。
+    rest_count > 0 时在末尾附加 "Show more"，剩余论文从 rest_src 懒加载。
+    render 可替换为带缓存的版本 (见 fragment_cache.py)。
+    """
+    more = MORE_TEMPLATE({'src': rest_src, 'rest': rest_count}) if rest_count else ''
+    return SECTION_TEMPLATE({
+        'shown': len(papers),
+        'count': len(papers) + rest_count,
+        'articles': ''.join(render(p) for p in papers),
+        'more': more,
+    })
+
+
+# 写入懒加载 JSON 时保留的字段 (其余如 published/updated/pdf_url 前端用不到)
+REST_FIELDS = ('id', 'score', 'title', 'title_zh', 'publication', 'keywords', 'summary',
+               'reason', 'abstract', 'authors', 'comment', 'category')
+
+
+def compact_paper(paper):
+    """精简论文字典，丢掉空值和 N/A，用于懒加载 JSON；附带高亮区间供前端渲染"""
+    compact = {k: paper[k] for k in REST_FIELDS if paper.get(k) not in (None, '', [], 'N/A')}
+    if 'publication' not in compact:
+        venue = parse_venue(paper.get('comment'))
+        if venue:
+            compact['publication'] = venue
+    ranges = highlight_ranges(paper)
+    if ranges:
+        compact['highlights'] = ranges
+    return compact
@@ -1,53 +1,39 @@
 import os
-from bs4 import BeautifulSoup
 
-def restore_weekly_report(backup_file, current_file):
-    # 1. 读取备份的旧网页（包含 AI 报告）
-    if not os.path.exists(backup_file):
-        print("没有找到备份文件，无法恢复报告。")
+from html_pipeline import load_html, make_context, register, write_html
+from inject_html_v2 import REPORT_HTML, insert_marker
+from profiling import profiled
+
+
+@register('restore_report')
+def restore_report_section(soup, ctx):
+    # 本次构建已经生成了新周报 (周日)，不需要恢复
+    if ctx.get('report_html'):
+        return
+
+    # 1. 读取周日生成的周报片段 (workflow 里从线上只下载这一个小文件)
+    report_file = ctx.get('report_file') or os.path.join(ctx['target_dir'], REPORT_HTML)
+    if not os.path.exists(report_file):
+        print("没有找到周报片段，无法恢复报告（可能是第一次运行或上一版本无报告）。")
         return
 
-    with open(backup_file, 'r', encoding='utf-8') as f:
-        old_html = f.read()
-    
-    # 2. 读取刚刚生成的新网页（纯净版）
-    with open(current_file, 'r', encoding='utf-8') as f:
-        new_html = f.read()
-
-    soup_old = BeautifulSoup(old_html, 'html.parser')
-    soup_new = BeautifulSoup(new_html, 'html.parser')
-
-    # 3. 寻找 AI 周报板块
-    # 我们之前的逻辑是：<section class="day-container"> 里面包含 "🏆 Weekly Top Picks"
-    # 或者根据 style border 找
-    found_report = None
-    sections = soup_old.find_all('section', class_='day-container')
-    
-    for section in sections:
-        # 简单判断：只要包含那个奖杯 emoji 或者是 Weekly Top Picks 文字
-        if section.get_text() and "🏆 Weekly Top Picks" in section.get_text():
-            found_report = section
-            break
-    
-    if found_report:
-        print("成功在旧网页中找到 AI 周报板块！正在移植...")
-        
-        # 4. 插入到新网页
-        # 逻辑同 inject_html_v2：插入到 header 之后
-        header_container = soup_new.find('section', class_='header-container')
-        if header_container:
-            header_container.insert_after(found_report)
-        else:
-            soup_new.body.insert(0, found_report)
-            
-        # 5. 保存
-        with open(current_file, 'w', encoding='utf-8') as f:
-            f.write(str(soup_new.prettify()))
-        print("AI 周报已恢复到今日构建的页面中。")
-    else:
-        print("在旧网页中未发现 AI 周报（可能是第一次运行或上一版本无报告）。")
+    with open(report_file, 'r', encoding='utf-8') as f:
+        report_html = f.read()
+
+    # 2. 插入到新网页：逻辑同 inject_html_v2，插入到 header 之后
+    insert_marker(soup, ctx, report_html)
+    print("AI 周报已恢复到今日构建的页面中。")
+
+
+@profiled("restore")
+def restore_weekly_report(report_file, current_file):
+    ctx = make_context(os.path.dirname(current_file), html_file=current_file, report_file=report_file)
+    soup = load_html(ctx)
+    restore_report_section(soup, ctx)
+    write_html(soup, ctx)
+
 
 if __name__ == "__main__":
-    # backup.html 是我们在 workflow 里下载的旧版
+    # target/report/weekly_report.html 是我们在 workflow 里从线上下载的上周周报片段
     # target/index.html 是 arxivfeed 刚生成的新版
-    restore_weekly_report("backup.html", "target/index.html")
+    restore_weekly_report(os.path.join("target", REPORT_HTML), "target/index.html")
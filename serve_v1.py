@@ -0,0 +1,432 @@
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from build_search_index_v1 import tokenize
+from evaluate_rolling_v1 import EVAL_FIELDS, STORE_FILE, evaluate_pending, load_store, save_store
+from extract_papers_v2 import get_base_id, remove_newlines
+from highlight import parse_venue
+from paper_io import dumps, load, load_cache
+
+# ================= 配置区域 =================
+# 常驻服务：把论文和评估结果常驻内存，提供本地 HTTP API (默认只监听本机)
+#   GET  /api/top?day=2026-10-19&n=20&category=cs.CV   某天 (不给 day 时为最近 7 天) 按分数排名前 N
+#   GET  /api/papers/2410.12345                        按 arXiv ID 查询 (可带版本号或完整 URL，旧式 ID 如 hep-th/9901001)
+#   GET  /api/search?q=ocr+layout&n=50                 按关键词过滤 (标题 / 中文标题 / LLM 关键词，全部命中)
+#   POST /api/evaluate/2410.12345[?force=1]            立即评估单篇论文，结果写入滚动评估的结果库
+#   GET  /api/status                                   数据版本和各数据源的加载时间
+# 所有 GET 响应带 ETag (响应内容的哈希)，客户端带 If-None-Match 时内容没变就返回 304。
+HOST = "127.0.0.1"
+PORT = 8780
+# 每隔多少秒检查一次数据文件，有变化的文件才重新读取
+REFRESH_SECONDS = 30
+# 最近几天算作 "本周" (与 extract_papers_v2.py 一致)
+WEEK_DAYS = 7
+DEFAULT_TOP_N = 20
+MAX_TOP_N = 500
+# 列表接口里每篇论文只返回这些字段，完整字段用 /api/papers/<id> 查
+SUMMARY_FIELDS = ('id', 'arxiv_id', 'date', 'category', 'title', 'title_zh', 'score', 'keywords')
+# 搜索索引覆盖的字段
+SEARCH_FIELDS = ('title', 'title_zh', 'keywords')
+# 每份快照最多缓存多少个编码好的响应 (按最近使用淘汰)；搜索词等参数可以任意取值，不设上限会一直涨
+RESPONSE_CACHE_SIZE = 2048
+
+# 2007 年以前的旧式 ID 带学科前缀和斜杠 (hep-th/9901001、math.GT/0309136)
+_ARXIV_ID_RE = re.compile(r'(?:.*/abs/)?([a-z-]+(?:\.[A-Z]{2})?/\d{7}|[^/?#]+?)(?:v\d+)?$')
+
+
+def arxiv_id(value):
+    """
+    http://arxiv.org/abs/2410.12345v2、2410.12345v2、2410.12345 -> 2410.12345，
+    旧式的 hep-th/9901001v2 -> hep-th/9901001；不像 ID 时返回 None
+    """
+    match = _ARXIV_ID_RE.match(value.strip())
+    return match.group(1) if match else None
+
+
+# ================= 数据源 =================
+# 三个数据源，只有签名 (mtime + 大小) 变化的文件才重新读取：
+#   cache.json             窗口内所有论文 (按天)
+#   evaluated_papers.json  周日组装的整周评估
+#   .cache/evaluations.json 逐日滚动评估的结果库 (比 evaluated_papers.json 新，优先使用)
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def collect_papers(cache_data):
+    """按基础 ID 去重，清理字段的方式与 extract_papers_v2.py 相同；返回 {arxiv_id: 论文}"""
+    papers = {}
+    for date in sorted(cache_data.keys(), reverse=True):
+        for category, entries in cache_data[date].items():
+            for raw in entries:
+                key = arxiv_id(raw['id'])
+                if key is None:
+                    continue
+                existing = papers.get(key)
+                if existing is not None:
+                    if category not in existing['categories']:
+                        existing['categories'].append(category)
+                    if raw['id'] <= existing['id']:
+                        continue
+                comment = remove_newlines(raw['comment']) if raw.get('comment') is not None else None
+                papers[key] = {
+                    'id': raw['id'],
+                    'arxiv_id': key,
+                    'date': existing['date'] if existing else date[:10],
+                    'categories': existing['categories'] if existing else [category],
+                    'title': remove_newlines(raw['title']),
+                    'authors': raw['authors'],
+                    # 摘要只在查询单篇 / 评估时才清理 (建索引用不到，省掉启动时一大半的正则耗时)
+                    '_summary': raw.get('summary'),
+                    'comment': comment,
+                    'publication': parse_venue(comment) or "N/A",
+                    'pdf_url': raw.get('pdf_url'),
+                }
+    for paper in papers.values():
+        paper['category'] = ", ".join(paper.pop('categories'))
+    return papers
+
+
+def evaluations_by_id(evaluated_papers, store):
+    """{arxiv_id: 评估字段}；结果库的条目覆盖 evaluated_papers.json 里的同一篇"""
+    evaluations = {}
+    for source in (evaluated_papers, store.values()):
+        for entry in source:
+            fields = {k: entry[k] for k in EVAL_FIELDS if k in entry}
+            key = arxiv_id(entry['id'])
+            if fields and key is not None:
+                evaluations[key] = fields
+    return evaluations
+
+
+# ================= 索引 =================
+# 每次数据变化时构建一份新的快照 (论文、按天排名、关键词倒排、响应缓存)，构建完后整体替换；
+# 请求线程只读当前快照，不需要加锁。论文和评估都没变的文档沿用上一份快照里的对象。
+
+def rank_key(doc):
+    score = doc.get('score')
+    return (0 if isinstance(score, (int, float)) else 1, -(score or 0), doc['arxiv_id'])
+
+
+def search_tokens(doc):
+    values = []
+    for field in SEARCH_FIELDS:
+        value = doc.get(field) or ''
+        values.append(' '.join(value) if isinstance(value, list) else value)
+    return set(tokenize(' '.join(values)))
+
+
+def build_snapshot(papers, evaluations, previous=None):
+    old_docs = previous['docs'] if previous else {}
+    docs = {}
+    for key, paper in papers.items():
+        evaluation = evaluations.get(key, {})
+        old = old_docs.get(key)
+        if old is not None and old['_paper'] is paper and old['_evaluation'] == evaluation:
+            docs[key] = old
+            continue
+        doc = {**paper, **evaluation, '_paper': paper, '_evaluation': evaluation}
+        doc['_tokens'] = search_tokens(doc)
+        docs[key] = doc
+
+    ranked = sorted(docs.values(), key=rank_key)
+    by_day = defaultdict(list)
+    terms = defaultdict(list)
+    # 按全局排名的顺序遍历，每天的列表和每个词的倒排表天然有序，查询时只需切片
+    for doc in ranked:
+        by_day[doc['date']].append(doc)
+        for token in doc['_tokens']:
+            terms[token].append(doc['arxiv_id'])
+    recent = set(sorted(by_day, reverse=True)[:WEEK_DAYS])
+    week = [doc for doc in ranked if doc['date'] in recent]
+
+    version = (previous['version'] + 1) if previous else 1
+    return {'version': version, 'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'docs': docs, 'days': dict(by_day), 'week': week, 'terms': dict(terms), 'responses': OrderedDict()}
+
+
+def abstract_of(doc):
+    return remove_newlines(doc['_summary'])
+
+
+def public(doc, fields=None):
+    if fields is None:
+        return {**{k: v for k, v in doc.items() if not k.startswith('_')}, 'abstract': abstract_of(doc)}
+    return {k: doc.get(k) for k in fields}
+
+
+def new_service(target_dir="target", store_file=STORE_FILE):
+    return {
+        'paths': {
+            'cache': os.path.join(target_dir, "cache.json"),
+            'evaluated': os.path.join(target_dir, "evaluated_papers.json"),
+            'store': store_file,
+        },
+        'signatures': {},
+        'loaded': {'cache': {}, 'evaluated': [], 'store': {}},
+        'loaded_at': {},
+        'papers': {},
+        'snapshot': None,
+        'refresh_lock': threading.Lock(),
+        'evaluate_lock': threading.Lock(),
+    }
+
+
+def refresh(service, force=False):
+    """重新读取有变化的数据源并换上新快照；返回是否有变化"""
+    with service['refresh_lock']:
+        changed = []
+        for name, path in service['paths'].items():
+            signature = file_signature(path)
+            if not force and signature == service['signatures'].get(name):
+                continue
+            if signature is None:
+                data = {} if name != 'evaluated' else []
+            elif name == 'cache':
+                data = load_cache(path)
+            elif name == 'store':
+                data = load_store(path)
+            else:
+                data = load(path)
+            # 读取成功后才记下签名，读到半截文件时下一轮会重试
+            service['signatures'][name] = signature
+            service['loaded'][name] = data
+            service['loaded_at'][name] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            changed.append(name)
+        if not changed and service['snapshot'] is not None:
+            return False
+        start = time.perf_counter()
+        if 'cache' in changed or not service['papers']:
+            service['papers'] = collect_papers(service['loaded']['cache'])
+        evaluations = evaluations_by_id(service['loaded']['evaluated'], service['loaded']['store'])
+        snapshot = build_snapshot(service['papers'], evaluations, service['snapshot'])
+        service['snapshot'] = snapshot
+        print(f"[serve] v{snapshot['version']}: reloaded {', '.join(changed) or 'nothing'}; "
+              f"{len(snapshot['docs'])} papers, {len(snapshot['days'])} days, {len(snapshot['terms'])} terms "
+              f"({time.perf_counter() - start:.3f}s)", flush=True)
+        return True
+
+
+def refresh_loop(service, interval=REFRESH_SECONDS):
+    while True:
+        time.sleep(interval)
+        try:
+            refresh(service)
+        except Exception as e:
+            # 文件正在被流水线改写时可能读到半截内容，保留旧快照，下一轮再试
+            print(f"[serve] refresh failed, keeping v{service['snapshot']['version']}: {e}", flush=True)
+
+
+# ================= 查询 =================
+# 每个查询返回 (状态码, 可 JSON 编码的结果)
+
+def clamp_n(query):
+    try:
+        return max(1, min(MAX_TOP_N, int(query.get('n', [DEFAULT_TOP_N])[0])))
+    except ValueError:
+        return DEFAULT_TOP_N
+
+
+def query_top(snapshot, query):
+    day = query.get('day', [None])[0]
+    if day is None:
+        ranked = snapshot['week']
+    elif day in snapshot['days']:
+        ranked = snapshot['days'][day]
+    else:
+        return 404, {'error': f"no papers for day {day}", 'days': sorted(snapshot['days'], reverse=True)}
+    category = query.get('category', [None])[0]
+    if category:
+        ranked = [d for d in ranked if category in d['category'].split(", ")]
+    n = clamp_n(query)
+    return 200, {'day': day or 'week', 'total': len(ranked),
+                 'papers': [public(d, SUMMARY_FIELDS) for d in ranked[:n]]}
+
+
+def query_search(snapshot, query):
+    tokens = tokenize(' '.join(query.get('q', [])))
+    if not tokens:
+        return 400, {'error': "q is required"}
+    postings = sorted((snapshot['terms'].get(t, []) for t in tokens), key=len)
+    # 最短的倒排表已按排名有序，逐个检查是否也在其余倒排表中
+    keys = postings[0]
+    if len(postings) > 1:
+        others = [set(p) for p in postings[1:]]
+        keys = [k for k in keys if all(k in other for other in others)]
+    return 200, {'q': tokens, 'total': len(keys),
+                 'papers': [public(snapshot['docs'][k], SUMMARY_FIELDS) for k in keys[:clamp_n(query)]]}
+
+
+def query_paper(snapshot, paper_id):
+    key = arxiv_id(paper_id)
+    if key is None:
+        return 400, {'error': f"invalid arXiv ID {paper_id!r}"}
+    doc = snapshot['docs'].get(key)
+    if doc is None:
+        return 404, {'error': f"unknown paper {paper_id}"}
+    return 200, public(doc)
+
+
+def query_status(service, snapshot):
+    return 200, {'version': snapshot['version'], 'built_at': snapshot['built_at'],
+                 'papers': len(snapshot['docs']),
+                 'evaluated': sum(isinstance(d.get('score'), (int, float)) for d in snapshot['docs'].values()),
+                 'days': sorted(snapshot['days'], reverse=True), 'sources': service['loaded_at']}
+
+
+def evaluate_one(service, paper_id, force=False):
+    """评估单篇论文 (复用滚动评估)，成功后写回结果库并刷新索引"""
+    key = arxiv_id(paper_id)
+    if key is None:
+        return 400, {'error': f"invalid arXiv ID {paper_id!r}"}
+    paper = service['papers'].get(key)
+    if paper is None:
+        return 404, {'error': f"unknown paper {paper_id}"}
+    with service['evaluate_lock']:
+        store_file = service['paths']['store']
+        store = load_store(store_file)
+        if force:
+            store.pop(get_base_id(paper['id']), None)
+        work = {k: paper[k] for k in ('id', 'title', 'authors', 'category', 'comment', 'publication')}
+        work['abstract'] = abstract_of(paper)
+        pending, succeeded = evaluate_pending([work], store)
+        if pending and not succeeded:
+            return 502, {'error': f"evaluation of {key} failed, see the server log"}
+        if pending:
+            save_store(store, store_file)
+        refresh(service)
+    code, doc = query_paper(service['snapshot'], key)
+    return code, {'evaluated': bool(pending), **doc}
+
+
+# ================= HTTP =================
+
+_responses_lock = threading.Lock()
+
+
+def cached_response(snapshot, key):
+    with _responses_lock:
+        cached = snapshot['responses'].get(key)
+        if cached is not None:
+            snapshot['responses'].move_to_end(key)
+        return cached
+
+
+def cache_response(snapshot, key, response):
+    with _responses_lock:
+        snapshot['responses'][key] = response
+        if len(snapshot['responses']) > RESPONSE_CACHE_SIZE:
+            snapshot['responses'].popitem(last=False)
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 响应头和正文分两次写出，不关 Nagle 的话 keep-alive 连接上每个请求都要多等 40ms 的延迟确认
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, body, etag=None):
+            self.send_response(code)
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if code == 304:
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            snapshot = service['snapshot']
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            # 同一快照内相同的请求直接返回编码好的响应
+            cache_key = (url.path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+            cached = cached_response(snapshot, cache_key)
+            if cached is None:
+                if url.path == '/api/top':
+                    code, result = query_top(snapshot, query)
+                elif url.path == '/api/search':
+                    code, result = query_search(snapshot, query)
+                elif url.path.startswith('/api/papers/'):
+                    code, result = query_paper(snapshot, url.path[len('/api/papers/'):])
+                elif url.path == '/api/status':
+                    code, result = query_status(service, snapshot)
+                else:
+                    code, result = 404, {'error': f"unknown path {url.path}"}
+                body = dumps(result)
+                cached = (code, body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+                if code == 200:
+                    cache_response(snapshot, cache_key, cached)
+            code, body, etag = cached
+            if code == 200 and self.headers.get('If-None-Match') == etag:
+                self._send(304, b'', etag)
+            else:
+                self._send(code, body, etag if code == 200 else None)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if self.headers.get('Content-Length'):
+                self.rfile.read(int(self.headers['Content-Length']))
+            if not url.path.startswith('/api/evaluate/'):
+                self._send(404, dumps({'error': f"unknown path {url.path}"}))
+                return
+            force = parse_qs(url.query).get('force', ['0'])[0] not in ('0', '')
+            code, result = evaluate_one(service, url.path[len('/api/evaluate/'):], force)
+            self._send(code, dumps(result))
+
+    return Handler
+
+
+def serve(target_dir="target", store_file=STORE_FILE, host=HOST, port=PORT, interval=REFRESH_SECONDS):
+    """加载数据并返回 HTTP 服务器 (还没开始 serve_forever)"""
+    service = new_service(target_dir, store_file)
+    refresh(service, force=True)
+    if interval > 0:
+        threading.Thread(target=refresh_loop, args=(service, interval), daemon=True).start()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(target_dir="target", store_file=STORE_FILE, host=HOST, port=PORT, interval=REFRESH_SECONDS):
+    server = serve(target_dir, store_file, host, port, interval)
+    print(f"MyArxiv API on http://{host}:{server.server_port}/api/top "
+          f"(refresh every {interval}s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve evaluated papers over a local HTTP API.")
+    parser.add_argument('--target', default="target")
+    parser.add_argument('--store', default=STORE_FILE)
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--refresh', type=int, default=REFRESH_SECONDS, help="seconds between file checks (0 = never)")
+    args = parser.parse_args()
+    sys.exit(main(args.target, args.store, args.host, args.port, args.refresh))
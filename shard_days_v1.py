@@ -0,0 +1,145 @@
+import os
+import re
+import tomllib
+
+from extract_papers_v2 import get_base_id
+from highlight import highlight_ranges, parse_venue
+from html_pipeline import load_cache_data, load_html, make_context, register, write_html
+from paper_io import dump
+from profiling import profiled, span
+from sort_papers_v2 import load_score_index, order_by_score
+
+# ================= 配置区域 =================
+# 直接保留在 index.html 中的天数 (最新的 N 天)，其余天只留骨架，由前端按需加载
+EMBED_DAYS = 1
+# 分片目录 (相对 target/)，前端按 manifest.json 中的 src 拉取
+DATA_DIR = "data"
+
+# 前端渲染文章所需的字段，其余字段不写入分片；另附高亮区间和会议 (见 shard_paper)
+SHARD_FIELDS = ('id', 'title', 'authors', 'summary', 'comment', 'updated', 'published', 'pdf_url')
+
+
+def day_key(date):
+    """cache.json 的日期键 -> 文件名 / 页面上显示的 YYYY-MM-DD"""
+    return re.sub(r'[^0-9A-Za-z-]', '_', date[:10])
+
+
+def load_subject_titles(config_file):
+    """读取 config.toml 中 category -> title 的映射，用于匹配页面上的 subject"""
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, 'rb') as f:
+        config = tomllib.load(f)
+    return {s['category']: s.get('title', s['category']) for s in config.get('sources', [])}
+
+
+def shard_paper(paper):
+    """分片里的一篇论文：附带与 arxivfeed 页面相同的标题 / 作者高亮区间和 comment 中的会议"""
+    record = {k: paper[k] for k in SHARD_FIELDS if paper.get(k) is not None}
+    venue = parse_venue(paper.get('comment'))
+    if venue:
+        record['publication'] = venue
+    ranges = highlight_ranges(paper)
+    if ranges:
+        record['highlights'] = ranges
+    return record
+
+
+def write_shards(cache_data, target_dir, subject_titles, score_index=None):
+    """写出每天每个分类的 JSON 分片和 manifest，返回 manifest。有评分时分片内按评分排序"""
+    manifest = {'days': []}
+    for date in sorted(cache_data.keys(), reverse=True):
+        key = day_key(date)
+        os.makedirs(os.path.join(target_dir, DATA_DIR, key), exist_ok=True)
+        subjects = []
+        for category, papers in cache_data[date].items():
+            src = f"{DATA_DIR}/{key}/{category}.json"
+            if score_index:
+                papers = order_by_score(papers, lambda p: score_index.get(get_base_id(p['id'])))
+            shard = [shard_paper(p) for p in papers]
+            dump(shard, os.path.join(target_dir, src), indent=False)
+            subjects.append({
+                'category': category,
+                'title': subject_titles.get(category, category),
+                'count': len(papers),
+                'src': src,
+            })
+        manifest['days'].append({'date': key, 'subjects': subjects})
+
+    dump(manifest, os.path.join(target_dir, DATA_DIR, "manifest.json"), indent=False)
+    return manifest
+
+
+def subject_name(details):
+    """取分类 <summary> 的文字，去掉后面的数量 chip"""
+    summary = details.find('summary', recursive=False)
+    if not summary:
+        return ''
+    return ''.join(s for s in summary.find_all(string=True, recursive=False)).strip()
+
+
+def strip_older_days(soup, manifest):
+    """除最新 EMBED_DAYS 天外，清空每个分类的文章列表，并标记对应的分片地址"""
+    days = {d['date']: d for d in manifest['days']}
+    stripped = 0
+    containers = [s for s in soup.find_all('section', class_='day-container')
+                  if s.find('time')]  # 跳过 Weekly Top Picks 等没有日期的板块
+    for index, container in enumerate(containers):
+        if index < EMBED_DAYS:
+            continue
+        time_tag = container.find('time')
+        day = days.get(day_key(time_tag.get('datetime', '')))
+        if day is None and index < len(manifest['days']):
+            day = manifest['days'][index]  # 日期对不上时按顺序回退
+        if day is None:
+            continue
+
+        by_name = {}
+        for subject in day['subjects']:
+            by_name[subject['category']] = subject
+            by_name[subject['title']] = subject
+
+        for details in container.find_all('details', recursive=True):
+            content = details.find('div', class_='details-content', recursive=False)
+            if content is None:
+                continue
+            subject = by_name.get(subject_name(details))
+            if subject is None:
+                continue
+            stripped += len(content.find_all('article', recursive=False))
+            content.clear()
+            details['data-shard'] = subject['src']
+    return stripped
+
+
+@register('shard_days')
+def shard_days(soup, ctx):
+    cache_data = load_cache_data(ctx)
+    if cache_data is None:
+        print(f"未找到 {ctx['cache_file']}，跳过分片。")
+        return
+
+    # sort_articles 已经建好的评分索引直接复用
+    score_index = ctx.get('score_index')
+    if score_index is None:
+        score_index = load_score_index(ctx)
+
+    with span("write"):
+        manifest = write_shards(cache_data, ctx['target_dir'], load_subject_titles(ctx['config_file']), score_index)
+    print(f"Wrote shards for {len(manifest['days'])} days to {os.path.join(ctx['target_dir'], DATA_DIR)}")
+
+    stripped = strip_older_days(soup, manifest)
+    print(f"Removed {stripped} embedded articles from older days; they are now loaded on demand.")
+
+
+@profiled("shard_days")
+def main(cache_file, html_file, config_file):
+    ctx = make_context(os.path.dirname(html_file), cache_file=cache_file, html_file=html_file,
+                       config_file=config_file)
+    soup = load_html(ctx)
+    shard_days(soup, ctx)
+    write_html(soup, ctx)
+
+
+if __name__ == "__main__":
+    main("target/cache.json", "target/index.html", "config.toml")
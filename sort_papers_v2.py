@@ -0,0 +1,97 @@
+import os
+
+from extract_papers_v2 import get_base_id
+from html_pipeline import load_html, make_context, register, write_html
+from inject_html_v2 import REPORT_JSON, REST_FILE
+from paper_io import load
+from profiling import profiled
+
+
+def load_score_index(ctx):
+    """
+    一次性建立 基础ID -> 分数 的索引。
+    优先用 evaluated_papers.json，平日没有时退回恢复下来的周报产物。
+    """
+    papers = []
+    if os.path.exists(ctx['evaluated_file']):
+        papers = load(ctx['evaluated_file'])
+    else:
+        report_json = os.path.join(ctx['target_dir'], REPORT_JSON)
+        rest_file = os.path.join(ctx['target_dir'], REST_FILE)
+        if os.path.exists(report_json):
+            papers = load(report_json)['top']
+        if os.path.exists(rest_file):
+            papers += load(rest_file)
+
+    return {get_base_id(p['id']): p['score'] for p in papers
+            if isinstance(p.get('score'), int)}
+
+
+def order_by_score(items, score_of):
+    """
+    按分数从高到低排列，同分及未评分的保持原顺序，未评分的排在最后。
+    分数是 0-10 的整数，用分桶代替比较排序，保持线性。
+    """
+    buckets = {}
+    unscored = []
+    for item in items:
+        score = score_of(item)
+        if score is None:
+            unscored.append(item)
+        else:
+            buckets.setdefault(score, []).append(item)
+    ordered = []
+    for score in sorted(buckets, reverse=True):
+        ordered.extend(buckets[score])
+    ordered.extend(unscored)
+    return ordered
+
+
+def article_score(article, score_index):
+    # 文章里第一个链接就是 arXiv 摘要页 (见 includes/index.hbs 的 article-authors)
+    link = article.find('a', href=True)
+    if link is None:
+        return None
+    return score_index.get(get_base_id(link['href']))
+
+
+@register('sort_articles')
+def sort_articles(soup, ctx):
+    score_index = load_score_index(ctx)
+    ctx['score_index'] = score_index
+    if not score_index:
+        print("没有可用的评分，跳过排序。")
+        return
+
+    categories = 0
+    articles_seen = 0
+    for content in soup.find_all('div', class_='details-content'):
+        articles = content.find_all('article', recursive=False)
+        if not articles:
+            continue
+        scores = {id(a): article_score(a, score_index) for a in articles}
+        ordered = order_by_score(articles, lambda a: scores[id(a)])
+        # 按身份比较 (Tag 的 == 会递归比较整棵子树)；顺序变了就一次性重建子节点，
+        # 文章按新顺序填回原来的位置，逐个 extract 再 append 是平方级的
+        if any(a is not b for a, b in zip(ordered, articles)):
+            slots = {id(a) for a in articles}
+            queue = iter(ordered)
+            children = [next(queue) if id(child) in slots else child for child in content.contents]
+            content.clear()
+            content.extend(children)
+        categories += 1
+        articles_seen += len(articles)
+
+    print(f"Sorted {articles_seen} articles in {categories} categories by score ({len(score_index)} scored papers).")
+
+
+@profiled("sort")
+def main(target_dir):
+    ctx = make_context(target_dir)
+    soup = load_html(ctx)
+    sort_articles(soup, ctx)
+    write_html(soup, ctx)
+
+
+if __name__ == "__main__":
+    main("target")
@@ -37,3 +37,333 @@ const timestamp_local = new Date(timestamp.getAttribute("datetime")).toLocaleStr
 
 const badge = document.getElementById("build-timestamp-badge");
 // badge.src = `https://img.shields.io/github/workflow/status/mlnlp-world/myarxiv/Update?=${timestamp_local}&style=for-the-badge`
+
+/* Weekly Top Picks: lazily load the remaining papers (see inject_html_v2.py) */
+const REPORT_PAGE_SIZE = 20;
+
+function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function reportRow(label, content, extraClass) {
+    if (!content || content === "N/A") return null;
+    const row = el("div", "report-row");
+    row.appendChild(el("span", "chip report-label", label));
+    row.appendChild(el("span", "report-content" + (extraClass ? " " + extraClass : ""), content));
+    return row;
+}
+
+// Wrap the [start, end) ranges computed by highlight.py in <span class="hlClass">.
+// Offsets are Python code-point indices, so index with Array.from rather than UTF-16 units.
+function appendHighlighted(parent, text, ranges, hlClass) {
+    const chars = Array.from(text);
+    let pos = 0;
+    (ranges || []).forEach(([start, end]) => {
+        if (start > pos) parent.appendChild(document.createTextNode(chars.slice(pos, start).join("")));
+        parent.appendChild(el("span", hlClass, chars.slice(start, end).join("")));
+        pos = end;
+    });
+    if (pos < chars.length) parent.appendChild(document.createTextNode(chars.slice(pos).join("")));
+    return parent;
+}
+
+// hits are [authorIndex, start, end] as written by highlight.highlight_ranges
+function appendAuthors(parent, authors, hits) {
+    const list = Array.isArray(authors) ? authors : [authors];
+    list.forEach((author, i) => {
+        if (i) parent.appendChild(document.createTextNode(", "));
+        const ranges = (hits || []).filter(h => h[0] === i).map(h => [h[1], h[2]]);
+        appendHighlighted(parent, author, ranges, "highlight-author");
+    });
+    return parent;
+}
+
+function highlightedAuthors(authors, hits) {
+    const content = appendAuthors(el("span", "report-content report-authors"), authors, hits);
+    const row = el("div", "report-row");
+    row.appendChild(el("span", "chip report-label", "Authors"));
+    row.appendChild(content);
+    return row;
+}
+
+function renderReportPaper(p) {
+    const article = el("article", "report-article");
+    const details = el("details", "article-expander");
+    const summary = el("summary", "article-expander-title report-title-row");
+    summary.appendChild(el("span", "chip report-score", String(p.score)));
+
+    const links = el("span", "report-links");
+    const pdf = p.id.replace("/abs/", "/pdf/").replace(/v\d+$/, "");
+    [[p.id, "ri-links-line"], [pdf, "ri-file-pdf-line"]].forEach(([href, icon]) => {
+        const a = el("a");
+        a.href = href;
+        a.target = "_blank";
+        a.appendChild(el("i", icon));
+        links.appendChild(a);
+    });
+    summary.appendChild(links);
+
+    const hl = p.highlights || {};
+    const titleBox = el("div", "report-title-box");
+    const title = el("span", "report-title");
+    if (hl.authors) {
+        title.appendChild(el("span", "highlight-title", "★"));
+        title.appendChild(document.createTextNode(" "));
+    }
+    titleBox.appendChild(appendHighlighted(title, p.title, hl.title, "highlight-title"));
+    if (p.publication) titleBox.appendChild(el("span", "chip", p.publication));
+    summary.appendChild(titleBox);
+    details.appendChild(summary);
+
+    const join = (v, sep) => Array.isArray(v) ? v.join(sep) : v;
+    [
+        reportRow("Title CN", p.title_zh),
+        reportRow("Keywords", join(p.keywords, " · ")),
+        reportRow("Summary", p.summary),
+        reportRow("Reason", p.reason),
+        reportRow("Abstract", p.abstract),
+        p.authors ? highlightedAuthors(p.authors, hl.authors) : null,
+        reportRow("Comment", p.comment),
+        reportRow("Categories", p.category),
+    ].forEach(row => row && details.appendChild(row));
+
+    article.appendChild(details);
+    return article;
+}
+
+document.querySelectorAll(".report-more").forEach(more => {
+    const button = more.querySelector(".report-more-button");
+    const select = more.querySelector(".report-min-score");
+    let papers = null;
+    let shown = 0;
+    let rendered = [];
+
+    function candidates() {
+        const minScore = Number(select.value);
+        return papers.filter(p => p.score >= minScore);
+    }
+
+    function update() {
+        const left = candidates().length - shown;
+        button.textContent = `Show more (${left})`;
+        button.disabled = left <= 0;
+    }
+
+    function showMore() {
+        const batch = candidates().slice(shown, shown + REPORT_PAGE_SIZE);
+        const fragment = document.createDocumentFragment();
+        batch.forEach(p => {
+            const node = renderReportPaper(p);
+            rendered.push(node);
+            fragment.appendChild(node);
+        });
+        more.parentNode.insertBefore(fragment, more);
+        shown += batch.length;
+        update();
+    }
+
+    function load() {
+        if (papers) return Promise.resolve();
+        button.disabled = true;
+        return fetch(more.dataset.src)
+            .then(r => {
+                if (!r.ok) throw new Error(`HTTP ${r.status}`);
+                return r.json();
+            })
+            .then(data => {
+                // the build only picks the top K with a heap; sort the remainder here
+                papers = data.sort((a, b) => b.score - a.score);
+            })
+            .catch(err => {
+                // re-enable the button so a failed request can be retried
+                button.disabled = false;
+                throw err;
+            });
+    }
+
+    button.addEventListener("click", () => load().then(showMore, () => {}));
+    select.addEventListener("change", () => {
+        if (!papers) return;
+        rendered.forEach(node => node.remove());
+        rendered = [];
+        shown = 0;
+        showMore();
+    });
+});
+
+/* Older days: render articles from per-day shards when opened (see shard_days_v1.py) */
+function renderShardPaper(p) {
+    const article = el("article");
+    const details = el("details", "article-expander");
+    // same markup as the arxivfeed template: ♻, ★ (watched author) / ☆, highlighted title, venue chip
+    const hl = p.highlights || {};
+    const summary = el("summary", "article-expander-title");
+    if (p.updated && p.updated !== p.published) summary.appendChild(document.createTextNode("♻ "));
+    if (hl.authors) {
+        summary.appendChild(el("span", "highlight-title", "★"));
+        summary.appendChild(document.createTextNode(" "));
+    } else {
+        summary.appendChild(document.createTextNode("☆ "));
+    }
+    appendHighlighted(summary, p.title, hl.title, "highlight-title");
+    if (p.publication) {
+        summary.appendChild(document.createTextNode(" "));
+        summary.appendChild(el("span", "chip", p.publication));
+    }
+    details.appendChild(summary);
+
+    const authors = el("div", "article-authors");
+    [[p.id, "ri-links-line"], [p.pdf_url, "ri-file-paper-2-line"]].forEach(([href, icon]) => {
+        if (!href) return;
+        const a = el("a");
+        a.href = href;
+        a.appendChild(el("i", icon));
+        authors.appendChild(a);
+        authors.appendChild(document.createTextNode(" "));
+    });
+    appendAuthors(authors, p.authors || [], hl.authors);
+    details.appendChild(authors);
+
+    const abstract = el("div", "article-summary-box-inner");
+    abstract.appendChild(el("span", null, p.summary));
+    details.appendChild(abstract);
+
+    if (p.comment) {
+        const comment = el("div", "article-summary-box-inner");
+        comment.appendChild(el("span", "chip", "comment"));
+        comment.appendChild(document.createTextNode(": "));
+        comment.appendChild(el("span", null, p.comment));
+        details.appendChild(comment);
+    }
+
+    article.appendChild(details);
+    return article;
+}
+
+document.querySelectorAll("details[data-shard]").forEach(subject => {
+    subject.addEventListener("toggle", () => {
+        if (!subject.open || subject.dataset.loaded) return;
+        subject.dataset.loaded = "true";
+        fetch(subject.dataset.shard)
+            .then(r => r.json())
+            .then(papers => {
+                const fragment = document.createDocumentFragment();
+                papers.forEach(p => fragment.appendChild(renderShardPaper(p)));
+                subject.querySelector(".details-content").appendChild(fragment);
+                if (window.renderMathInElement) {
+                    renderMathInElement(subject, {
+                        delimiters: [
+                            {left: '$$', right: '$$', display: true},
+                            {left: '$', right: '$', display: false},
+                        ],
+                        throwOnError: false
+                    });
+                }
+            })
+            .catch(() => delete subject.dataset.loaded);
+    });
+});
+
+/* Search: query the prebuilt inverted index (see build_search_index_v1.py) */
+const SEARCH_DIR = "search/";
+const SEARCH_LIMIT = 30;
+const STOPWORDS = new Set(("a an and are as at be by for from has have in into is it its of on or that the " +
+    "this to we with via our which can these their than").split(" "));
+
+function tokenize(text) {
+    const tokens = [];
+    for (const word of text.toLowerCase().match(/[a-z0-9]+|[一-鿿]+/g) || []) {
+        if (word[0] >= "一") {
+            if (word.length === 1) tokens.push(word);
+            for (let i = 0; i + 1 < word.length; i++) tokens.push(word.slice(i, i + 2));
+        } else if (word.length > 1 && !STOPWORDS.has(word)) {
+            tokens.push(word);
+        }
+    }
+    return tokens;
+}
+
+function shardKey(term) {
+    return term[0] >= "一" ? "zh" + (term.charCodeAt(0) % 16) : term.slice(0, 2);
+}
+
+const searchCache = {};
+
+function loadSearchFile(name) {
+    if (!searchCache[name]) {
+        searchCache[name] = fetch(SEARCH_DIR + name + ".json")
+            .then(r => r.ok ? r.json() : {})
+            .catch(() => ({}));
+    }
+    return searchCache[name];
+}
+
+function decodePostings(flat, idf, weights) {
+    let doc = 0;
+    for (let i = 0; i < flat.length; i += 2) {
+        doc += flat[i];
+        weights.set(doc, (weights.get(doc) || 0) + flat[i + 1] * idf);
+    }
+}
+
+async function search(query) {
+    const terms = tokenize(query);
+    if (!terms.length) return [];
+    const [docs, ...shards] = await Promise.all(
+        [loadSearchFile("docs"), ...terms.map(t => loadSearchFile(shardKey(t)))]);
+    const n = docs.length;
+
+    // 每个查询词累加 tf-idf，末尾的英文词按前缀匹配 (边输入边出结果)
+    const perTerm = terms.map((term, i) => {
+        const weights = new Map();
+        const prefix = i === terms.length - 1 && term[0] < "一";
+        const shard = shards[i];
+        const matches = prefix ? Object.keys(shard).filter(t => t.startsWith(term)) : (term in shard ? [term] : []);
+        matches.forEach(t => decodePostings(shard[t], Math.log(1 + n * 2 / shard[t].length), weights));
+        return weights;
+    });
+
+    const ranked = [];
+    perTerm[0].forEach((_, doc) => {
+        let relevance = 0;
+        for (const weights of perTerm) {
+            const w = weights.get(doc);
+            if (w === undefined) return;  // all terms must match
+            relevance += w;
+        }
+        const score = docs[doc][3];
+        ranked.push([relevance * (1 + (score || 0) / 10), doc]);
+    });
+    ranked.sort((a, b) => b[0] - a[0]);
+    return ranked.slice(0, SEARCH_LIMIT).map(([, doc]) => docs[doc]);
+}
+
+const searchInput = document.getElementById("search-input");
+const searchResults = document.getElementById("search-results");
+if (searchInput && searchResults) {
+    let searchTimer = null;
+    searchInput.addEventListener("focus", () => loadSearchFile("docs"), {once: true});
+    searchInput.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(async () => {
+            const query = searchInput.value;
+            const results = query.trim() ? await search(query) : [];
+            if (query !== searchInput.value) return;  // stale
+            searchResults.replaceChildren(...results.map(([id, title, titleZh, score, date]) => {
+                const row = el("div", "search-result");
+                if (score !== null) row.appendChild(el("span", "chip report-score", String(score)));
+                const a = el("a", null, title);
+                a.href = id;
+                a.target = "_blank";
+                row.appendChild(a);
+                row.appendChild(el("span", "search-result-meta", [titleZh, date].filter(Boolean).join(" · ")));
+                return row;
+            }));
+            if (query.trim() && !results.length) searchResults.appendChild(el("div", null, "No results"));
+            searchResults.hidden = !query.trim();
+        }, 120);
+    });
+}
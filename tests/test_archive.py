@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import archive_papers_v1 as archive
+
+
+# ISO 周的年份和周一所在的年份不一定相同，季度要按周一的日期算
+@pytest.mark.parametrize('week, quarter', [
+    ("2026-W01", "2025-Q4"),   # 2026-W01 从 2025-12-29 开始
+    ("2020-W53", "2020-Q4"),
+    ("2021-W01", "2021-Q1"),   # 2021-01-04
+    ("2026-W14", "2026-Q1"),   # 2026-03-30
+    ("2026-W15", "2026-Q2"),   # 2026-04-06
+    ("2026-W42", "2026-Q4"),
+])
+def test_quarter_of(week, quarter):
+    assert archive.quarter_of(week) == quarter
+
+
+def write_papers(path, ids):
+    papers = [{'id': f"http://arxiv.org/abs/{i}v1", 'title': f"Paper {i}", 'authors': ["A"], 'abstract': "x",
+               'category': "cs.CV", 'score': 8, 'keywords': ["llm"]} for i in ids]
+    path.write_text(json.dumps(papers), encoding='utf-8')
+    return str(path)
+
+
+# 发布到站点目录再取回 (file:// 代替 Pages)，得到同样的索引和段
+def test_publish_restore_round_trip(tmp_path):
+    local = str(tmp_path / "archive")
+    archive.add(local, write_papers(tmp_path / "a.json", ["2610.00001", "2610.00002"]), week="2026-W41")
+    archive.add(local, write_papers(tmp_path / "b.json", ["2610.00003"]), week="2026-W42")
+    assert archive.publish(local, str(tmp_path / "target")) == 2
+
+    restored = str(tmp_path / "restored")
+    url = (tmp_path / "target" / archive.PUBLISH_DIR).as_uri()
+    assert archive.restore(restored, url) == 2
+    assert archive.seen(restored, "http://arxiv.org/abs/2610.00003v2")
+    assert [r[0] for r in archive.query(local)] == [r[0] for r in archive.query(restored)]
+    # 本地已有索引时不覆盖
+    assert archive.restore(restored, url) == 0
+
+
+# evaluated_papers.json 按 EVALUATED_PAPER_SCHEMA 校验，字段类型不对时不写入归档
+def test_add_validates_evaluated_papers(tmp_path):
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps([{'id': "http://arxiv.org/abs/2610.00001v1", 'title': "t", 'authors': ["A"],
+                                'abstract': "x", 'category': "cs.CV", 'score': "9"}]), encoding='utf-8')
+    with pytest.raises(ValueError, match=r"\[0\]\.score"):
+        archive.add(str(tmp_path / "archive"), str(bad), week="2026-W42")
+    assert not (tmp_path / "archive" / archive.INDEX_FILE).exists()
+
+
+def test_restore_without_published_copy_warns(tmp_path, capsys):
+    missing = (tmp_path / "nothing").as_uri()
+    assert archive.restore(str(tmp_path / "archive"), missing) == 0
+    assert "::warning::" in capsys.readouterr().out
+    assert not (tmp_path / "archive" / archive.INDEX_FILE).exists()
@@ -0,0 +1,31 @@
+import pytest
+
+from compress_site_v1 import minify_css, minify_js
+
+
+@pytest.mark.parametrize('source, expected', [
+    # 行首注释后面的代码不能被一起删掉
+    ('/* a */ foo();\nbar();\n/* b */\nbaz();', 'foo();\nbar();\nbaz();'),
+    ('  if (a) {\n    // note\n    b();\n  }\n', 'if (a) {\nb();\n}'),
+    # 字符串、模板字符串和正则字面量里的注释标记原样保留
+    ('var s = "a // b /* c";', 'var s = "a // b /* c";'),
+    ('var t = `x /* ${y} */`;', 'var t = `x /* ${y} */`;'),
+    ('var r = /[/*]/g; // tail', 'var r = /[/*]/g;'),
+    ('return /\\/\\*/.test(s)', 'return /\\/\\*/.test(s)'),
+    # 除号不是正则
+    ('x = a / b / c;', 'x = a / b / c;'),
+    # 跨行的块注释按换行处理，不破坏自动分号插入
+    ('a = 1 /* x\n y */ b = 2', 'a = 1\nb = 2'),
+])
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a { color : red ; }', 'a{color :red}'),
+    ('a { content: "x: y; /* z */"; }', 'a{content:"x: y; /* z */"}'),
+    ("a::after { content: ' , '; }", "a::after{content:' , '}"),
+    ('/* "quoted" */ b:hover { x: 1 }', 'b:hover{x:1}'),
+])
+def test_minify_css(source, expected):
+    assert minify_css(source) == expected
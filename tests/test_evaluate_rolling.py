@@ -0,0 +1,82 @@
+import time
+import types
+
+import pytest
+
+import evaluate_rolling_v1 as rolling
+
+
+def paper(n, abstract="abstract", version=1):
+    return {'id': f"http://arxiv.org/abs/2610.{n:05d}v{version}", 'title': f"Paper {n}", 'authors': ["A"],
+            'abstract': abstract, 'category': "cs.CV", 'comment': None}
+
+
+@pytest.fixture
+def evaluated(monkeypatch):
+    """替换评估脚本：记录送评的论文；标题在 failing 里的论文评估失败 (不写 model)"""
+    calls, failing = [], set()
+
+    def evaluate_papers(client, papers, model):
+        calls.append([p['title'] for p in papers])
+        for p in papers:
+            if p['title'] not in failing:
+                p.update(score=7, reason="ok", keywords=["x"], model=model)
+
+    evaluator = types.SimpleNamespace(make_client=lambda: None, QPS_LIMIT=0, CASCADE=False, MODEL_NAME="m",
+                                      evaluate_papers=evaluate_papers, print_endpoint_report=lambda: None)
+    monkeypatch.setattr(rolling, 'load_evaluator', lambda: evaluator)
+    return types.SimpleNamespace(calls=calls, failing=failing)
+
+
+# 只改版本号不重评；标题 / 摘要 / comment 变了才重评
+def test_content_hash():
+    assert rolling.content_hash(paper(1)) == rolling.content_hash(paper(1, version=2))
+    assert rolling.content_hash(paper(1)) != rolling.content_hash(paper(1, abstract="revised"))
+    assert rolling.content_hash(dict(paper(1), comment="CVPR 2025")) != rolling.content_hash(paper(1))
+
+
+def test_evaluate_pending_reuses_unchanged_and_requeues_changed(evaluated):
+    store = {}
+    assert rolling.evaluate_pending([paper(1), paper(2)], store) == (2, 2)
+    assert set(store) == {"http://arxiv.org/abs/2610.00001", "http://arxiv.org/abs/2610.00002"}
+    first = dict(store["http://arxiv.org/abs/2610.00001"])
+
+    # 新版本但内容没变：直接复用；摘要改了：重新评估
+    assert rolling.evaluate_pending([paper(1, version=2), paper(2, abstract="revised", version=2)], store) == (1, 1)
+    assert evaluated.calls == [["Paper 1", "Paper 2"], ["Paper 2"]]
+    assert store["http://arxiv.org/abs/2610.00001"] == first
+    assert store["http://arxiv.org/abs/2610.00002"]['content_hash'] == \
+        rolling.content_hash(paper(2, abstract="revised"))
+    # 全部已评估时不加载评估脚本
+    assert rolling.evaluate_pending([paper(1)], store) == (0, 0)
+
+
+# 评估失败的论文不写进结果库，下次运行再评
+def test_evaluate_pending_keeps_failures_pending(evaluated):
+    evaluated.failing.add("Paper 2")
+    store = {}
+    assert rolling.evaluate_pending([paper(1), paper(2)], store) == (2, 1)
+    assert rolling.pending_papers([paper(1), paper(2)], store) == [paper(2)]
+
+
+def test_prune_store():
+    def stamp(days_ago):
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - days_ago * 86400))
+
+    old = rolling.RETENTION_DAYS + 1
+    store = {'live-old': {'evaluated_at': stamp(old)}, 'gone-old': {'evaluated_at': stamp(old)},
+             'gone-recent': {'evaluated_at': stamp(1)}, 'gone-unknown': {}}
+    assert rolling.prune_store(store, [{'id': "live-old"}]) == 2
+    # 仍在窗口内的论文再旧也保留；窗口外的只清理超过 RETENTION_DAYS 的
+    assert set(store) == {'live-old', 'gone-recent'}
+
+
+def test_assemble():
+    store = {"http://arxiv.org/abs/2610.00001": {'id': "http://arxiv.org/abs/2610.00001v1", 'score': 8,
+                                                 'reason': "good", 'model': "m", 'content_hash': "h",
+                                                 'evaluated_at': "2026-10-19T00:00:00Z"}}
+    first, second = rolling.assemble([paper(1, version=2), paper(2)], store)
+    # 结果库里的评估字段覆盖到论文上，内部字段 (content_hash 等) 不带出去
+    assert first == dict(paper(1, version=2), score=8, reason="good", model="m")
+    # 缺失的评估按文档记为 0 分的 API Error
+    assert second == dict(paper(2), score=0, reason="API Error")
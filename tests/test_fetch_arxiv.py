@@ -0,0 +1,75 @@
+import threading
+import urllib.request
+
+import pytest
+
+import fetch_arxiv_v1 as fetch
+from benchmarks.feed_server import serve
+from paper_io import RAW_PAPER_SCHEMA, load, load_cache
+
+CONFIG = """limit_days = 8
+
+[[sources]]
+limit = 500
+category = "cs.AI"
+
+[[sources]]
+limit = 500
+category = "cs.CV"
+"""
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    """本地替身 arXiv API (每个分类 130 篇，需要翻两页)，在临时目录里运行抓取"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fetch, 'PAGE_INTERVAL', 0)
+    (tmp_path / "config.toml").write_text(CONFIG, encoding='utf-8')
+    server = serve(0, categories=2, per_category=130)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/query"
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def run(url):
+    return fetch.main("config.toml", "target/cache.json", url, workers=2)
+
+
+def papers_of(cache_data, category):
+    return [p for subjects in cache_data.values() for p in subjects.get(category, [])]
+
+
+def test_fetch_writes_cache_and_revalidates(feed, capsys):
+    assert run(feed) == 0
+    cache_data = load_cache("target/cache.json")
+    [day] = cache_data
+    assert set(cache_data[day]) == {"cs.AI", "cs.CV"}
+    for category in ("cs.AI", "cs.CV"):
+        papers = cache_data[day][category]
+        # 翻页拿全 130 篇，按更新时间倒序，字段与 arxivfeed 一致
+        assert len(papers) == 130
+        assert [p['updated'] for p in papers] == sorted((p['updated'] for p in papers), reverse=True)
+        assert set(papers[0]) == set(RAW_PAPER_SCHEMA)
+        assert papers[0]['pdf_url'].startswith("http://arxiv.org/pdf/")
+    assert load(".cache/arxiv_cache.json") == cache_data
+    state = load(".cache/fetch_state.json")
+    assert state["cs.AI"]['etag'] and state["cs.AI"]['newest_updated'] == cache_data[day]["cs.AI"][0]['updated']
+
+    # 没有新论文：第一页带 If-None-Match，服务器回 304，cache.json 不变
+    capsys.readouterr()
+    assert run(feed) == 0
+    assert capsys.readouterr().out.count("not modified") == 2
+    assert load_cache("target/cache.json") == cache_data
+
+
+def test_fetch_is_incremental(feed, capsys):
+    run(feed)
+    request = urllib.request.Request(feed.replace("/api/query", "/add?category=cs.AI&n=3"), method='POST')
+    urllib.request.urlopen(request).close()
+    capsys.readouterr()
+    assert run(feed) == 0
+    out = capsys.readouterr().out
+    assert "[cs.AI] 3 new or updated entries" in out and "[cs.CV] not modified" in out
+    assert len(papers_of(load_cache("target/cache.json"), "cs.AI")) == 133
@@ -0,0 +1,83 @@
+import pytest
+
+from highlight import build_matcher, find_matches, highlight, parse_venue
+
+
+@pytest.mark.parametrize('comment, expected', [
+    ("Accepted by CVPR 2025", "CVPR 2025"),
+    ("ACL'24 main conference", "ACL 2024"),
+    ("ACL’24", "ACL 2024"),
+    ("CVPR24 highlight", "CVPR 2024"),
+    ("EMNLP2024 Findings", "EMNLP 2024"),
+    ("accepted at icml 2024", "ICML 2024"),
+    ("NAACL-HLT 2024", "NAACL 2024"),
+    ("ECML-PKDD 2023", "ECML-PKDD 2023"),
+    ("NeurIPS-2023 workshop", "NeurIPS 2023"),
+    ("ICLR", "ICLR"),
+    # 页数 / 图表数不是年份
+    ("CVPR 10 pages, 5 figures", "CVPR"),
+    ("Accepted to ICCV 14 pages", "ICCV"),
+    ("ICDAR 2024 pages", "ICDAR"),
+    ("CVPR 8 figures", "CVPR"),
+    # 大小写不一致又没有年份的普通单词不算会议
+    ("a fast method, 12 pages", None),
+    ("up to date results", None),
+    ("Under review at NAACL", "NAACL"),
+    # 名单里的会议名不能是别的单词的一部分
+    ("EACL2024", "EACL 2024"),
+    ("CVPRW 2024", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_venue(comment, expected):
+    assert parse_venue(comment) == expected
+
+
+def spans(patterns, text, ignore_case=True):
+    return [text[s:e] for s, e in find_matches(build_matcher(patterns, ignore_case), text)]
+
+
+@pytest.mark.parametrize('patterns, text, expected', [
+    # 词边界：模式两端不能紧贴字母数字
+    (["OCR"], "docOCR and OCR-free OCR2", ["OCR"]),
+    (["OCR"], "(OCR), OCR_x", ["OCR"]),
+    (["RL"], "RLHF via RL.", ["RL"]),
+    # 重叠的模式从左到右取最长的
+    (["document", "document understanding"], "Document Understanding of documents", ["Document Understanding"]),
+    (["understanding", "document understanding"], "document understanding", ["document understanding"]),
+    (["of Tree", "Tree"], "Chain of Tree", ["of Tree"]),
+    (["a b", "b c"], "a b c", ["a b"]),
+    # 多词模式、不区分大小写
+    (["chain of"], "CHAIN OF thought", ["CHAIN OF"]),
+    ([], "anything", []),
+    (["x"], "", []),
+])
+def test_find_matches(patterns, text, expected):
+    assert spans(patterns, text) == expected
+
+
+# 'İ'.lower() 是两个字符；折叠时保持原字符，命中区间才能和原文对齐
+def test_find_matches_case_folding_keeps_offsets():
+    text = "İİ Ocr İstanbul"
+    matcher = build_matcher(["OCR", "İstanbul"])
+    assert find_matches(matcher, text) == [(3, 6), (7, 15)]
+    assert [text[s:e] for s, e in find_matches(matcher, text)] == ["Ocr", "İstanbul"]
+    assert spans(["ǅ"], "ǆ ǅ") == ["ǆ", "ǅ"]
+
+
+# 会议名区分大小写：FAST / DATE / SP 不能命中普通单词
+@pytest.mark.parametrize('text, expected', [
+    ("FAST 2024 and fast", ["FAST"]),
+    ("up to date", []),
+    ("IEEE SP, sp", ["SP"]),
+])
+def test_find_matches_case_sensitive(text, expected):
+    assert spans(["FAST", "DATE", "SP"], text, ignore_case=False) == expected
+
+
+def test_highlight_escapes():
+    matcher = build_matcher(["<b>", "R&D"])
+    assert highlight('a <b> & R&D "x"', matcher, 'hl') == \
+        'a <span class="hl">&lt;b&gt;</span> &amp; <span class="hl">R&amp;D</span> &quot;x&quot;'
+    assert highlight('<OCR>', build_matcher(["OCR"]), 'hl') == '&lt;<span class="hl">OCR</span>&gt;'
+    assert highlight(None, matcher, 'hl') == ''
@@ -0,0 +1,109 @@
+import io
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import llm_cassette
+from paper_io import BATCH_RESULT_SCHEMA, dumps_line, iter_jsonl, validate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESSAGES = [{'role': 'system', 'content': "You are a critical academic reviewer."},
+            {'role': 'user', 'content': "评估这篇论文"}]
+
+
+def completion(content):
+    return {'id': "c", 'model': "qwen-plus",
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5}}
+
+
+def fake_factory(calls):
+    """真实客户端的替身：每次请求返回不同的内容"""
+    def create(model, messages, temperature=None, **kwargs):
+        calls.append(temperature)
+        data = completion(f'{{"score": {len(calls)}}}')
+        return types.SimpleNamespace(model_dump=lambda: data, **data)
+
+    return lambda: types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+
+
+def no_client():
+    raise AssertionError("replay must not create a real client")
+
+
+def test_request_key_is_stable():
+    key = llm_cassette.request_key("qwen-plus", MESSAGES, 0.2)
+    # 键写在已提交的磁带里，编码方式变了会让磁带全部失配
+    assert key == llm_cassette.request_key("qwen-plus", [dict(reversed(m.items())) for m in MESSAGES], 0.2)
+    assert len(key) == 24
+    assert key != llm_cassette.request_key("qwen-plus", MESSAGES, 0.7)
+    assert key != llm_cassette.request_key("qwen-max", MESSAGES, 0.2)
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    calls = []
+    recorder = llm_cassette.wrap_client(fake_factory(calls), mode='record', path=path)
+    for _ in range(2):
+        recorder.chat.completions.create(model="qwen-plus", messages=MESSAGES, temperature=0.7)
+    recorder.chat.completions.create(model="qwen-plus", messages=MESSAGES, temperature=0.2)
+    assert calls == [0.7, 0.7, 0.2]
+
+    lines = list(iter_jsonl(open(path, encoding='utf-8').read()))
+    assert [line['source'] for line in lines] == ['realtime'] * 3
+    assert lines[0]['key'] == llm_cassette.request_key("qwen-plus", MESSAGES, 0.7)
+
+    # 同一请求录了多次时按录制顺序依次返回，用完从头循环
+    player = llm_cassette.wrap_client(no_client, mode='replay', path=path)
+    replies = [player.chat.completions.create(model="qwen-plus", messages=MESSAGES, temperature=0.7)
+               for _ in range(3)]
+    assert [r.choices[0].message.content for r in replies] == ['{"score": 1}', '{"score": 2}', '{"score": 1}']
+    assert replies[0].usage.prompt_tokens == 10
+    with pytest.raises(llm_cassette.CassetteMiss):
+        player.chat.completions.create(model="qwen-plus", messages=MESSAGES, temperature=1.0)
+
+
+# 回放时 Batch 任务立即完成，结果文件的每一行符合 Batch API 的格式；磁带里没有的请求按失败返回
+def test_batch_replay_output(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    cassette = llm_cassette.load_cassette(path)
+    llm_cassette.record_response(cassette, {'model': "qwen-plus", 'messages': MESSAGES, 'temperature': 0.2},
+                                 completion('{"score": 8}'), 'realtime')
+
+    player = llm_cassette.wrap_client(no_client, mode='replay', path=path)
+    tasks = [{'custom_id': "paper-0", 'method': "POST", 'url': "/v1/chat/completions",
+              'body': {'model': "qwen-plus", 'messages': MESSAGES, 'temperature': 0.2}},
+             {'custom_id': "paper-1", 'method': "POST", 'url': "/v1/chat/completions",
+              'body': {'model': "qwen-plus", 'messages': MESSAGES[:1], 'temperature': 0.2}}]
+    upload = io.BytesIO(b''.join(dumps_line(t) for t in tasks))
+    upload.name = "batch_tasks.jsonl"
+    file_id = player.files.create(file=upload, purpose="batch").id
+    batch = player.batches.create(input_file_id=file_id, endpoint="/v1/chat/completions", completion_window="24h")
+    assert batch.status == 'completed' and player.batches.retrieve(batch.id).output_file_id == batch.output_file_id
+
+    ok, missing = iter_jsonl(player.files.content(batch.output_file_id).text)
+    validate(ok, BATCH_RESULT_SCHEMA)
+    assert ok['custom_id'] == "paper-0" and ok['response']['status_code'] == 200
+    assert ok['response']['body']['choices'][0]['message']['content'] == '{"score": 8}'
+    assert missing['custom_id'] == "paper-1" and missing['response'] is None
+    assert missing['error']['code'] == 'cassette_miss'
+
+
+# MYARXIV_LLM_MODE / MYARXIV_CASSETTE 在导入时读取，评估脚本不传参数就进入回放
+def test_replay_mode_from_environment(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    cassette = llm_cassette.load_cassette(path)
+    llm_cassette.record_response(cassette, {'model': "qwen-plus", 'messages': MESSAGES, 'temperature': 0.2},
+                                 completion('{"score": 9}'), 'realtime')
+    script = ("import llm_cassette\n"
+              "def no_client(): raise SystemExit('real client created')\n"
+              "client = llm_cassette.wrap_client(no_client)\n"
+              f"reply = client.chat.completions.create(model='qwen-plus', messages={MESSAGES!r}, temperature=0.2)\n"
+              "print(llm_cassette.replaying(), reply.choices[0].message.content)\n")
+    env = dict(os.environ, MYARXIV_LLM_MODE="replay", MYARXIV_CASSETTE=path)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == 'True {"score": 9}'
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+import types
+
+import pytest
+
+import llm_router
+
+
+def make_router(endpoints):
+    endpoints = llm_router.load_endpoints(json.dumps(endpoints))
+    return {'states': [llm_router.new_state(e) for e in endpoints], 'lock': threading.Lock()}
+
+
+def indexes(router, picks):
+    return [router['states'].index(state) for state in picks]
+
+
+def test_load_endpoints_fills_defaults():
+    [endpoint] = llm_router.load_endpoints('[{"base_url": "http://a/v1"}]')
+    assert endpoint['name'] == "endpoint-0"
+    assert endpoint['weight'] == 1 and endpoint['qps'] == 0 and endpoint['api_key_env'] == "API_KEY"
+    assert llm_router.load_endpoints("  ") == []
+
+
+@pytest.mark.parametrize('value', [
+    '[]',
+    '[{"name": "no url"}]',
+    '[{"base_url": "http://a/v1", "weight": 0}]',
+    '[{"base_url": "http://a/v1", "qps": "5"}]',
+])
+def test_load_endpoints_rejects(value):
+    with pytest.raises(ValueError):
+        llm_router.load_endpoints(value)
+
+
+def test_expected_cost():
+    state = make_router([{'base_url': "http://a/v1", 'weight': 2, 'qps': 1}])['states'][0]
+    state['latency'], state['inflight'], state['next_slot'] = 4.0, 1, 10.5
+    # 限速排队 0.5s + (在途 1 + 新请求 1) * 4s / 权重 2
+    assert llm_router.expected_cost(state, 10.0, 1.0) == 4.5
+
+
+# 按权重分摊：权重 2 的端点接到的请求是权重 1 的两倍
+def test_pick_endpoint_follows_weights():
+    router = make_router([{'base_url': "http://a/v1", 'weight': 2}, {'base_url': "http://b/v1"}])
+    picks = [llm_router.pick_endpoint(router, "m", set())[0] for _ in range(6)]
+    assert sorted(indexes(router, picks)) == [0, 0, 0, 0, 1, 1]
+
+
+def test_pick_endpoint_skips_cooldown_tried_and_models():
+    router = make_router([{'base_url': "http://a/v1"}, {'base_url': "http://b/v1"},
+                          {'base_url': "http://c/v1", 'models': {"other": "other-v2"}}])
+    a, b, c = router['states']
+    a['cooldown_until'] = time.monotonic() + 60
+    assert llm_router.pick_endpoint(router, "m", set())[0] is b
+    assert llm_router.pick_endpoint(router, "m", {id(b)}) == (a, pytest.approx(60, abs=1))
+    assert llm_router.pick_endpoint(router, "m", {id(a), id(b)}) == (None, 0.0)
+    assert llm_router.pick_endpoint(router, "other", set())[0] in (b, c)
+
+
+def test_pick_endpoint_reserves_qps_slots():
+    router = make_router([{'base_url': "http://a/v1", 'qps': 4}])
+    waits = [llm_router.pick_endpoint(router, "m", set())[1] for _ in range(3)]
+    assert waits[0] == 0 and waits[1] == pytest.approx(0.25, abs=0.01) and waits[2] == pytest.approx(0.5, abs=0.01)
+
+
+class FakeError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def fake_client_class(behaviour, calls):
+    """behaviour: {base_url: 状态码 (抛错) 或 None (成功)}；calls 记录 (base_url, 实际模型名)"""
+    class Client:
+        def __init__(self, api_key, base_url, timeout, max_retries):
+            assert max_retries == 0
+
+            def create(model, messages, **kwargs):
+                calls.append((base_url, model))
+                if behaviour.get(base_url):
+                    raise FakeError(behaviour[base_url])
+                return {'model': model}
+
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+    return Client
+
+
+# 端点失败时换到下一个端点重试，失败的端点进入冷却；模型名按 models 映射
+def test_chat_create_fails_over():
+    calls = []
+    endpoints = llm_router.load_endpoints(json.dumps([
+        {'base_url': "http://a/v1", 'weight': 10}, {'base_url': "http://b/v1", 'models': {"m": "m-b"}}]))
+    client = llm_router.make_router(fake_client_class({"http://a/v1": 500}, calls), endpoints)
+    assert client.chat.completions.create(model="m", messages=[]) == {'model': "m-b"}
+    assert calls == [("http://a/v1", "m"), ("http://b/v1", "m-b")]
+    a, b = client.router['states']
+    assert a['errors'] == 1 and a['cooldown_until'] > time.monotonic() and b['latency'] is not None
+    llm_router.ROUTERS.remove(client.router)
+
+
+# 400 / 422 说明请求本身有问题：直接抛出，不换端点，也不让端点冷却
+def test_chat_create_request_errors_are_not_retried():
+    calls = []
+    endpoints = llm_router.load_endpoints('[{"base_url": "http://a/v1"}, {"base_url": "http://b/v1"}]')
+    client = llm_router.make_router(fake_client_class({"http://a/v1": 400, "http://b/v1": 400}, calls), endpoints)
+    with pytest.raises(FakeError):
+        client.chat.completions.create(model="m", messages=[])
+    assert len(calls) == 1
+    assert all(s['cooldown_until'] == 0 for s in client.router['states'])
+    llm_router.ROUTERS.remove(client.router)
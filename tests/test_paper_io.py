@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import paper_io
+
+SAMPLES = [
+    {'id': "http://arxiv.org/abs/2610.00001v1", 'title': "文档理解 — “quotes” \\ \n tab\t", 'score': 8,
+     'keywords': ["OCR", "表格"], 'nested': {'a': [1, 2.5, None, True, False, {}], 'b': []}},
+    [0.1, -0.0, 1.5, 123456789012, -7, "lr 3e-4"],
+    {'big': 1e16, 'small': 2.5e-8},         # 带指数的浮点数：快速后端写法不同，要退回标准库
+    {'huge': 2 ** 70},                      # 超出 64 位的整数
+    {'emoji': "😀", 'control': "\x00\x1f "},
+    [],
+]
+
+
+# 换后端不能改变产物的字节 (缓存和 ETag 依赖内容哈希)
+@pytest.mark.parametrize('codec', sorted(paper_io.CODECS))
+@pytest.mark.parametrize('indent', [False, True])
+@pytest.mark.parametrize('obj', SAMPLES)
+def test_dumps_byte_stable(codec, indent, obj):
+    previous = paper_io.use_codec(codec)
+    try:
+        assert paper_io.dumps(obj, indent) == paper_io._json_dumps(obj, indent)
+        assert paper_io.loads(paper_io.dumps(obj, indent)) == json.loads(paper_io._json_dumps(obj, indent))
+    finally:
+        paper_io.use_codec(previous)
+
+
+@pytest.mark.parametrize('codec', sorted(paper_io.CODECS))
+@pytest.mark.parametrize('data', [b'[NaN]', b'{"a": Infinity}', b'{"a": 1', b''])
+def test_loads_rejects(codec, data):
+    previous = paper_io.use_codec(codec)
+    try:
+        with pytest.raises(ValueError):
+            paper_io.loads(data)
+    finally:
+        paper_io.use_codec(previous)
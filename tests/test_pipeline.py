@@ -0,0 +1,79 @@
+import sys
+
+import pytest
+
+import pipeline_v1 as pipeline
+
+
+@pytest.fixture
+def stage(tmp_path, monkeypatch):
+    """一个把 in.txt 复制成 out.txt 的阶段，每运行一次在 runs.log 里记一行"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "in.txt").write_text("v1")
+    script = ("import shutil; shutil.copy('in.txt', 'out.txt'); "
+              "open('runs.log', 'a').write('run\\n')")
+    stage = {'name': 'copy', 'cmd': [sys.executable, '-c', script], 'deps': [],
+             'inputs': ['in.txt'], 'outputs': ['out.txt']}
+    monkeypatch.setattr(pipeline, 'STAGES', [stage])
+    return stage
+
+
+def runs(tmp_path):
+    path = tmp_path / "runs.log"
+    return len(path.read_text().splitlines()) if path.exists() else 0
+
+
+def test_skip_if_unchanged_and_rerun_on_input_change(tmp_path, stage):
+    manifest_file = str(tmp_path / "manifest.json")
+    assert pipeline.main({'copy'}, manifest_file=manifest_file) == 0
+    assert runs(tmp_path) == 1
+    record = pipeline.load_manifest(manifest_file)['stages']['copy']
+    assert pipeline.is_up_to_date(stage, record)
+
+    # 输入没变：跳过
+    assert pipeline.main({'copy'}, manifest_file=manifest_file) == 0
+    assert runs(tmp_path) == 1
+    assert pipeline.load_manifest(manifest_file)['runs'][-1]['stages'] == [{'name': 'copy', 'status': 'skipped'}]
+
+    # 输入变了：重跑
+    (tmp_path / "in.txt").write_text("v2")
+    assert not pipeline.is_up_to_date(stage, pipeline.load_manifest(manifest_file)['stages']['copy'])
+    assert pipeline.main({'copy'}, manifest_file=manifest_file) == 0
+    assert runs(tmp_path) == 2
+    assert (tmp_path / "out.txt").read_text() == "v2"
+
+    # --force 总是重跑
+    assert pipeline.main({'copy'}, force=True, manifest_file=manifest_file) == 0
+    assert runs(tmp_path) == 3
+
+
+# 输出被删除或改动也要重跑
+@pytest.mark.parametrize('tamper', [
+    lambda path: path.unlink(),
+    lambda path: path.write_text("edited"),
+])
+def test_rerun_when_output_missing_or_modified(tmp_path, stage, tamper):
+    manifest_file = str(tmp_path / "manifest.json")
+    pipeline.main({'copy'}, manifest_file=manifest_file)
+    tamper(tmp_path / "out.txt")
+    assert not pipeline.is_up_to_date(stage, pipeline.load_manifest(manifest_file)['stages']['copy'])
+    pipeline.main({'copy'}, manifest_file=manifest_file)
+    assert runs(tmp_path) == 2
+
+
+def test_failed_stage_is_not_skipped(tmp_path, stage):
+    manifest_file = str(tmp_path / "manifest.json")
+    stage['cmd'] = [sys.executable, '-c', "raise SystemExit(3)"]
+    assert pipeline.main({'copy'}, manifest_file=manifest_file) == 3
+    record = pipeline.load_manifest(manifest_file)['stages']['copy']
+    assert record['status'] == 'failed' and record['outputs'] == {}
+    assert not pipeline.is_up_to_date(stage, record)
+
+
+# 原地修改的文件 (同时是输入和输出) 和上次运行后的结果比较
+def test_in_place_file_compared_with_last_output(tmp_path, stage):
+    manifest_file = str(tmp_path / "manifest.json")
+    stage.update(cmd=[sys.executable, '-c', "open('in.txt', 'a').write('!')"], outputs=['in.txt'])
+    pipeline.main({'copy'}, manifest_file=manifest_file)
+    assert (tmp_path / "in.txt").read_text() == "v1!"
+    assert pipeline.is_up_to_date(stage, pipeline.load_manifest(manifest_file)['stages']['copy'])
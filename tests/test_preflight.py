@@ -0,0 +1,92 @@
+import types
+
+import pytest
+
+import preflight_v1 as preflight
+
+TURBO = {'model': "qwen-turbo", 'input_price': 0.3, 'output_price': 0.6}
+PLUS = {'model': "qwen-plus", 'input_price': 0.8, 'output_price': 2.0, 'escalate': (4, 10)}
+
+
+def evaluator(cascade):
+    return types.SimpleNamespace(CASCADE=cascade, CASCADE_TIERS=[TURBO, PLUS], MODEL_NAME="qwen-plus",
+                                 MAX_WORKERS=8, QPS_LIMIT=0, PROMPT_TEMPLATE="{title}", JSON_RESPONSE_TEMPLATE="")
+
+
+def run(model, papers, calls=None, seconds=100.0):
+    return {'mode': 'realtime', 'model': model, 'papers': papers, 'seconds': seconds, 'calls': calls or papers,
+            'prompt_tokens': 0, 'completion_tokens': 500 * (calls or papers)}
+
+
+def call_cost(price, prompt=1000, output=500):
+    return (prompt * price['input_price'] + output * price['output_price']) / 1e6
+
+
+def est_for(tiers, pending=10, realtime_rate=1.0, batch_rate=2.0, overhead=100):
+    """prompt 平均 1000 token、输出 500 token/次，batch 按 qwen-plus 计价"""
+    return {'pending': pending, 'prompt_tokens': 1000 * pending, 'output_per_call': 500,
+            'tiers': tiers, 'batch_input_price': PLUS['input_price'], 'batch_output_price': PLUS['output_price'],
+            'realtime_rate': realtime_rate, 'batch_rate': batch_rate, 'batch_overhead': overhead}
+
+
+def test_plan_cost_single_tier():
+    est = est_for([dict(PLUS, share=1.0, calls_per_paper=2.0)])
+    cost, seconds = preflight.plan_cost(est, 10, 0)
+    assert cost == pytest.approx(10 * 2 * call_cost(PLUS))
+    assert seconds == 10
+    # batch 不做自洽采样，打折计价，另加排队开销
+    cost, seconds = preflight.plan_cost(est, 0, 10)
+    assert cost == pytest.approx(10 * call_cost(PLUS) * preflight.BATCH_DISCOUNT)
+    assert seconds == 100 + 10 / 2
+
+
+# 级联：每篇都付 turbo 的钱，只有升级的那部分再付 plus 的钱
+def test_plan_cost_cascade_prices_each_tier():
+    est = est_for([dict(TURBO, share=1.0, calls_per_paper=1.0), dict(PLUS, share=0.25, calls_per_paper=1.0)])
+    cost, _ = preflight.plan_cost(est, 10, 0)
+    assert cost == pytest.approx(10 * (call_cost(TURBO) + 0.25 * call_cost(PLUS)))
+    assert 10 * call_cost(TURBO) < cost < 10 * call_cost(PLUS)
+
+
+def test_estimate_cascade_escalation_from_history():
+    # 两次级联运行：30/100 和 50/200 篇升级到 plus，取中位数
+    history = [run("qwen-turbo", 100), run("qwen-plus", 30), run("qwen-turbo", 200), run("qwen-plus", 50)]
+    papers = [{'title': "t", 'authors': ["A"], 'abstract': "a", 'category': "cs.CV"}] * 4
+    est = preflight.estimate(papers, papers, evaluator(True), history)
+    assert [(t['model'], t['share']) for t in est['tiers']] == [("qwen-turbo", 1.0), ("qwen-plus", 0.275)]
+    assert est['tiers'][1]['input_price'] == PLUS['input_price']
+    assert est['calls_per_paper'] == pytest.approx(1.275)
+    # batch 不级联，仍按 MODEL_NAME 计价
+    assert (est['batch_input_price'], est['batch_output_price']) == (0.8, 2.0)
+
+
+@pytest.mark.parametrize('cascade, tiers', [
+    (True, [("qwen-turbo", 1.0), ("qwen-plus", preflight.DEFAULT_ESCALATION_RATE)]),
+    (False, [("qwen-plus", 1.0)]),
+])
+def test_estimate_tiers_without_history(cascade, tiers):
+    est = preflight.estimate([], [], evaluator(cascade), [])
+    assert [(t['model'], t['share']) for t in est['tiers']] == tiers
+    assert all(t['calls_per_paper'] == 1.0 for t in est['tiers'])
+
+
+# 没有截止时间时取两边同时结束的分割点；有截止时间时 batch 取能赶上的最大份额
+@pytest.mark.parametrize('deadline, realtime, batch, seconds', [
+    (None, 400, 600, 400),
+    (300, 600, 400, 600),
+])
+def test_build_plans_hybrid_split(deadline, realtime, batch, seconds):
+    est = est_for([dict(PLUS, share=1.0, calls_per_paper=1.0)], pending=1000)
+    plans = {p['plan']: p for p in preflight.build_plans(est, deadline)}
+    hybrid = plans['hybrid']
+    assert (hybrid['realtime'], hybrid['batch'], hybrid['seconds']) == (realtime, batch, seconds)
+    assert hybrid['cost'] == pytest.approx(realtime * call_cost(PLUS) + batch * call_cost(PLUS) * 0.5, abs=1e-4)
+    assert plans['batch']['cost'] < hybrid['cost'] < plans['realtime']['cost']
+
+
+def test_build_plans_no_hybrid_when_batch_cannot_help():
+    # 论文太少，实时在 batch 排队结束前就做完了
+    est = est_for([dict(PLUS, share=1.0, calls_per_paper=1.0)], pending=50)
+    assert [p['plan'] for p in preflight.build_plans(est)] == ['realtime', 'batch']
+    chosen = preflight.choose_plan(preflight.build_plans(est), deadline=60)
+    assert chosen['plan'] == 'realtime'
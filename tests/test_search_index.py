@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from build_search_index_v1 import build_postings, encode_postings, shard_key, tokenize, write_index
+from paper_io import load
+
+INDEX_JS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "statics", "index.js")
+
+TEXTS = [
+    "Vision-Language Models for Document OCR",
+    "A study of the LLaMA-2 7B model on ImageNet21k",
+    "基于扩散模型的图像生成",
+    "多模态大模型 (MLLM) 在视频理解中的应用",
+    "单字：图",
+    "Ünïcödé naïve café, x y z",
+    "İstanbul and ſtraße",
+    "",
+]
+
+
+def js_source(*names):
+    """从 index.js 中取出顶层的 const / function 定义"""
+    with open(INDEX_JS, 'r', encoding='utf-8') as f:
+        src = f.read()
+    parts = []
+    for name in names:
+        if f"function {name}(" in src:
+            i = src.index(f"function {name}(")
+            parts.append(src[i:src.index("\n}\n", i) + 2])
+        else:
+            i = src.index(f"const {name} = ")
+            parts.append(src[i:src.index(";\n", i) + 1])
+    return '\n'.join(parts)
+
+
+def run_js(source, expression):
+    result = subprocess.run(['node', '-e', f"{source}\nprocess.stdout.write(JSON.stringify({expression}));"],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def decode_postings(flat):
+    doc, plist = 0, []
+    for i in range(0, len(flat), 2):
+        doc += flat[i]
+        plist.append((doc, flat[i + 1]))
+    return plist
+
+
+# 前端查询时的分词 / 分片必须与建索引时完全一致，否则查不到
+@pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+def test_js_tokenize_and_shard_key_match_python():
+    source = js_source("STOPWORDS", "tokenize", "shardKey")
+    texts = json.dumps(TEXTS, ensure_ascii=False)
+    js = run_js(source, f"{texts}.map(t => tokenize(t).map(w => [w, shardKey(w)]))")
+    assert js == [[[w, shard_key(w)] for w in tokenize(t)] for t in TEXTS]
+    assert any(key.startswith('zh') for tokens in js for _, key in tokens)
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ("Models for the OCR", ["models", "ocr"]),
+    ("图像生成", ["图像", "像生", "生成"]),
+    ("图 a 7B", ["图", "7b"]),
+])
+def test_tokenize(text, tokens):
+    assert tokenize(text) == tokens
+
+
+@pytest.mark.parametrize('plist', [
+    [],
+    [(0, 3)],
+    [(0, 1), (1, 5), (7, 2), (1000, 9)],
+    [(5, 1), (6, 1)],
+])
+def test_encode_postings_round_trip(plist):
+    flat = encode_postings(plist)
+    assert len(flat) == 2 * len(plist)
+    assert all(delta >= 0 for delta in flat[::2])
+    assert decode_postings(flat) == plist
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+def test_js_decode_postings_matches_encoding():
+    plist = [(2, 3), (3, 1), (40, 6)]
+    source = js_source("decodePostings")
+    js = run_js(source, f"(() => {{ const w = new Map(); decodePostings({encode_postings(plist)}, 2, w); "
+                        f"return [...w]; }})()")
+    assert js == [[doc, weight * 2] for doc, weight in plist]
+
+
+def test_write_index_round_trip(tmp_path):
+    docs = [
+        {'id': "2610.00001", 'date': "2026-10-19", 'title': "Diffusion models", 'title_zh': "扩散模型",
+         'abstract': "diffusion", 'authors': "Alice", 'keywords': "", 'score': 7},
+        {'id': "2610.00002", 'date': "2026-10-18", 'title': "Language models", 'title_zh': "语言模型",
+         'abstract': "", 'authors': "Bob", 'keywords': "diffusion", 'score': None},
+    ]
+    postings = build_postings(docs)
+    write_index(docs, postings, str(tmp_path))
+    assert decode_postings(load(str(tmp_path / "di.json"))['diffusion']) == [(0, 4), (1, 3)]
+    assert decode_postings(load(str(tmp_path / f"{shard_key('模型')}.json"))['模型']) == [(0, 3), (1, 3)]
+    assert load(str(tmp_path / "meta.json"))['docs'] == 2
@@ -0,0 +1,43 @@
+import pytest
+
+import serve_v1
+
+
+@pytest.mark.parametrize('value, expected', [
+    ("http://arxiv.org/abs/2410.12345v2", "2410.12345"),
+    ("2410.12345v2", "2410.12345"),
+    ("2410.12345", "2410.12345"),
+    (" 2410.12345 ", "2410.12345"),
+    # 旧式 ID 保留学科前缀
+    ("hep-th/9901001v2", "hep-th/9901001"),
+    ("hep-th/9901001", "hep-th/9901001"),
+    ("http://arxiv.org/abs/hep-th/9901001v2", "hep-th/9901001"),
+    ("math.GT/0309136v1", "math.GT/0309136"),
+    # 不像 ID 的路径返回 None (接口回 400)，不能抛异常
+    ("a/b", None),
+    ("", None),
+])
+def test_arxiv_id(value, expected):
+    assert serve_v1.arxiv_id(value) == expected
+
+
+def test_response_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(serve_v1, 'RESPONSE_CACHE_SIZE', 3)
+    snapshot = serve_v1.build_snapshot({}, {})
+    for i in range(5):
+        serve_v1.cache_response(snapshot, i, (200, b'', '""'))
+    assert serve_v1.cached_response(snapshot, 2) is not None
+    serve_v1.cache_response(snapshot, 5, (200, b'', '""'))
+    # 最近用过的 2 留下，最久没用的 3 被淘汰
+    assert list(snapshot['responses']) == [4, 2, 5]
+
+
+# 旧式 ID 的论文能按带斜杠的 ID 查到 (/api/papers/hep-th/9901001v2)
+def test_query_old_style_id():
+    cache_data = {"2026-10-19T00:00:00Z": {"hep-th": [{
+        'id': "http://arxiv.org/abs/hep-th/9901001v2", 'title': "Strings", 'authors': ["A"],
+        'summary': "abstract", 'comment': None}]}}
+    snapshot = serve_v1.build_snapshot(serve_v1.collect_papers(cache_data), {})
+    code, doc = serve_v1.query_paper(snapshot, "hep-th/9901001v2")
+    assert code == 200 and doc['arxiv_id'] == "hep-th/9901001"
+    assert serve_v1.query_paper(snapshot, "9901001")[0] == 404
@@ -0,0 +1,29 @@
+from shard_days_v1 import shard_paper, write_shards
+from paper_io import load
+
+PAPER = {
+    'id': "http://arxiv.org/abs/2610.00001v1", 'title': "Document Agent for OCR",
+    'authors': ["Alice", "Yann LeCun"], 'summary': "abstract", 'comment': "Accepted to CVPR 2025. 10 pages",
+    'updated': "2026-10-19T00:00:00Z", 'published': "2026-10-19T00:00:00Z", 'pdf_url': None,
+}
+
+
+# 分片要带上和 arxivfeed 页面相同的高亮信息，前端才能渲染出 ★、标题高亮和会议 chip
+def test_shard_paper_carries_highlights():
+    record = shard_paper(PAPER)
+    assert 'pdf_url' not in record
+    assert record['publication'] == "CVPR 2025"
+    assert record['highlights']['authors'] == [[1, 0, 10]]
+    assert [PAPER['title'][s:e] for s, e in record['highlights']['title']] == ["Document", "Agent", "OCR"]
+
+
+def test_shard_paper_without_hits():
+    record = shard_paper(dict(PAPER, title="Plain words", authors=["Alice"], comment=None))
+    assert 'highlights' not in record and 'publication' not in record
+
+
+def test_write_shards(tmp_path):
+    manifest = write_shards({"2026-10-19T00:00:00Z": {"cs.CV": [PAPER]}}, str(tmp_path), {"cs.CV": "Vision"})
+    subject = manifest['days'][0]['subjects'][0]
+    assert subject == {'category': "cs.CV", 'title': "Vision", 'count': 1, 'src': "data/2026-10-19/cs.CV.json"}
+    assert load(str(tmp_path / subject['src'])) == [shard_paper(PAPER)]
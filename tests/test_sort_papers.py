@@ -0,0 +1,34 @@
+import json
+
+from bs4 import BeautifulSoup
+
+from html_pipeline import make_context
+from sort_papers_v2 import sort_articles
+
+HTML = """<div class="details-content">
+<p>header</p>
+<article><a href="http://arxiv.org/abs/2610.00001v1">a</a></article>
+<article><a href="http://arxiv.org/abs/2610.00002v1">b</a></article>
+<article><a href="http://arxiv.org/abs/2610.00003v1">c</a></article>
+<article><a href="http://arxiv.org/abs/2610.00004v1">d</a></article>
+</div>"""
+
+
+def sorted_titles(tmp_path, scores):
+    evaluated = [{'id': f"http://arxiv.org/abs/2610.0000{i}v1", 'score': s} for i, s in scores.items()]
+    (tmp_path / "evaluated_papers.json").write_text(json.dumps(evaluated), encoding='utf-8')
+    soup = BeautifulSoup(HTML, 'html.parser')
+    sort_articles(soup, make_context(str(tmp_path)))
+    content = soup.find('div', class_='details-content')
+    # 非文章节点留在原处
+    assert content.contents[1].name == 'p'
+    return ''.join(a.get_text() for a in content.find_all('article'))
+
+
+# 高分在前，同分保持原顺序，未评分的排最后
+def test_sort_articles(tmp_path):
+    assert sorted_titles(tmp_path, {1: 3, 2: 9, 4: 9}) == "bdac"
+
+
+def test_sort_articles_already_ordered(tmp_path):
+    assert sorted_titles(tmp_path, {1: 9, 2: 8, 3: 7, 4: 6}) == "abcd"